@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for schema_diff (not part of the package).
+
+    python -m benchmarks.generate --size medium old.json new.json
+    python -m benchmarks.run --sizes small,medium --baseline benchmarks/baseline.json
+"""
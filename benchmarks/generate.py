@@ -0,0 +1,294 @@
+"""
+Deterministic synthetic inputs: OpenAPI documents of tunable shape, a
+modified "next version" of them, and generic JSON documents.
+
+The same shape and seed always produce the same document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+_METHODS = ("get", "post", "put", "patch", "delete")
+_PRIMITIVES = ("string", "integer", "number", "boolean")
+
+
+@dataclass(frozen=True)
+class SpecShape:
+    paths: int = 50
+    ops_per_path: int = 2  # 1..5
+    components: int = 40
+    properties: int = 6  # per object
+    depth: int = 2  # nesting of inline objects inside a component
+    ref_fanout: int = 2  # $refs from each component to other components
+    ref_depth: int = 3  # longest chain of non-recursive $refs
+    recursion: bool = True  # some components refer to themselves (tree nodes)
+    all_of: float = 0.2  # share of components written as allOf compositions
+    enum_size: int = 8
+    seed: int = 0
+
+
+# The size ladder used by the timing and memory benchmarks.
+SIZES: dict[str, SpecShape] = {
+    "small": SpecShape(paths=20, components=20),
+    "medium": SpecShape(paths=200, ops_per_path=3, components=150),
+    "large": SpecShape(paths=1000, ops_per_path=3, components=600, enum_size=50),
+    "xlarge": SpecShape(
+        paths=3000, ops_per_path=4, components=1500, depth=3, enum_size=200
+    ),
+}
+
+# (depth, width) of the generic JSON documents per size
+JSON_SIZES: dict[str, tuple[int, int]] = {
+    "small": (3, 6),
+    "medium": (4, 8),
+    "large": (5, 8),
+    "xlarge": (5, 12),
+}
+
+
+def _ref(i: int) -> dict[str, str]:
+    return {"$ref": f"#/components/schemas/C{i}"}
+
+
+def _enum(rng: random.Random, size: int) -> dict[str, Any]:
+    return {
+        "type": "string",
+        "enum": [f"v{rng.randrange(size * 4)}_{i}" for i in range(size)],
+    }
+
+
+def _deeper(rng: random.Random, shape: SpecShape, index: int) -> int | None:
+    """
+    A component in a deeper ref layer than `index`, if any.
+
+    Components are split into `ref_depth + 1` layers and plain refs only point
+    to the next ones, which bounds the size of the resolved trees.
+    """
+    layer_size = -(-shape.components // (shape.ref_depth + 1))
+    start = (index // layer_size + 1) * layer_size
+    if start >= shape.components:
+        return None
+    return rng.randrange(start, shape.components)
+
+
+def _object(rng: random.Random, shape: SpecShape, index: int, depth: int) -> dict:
+    properties: dict[str, Any] = {}
+    for p in range(shape.properties):
+        roll = rng.random()
+        if depth > 0 and roll < 0.15:
+            properties[f"p{p}"] = _object(rng, shape, index, depth - 1)
+        elif roll < 0.25 and shape.enum_size:
+            properties[f"p{p}"] = _enum(rng, shape.enum_size)
+        elif roll < 0.35:
+            properties[f"p{p}"] = {
+                "type": "array",
+                "items": {"type": rng.choice(_PRIMITIVES)},
+            }
+        else:
+            properties[f"p{p}"] = {"type": rng.choice(_PRIMITIVES)}
+
+    for r in range(shape.ref_fanout):
+        if shape.recursion and rng.random() < 0.1:
+            target = index  # e.g. `children: [Self]`
+        else:
+            target = _deeper(rng, shape, index)
+            if target is None:
+                continue
+        ref = _ref(target)
+        properties[f"r{r}"] = (
+            {"type": "array", "items": ref} if rng.random() < 0.3 else ref
+        )
+
+    required = sorted(rng.sample(sorted(properties), k=min(2, len(properties))))
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _component(rng: random.Random, shape: SpecShape, index: int) -> dict:
+    schema = _object(rng, shape, index, shape.depth)
+    if rng.random() < shape.all_of:
+        base = _deeper(rng, shape, index)
+        if base is not None:
+            return {"allOf": [_ref(base), schema]}
+    return schema
+
+
+def _operation(rng: random.Random, shape: SpecShape, method: str) -> dict:
+    op: dict[str, Any] = {
+        "parameters": [
+            {
+                "name": "id",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": "limit",
+                "in": "query",
+                "required": False,
+                "schema": {"type": "integer"},
+            },
+        ],
+        "responses": {
+            "200": {
+                "description": "ok",
+                "content": {
+                    "application/json": {
+                        "schema": _ref(rng.randrange(shape.components))
+                    }
+                },
+            },
+            "404": {
+                "description": "not found",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {"message": {"type": "string"}},
+                        }
+                    }
+                },
+            },
+        },
+    }
+    if method in ("post", "put", "patch"):
+        op["requestBody"] = {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _ref(rng.randrange(shape.components))}
+            },
+        }
+    return op
+
+
+def openapi_spec(shape: SpecShape = SpecShape()) -> dict:
+    """
+    An OpenAPI 3 document of the given shape.
+    """
+    rng = random.Random(shape.seed)
+    schemas = {f"C{i}": _component(rng, shape, i) for i in range(shape.components)}
+    methods = _METHODS[: max(1, min(shape.ops_per_path, len(_METHODS)))]
+    paths = {
+        f"/r{i}/{{id}}": {m: _operation(rng, shape, m) for m in methods}
+        for i in range(shape.paths)
+    }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def mutate(spec: dict, *, rate: float = 0.05, seed: int = 1) -> dict:
+    """
+    A "next version" of `spec`: about `rate` of the components and paths get
+    a breaking or non-breaking change (property removed/added, type changed,
+    enum narrowed, field made required, path removed/added).
+    """
+    rng = random.Random(seed)
+    new = copy.deepcopy(spec)
+
+    for schema in new["components"]["schemas"].values():
+        if rng.random() >= rate:
+            continue
+        target = schema["allOf"][-1] if "allOf" in schema else schema
+        props = target["properties"]
+        name = rng.choice(sorted(props))
+        action = rng.randrange(5)
+        if action == 0:
+            del props[name]
+            target["required"] = [r for r in target["required"] if r != name]
+        elif action == 1:
+            props[f"added{rng.randrange(1000)}"] = {"type": "string"}
+        elif action == 2 and "type" in props[name]:
+            props[name] = {
+                "type": "boolean" if props[name]["type"] != "boolean" else "string"
+            }
+        elif action == 3 and "enum" in props[name]:
+            props[name]["enum"] = props[name]["enum"][1:]
+        else:
+            target["required"] = sorted(set(target["required"]) | {name})
+
+    paths = new["paths"]
+    for path in sorted(paths):
+        if rng.random() < rate / 2:
+            del paths[path]
+    paths["/added/{id}"] = copy.deepcopy(next(iter(spec["paths"].values())))
+    return new
+
+
+def json_document(depth: int = 4, width: int = 8, *, seed: int = 0) -> dict:
+    """
+    A generic nested JSON document (objects, arrays and scalars).
+    """
+    rng = random.Random(seed)
+
+    def node(level: int) -> Any:
+        if level == 0:
+            return rng.choice(
+                [rng.randrange(1000), f"s{rng.randrange(1000)}", True, None]
+            )
+        roll = rng.random()
+        if roll < 0.2:
+            return [node(level - 1) for _ in range(3)]
+        return {f"k{i}": node(level - 1) for i in range(width)}
+
+    return {f"root{i}": node(depth) for i in range(width)}
+
+
+def mutate_json(doc: Any, *, rate: float = 0.05, seed: int = 1) -> Any:
+    """
+    `doc` with about `rate` of its object keys removed, added or retyped.
+    """
+    rng = random.Random(seed)
+
+    def walk(value: Any) -> Any:
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        out = {}
+        for k, v in value.items():
+            roll = rng.random()
+            if roll < rate / 3:
+                continue
+            if roll < 2 * rate / 3:
+                out[k] = str(v)
+            else:
+                out[k] = walk(v)
+        if rng.random() < rate:
+            out[f"added{rng.randrange(1000)}"] = 0
+        return out
+
+    return walk(doc)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic OpenAPI spec and a modified next version."
+    )
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--size", choices=sorted(SIZES), default="medium")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rate", type=float, default=0.05, help="share of changes")
+    args = parser.parse_args(argv)
+
+    shape = SIZES[args.size]
+    if args.seed is not None:
+        shape = replace(shape, seed=args.seed)
+    old = openapi_spec(shape)
+    new = mutate(old, rate=args.rate, seed=shape.seed + 1)
+    args.old.write_text(json.dumps(old), encoding="utf-8")
+    args.new.write_text(json.dumps(new), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
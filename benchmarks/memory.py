@@ -0,0 +1,349 @@
+"""
+Per-phase memory over the synthetic size ladder, with baseline comparison.
+
+    python -m benchmarks.memory                       # small, medium, large
+    python -m benchmarks.memory --sizes xlarge --max-rss-mb 2048
+    python -m benchmarks.memory --save-baseline benchmarks/memory-baseline.json
+    python -m benchmarks.memory --baseline benchmarks/memory-baseline.json
+
+Each size runs in a fresh interpreter through load, resolve, normalize, diff
+and output, recording after each phase:
+
+- peak: the most memory traced by tracemalloc at any point of the phase,
+  including everything earlier phases still hold
+- retained: traced memory the phase left allocated (its results)
+- rss_peak / rss: resident set size, polled from a background thread, at its
+  highest during the phase and at its end (Linux only)
+
+tracemalloc costs time and memory of its own; `--no-tracemalloc` leaves only
+the RSS figures, which are then closer to a plain run. A phase regresses when
+its traced peak exceeds the baseline's by more than its threshold (see
+`benchmarks.run`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .generate import SIZES, mutate, openapi_spec
+from .run import DEFAULT_SIZES, _environment, compare
+
+PHASES = ("load", "resolve", "normalize", "diff", "output")
+RSS_INTERVAL = 0.002
+_MB = 1024 * 1024
+
+
+def _rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _RssPeak:
+    """
+    Highest RSS seen since the last `reset()`, polled from a daemon thread.
+    """
+
+    def __init__(self, interval: float = RSS_INTERVAL) -> None:
+        self.interval = interval
+        self.peak = _rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = _rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def reset(self) -> Optional[int]:
+        """
+        The peak so far (including now); the next one starts from now.
+        """
+        now = _rss()
+        peak = self.peak if now is None or self.peak is None else max(self.peak, now)
+        self.peak = now
+        return peak
+
+    def __enter__(self) -> "_RssPeak":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _Phases:
+    def __init__(self, rss: _RssPeak, trace: bool) -> None:
+        self.rss = rss
+        self.trace = trace
+        self.results: dict[str, dict[str, Optional[int]]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0] if self.trace else 0
+        if self.trace:
+            tracemalloc.reset_peak()
+        self.rss.reset()
+        yield
+        peak = tracemalloc.get_traced_memory()[1] if self.trace else None
+        rss_peak = self.rss.reset()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0] if self.trace else None
+        self.results[name] = {
+            "peak": peak,
+            "retained": None if after is None else after - before,
+            "rss_peak": rss_peak,
+            "rss": _rss(),
+        }
+
+
+def _resolve_components(spec: dict) -> dict:
+    from schema_diff.openapi.resolver import resolve_schema
+
+    memo: dict = {}
+    for name in spec["components"]["schemas"]:
+        resolve_schema({"$ref": f"#/components/schemas/{name}"}, spec, cache=memo)
+    return memo
+
+
+def measure(size: str, *, trace: bool = True) -> dict:
+    """
+    Run the pipeline on `size` in this process. Numbers are only meaningful
+    in a fresh interpreter, which is what `main()` uses.
+    """
+    from schema_diff.loader import load_schema
+    from schema_diff.openapi.diff import diff_normalized
+    from schema_diff.openapi.normalizer import normalize_openapi
+    from schema_diff.output import result_fields, write_json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = Path(tmp) / "old.json"
+        new_path = Path(tmp) / "new.json"
+        spec = openapi_spec(SIZES[size])
+        old_path.write_text(json.dumps(spec), encoding="utf-8")
+        new_path.write_text(
+            json.dumps(mutate(spec, seed=SIZES[size].seed + 1)), encoding="utf-8"
+        )
+        del spec
+        input_bytes = old_path.stat().st_size + new_path.stat().st_size
+
+        if trace:
+            tracemalloc.start()
+        try:
+            with _RssPeak() as rss:
+                phases = _Phases(rss, trace)
+                with phases.phase("load"):
+                    old = load_schema(old_path).raw
+                    new = load_schema(new_path).raw
+                with phases.phase("resolve"):
+                    memo = _resolve_components(old)
+                del memo
+                with phases.phase("normalize"):
+                    old_n = normalize_openapi(old)
+                    new_n = normalize_openapi(new)
+                with phases.phase("diff"):
+                    result = diff_normalized(old_n, new_n)
+                with phases.phase("output"):
+                    with (Path(tmp) / "report.json").open("w") as f:
+                        write_json(f, result_fields(result))
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+    return {
+        "input_bytes": input_bytes,
+        "changes": len(result.breaking) + len(result.non_breaking),
+        "phases": phases.results,
+    }
+
+
+def _measure_fresh(size: str, trace: bool) -> dict:
+    root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(root), env.get("PYTHONPATH")) if p
+    )
+    cmd = [sys.executable, "-m", "benchmarks.memory", "--worker", size]
+    if not trace:
+        cmd.append("--no-tracemalloc")
+    proc = subprocess.run(
+        cmd, cwd=str(root), env=env, text=True, capture_output=True, check=False
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"memory benchmark for {size!r} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout)
+
+
+def _mb(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value / _MB:.1f}"
+
+
+def _print_size(size: str, data: dict) -> None:
+    print(
+        f"\n{size}: {_mb(data['input_bytes'])} MB of input, "
+        f"{data['changes']} changes"
+    )
+    print(f"  {'phase':<10} {'peak':>10} {'retained':>10} {'rss peak':>10} {'rss':>10}")
+    for name, phase in data["phases"].items():
+        print(
+            f"  {name:<10} {_mb(phase['peak']):>10} {_mb(phase['retained']):>10} "
+            f"{_mb(phase['rss_peak']):>10} {_mb(phase['rss']):>10}"
+        )
+
+
+def scaling(runs: dict[str, dict], key: str = "peak") -> dict[str, list[tuple]]:
+    """
+    Per phase, `(size, value, exponent)` along the ladder. The exponent is
+    the log-log slope of `key` against input size from the previous size:
+    about 1 for linear growth, 2 for quadratic.
+    """
+    curves: dict[str, list[tuple]] = {}
+    sizes = list(runs)
+    for name in PHASES:
+        curve = []
+        for i, size in enumerate(sizes):
+            value = runs[size]["phases"][name][key]
+            exponent = None
+            if i and value:
+                prev = runs[sizes[i - 1]]
+                prev_value = prev["phases"][name][key]
+                grew = runs[size]["input_bytes"] / prev["input_bytes"]
+                if prev_value and grew > 1:
+                    exponent = math.log(value / prev_value) / math.log(grew)
+            curve.append((size, value, exponent))
+        curves[name] = curve
+    return curves
+
+
+def _print_scaling(runs: dict[str, dict], key: str) -> None:
+    curves = scaling(runs, key)
+    top = max((v for c in curves.values() for _, v, _ in c if v), default=0)
+    if not top:
+        return
+    print(f"\nscaling of {key.replace('_', ' ')} (MB, slope vs input size):")
+    for name, curve in curves.items():
+        print(f"  {name}")
+        for size, value, exponent in curve:
+            bar = "#" * round(40 * (value or 0) / top)
+            slope = "" if exponent is None else f"  ^{exponent:.2f}"
+            print(f"    {size:<8} {_mb(value):>9} {bar}{slope}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(DEFAULT_SIZES),
+        help=f"comma separated, from: {', '.join(SIZES)}",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="trace Python allocations (default: on)",
+    )
+    parser.add_argument(
+        "--max-rss-mb",
+        type=float,
+        default=None,
+        help="fail if any phase's RSS peak goes above this",
+    )
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against this file")
+    parser.add_argument(
+        "--threshold", type=float, default=None, help="allowed growth as a fraction"
+    )
+    parser.add_argument(
+        "--save-baseline", type=Path, help="write results as a new baseline"
+    )
+    parser.add_argument("--worker", metavar="SIZE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(measure(args.worker, trace=args.tracemalloc), sys.stdout)
+        return 0
+
+    sizes = tuple(s for s in args.sizes.split(",") if s)
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    runs = {}
+    for size in sizes:
+        runs[size] = _measure_fresh(size, args.tracemalloc)
+        _print_size(size, runs[size])
+    if len(runs) > 1:
+        _print_scaling(runs, "peak" if args.tracemalloc else "rss_peak")
+
+    results = {
+        f"{size}/{name}": phase
+        for size, data in runs.items()
+        for name, phase in data["phases"].items()
+    }
+    document = {"environment": _environment(), "results": results}
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.save_baseline is not None:
+        thresholds = {}
+        if args.save_baseline.exists():
+            thresholds = json.loads(args.save_baseline.read_text()).get(
+                "thresholds", {}
+            )
+        document = {**document, "thresholds": thresholds}
+        args.save_baseline.write_text(json.dumps(document, indent=2) + "\n")
+
+    failed = False
+    if args.max_rss_mb is not None:
+        for name, phase in results.items():
+            if (
+                phase["rss_peak"] is not None
+                and phase["rss_peak"] > args.max_rss_mb * _MB
+            ):
+                print(
+                    f"OVER LIMIT {name}: RSS peak {_mb(phase['rss_peak'])} MB "
+                    f"> {args.max_rss_mb:g} MB",
+                    file=sys.stderr,
+                )
+                failed = True
+
+    if args.baseline is not None:
+        stored = json.loads(args.baseline.read_text())
+        thresholds = dict(stored.get("thresholds", {}))
+        if args.threshold is not None:
+            thresholds["default"] = args.threshold
+        key = "peak" if args.tracemalloc else "rss_peak"
+        regressions = compare(results, stored.get("results", {}), thresholds, key)
+        for r in regressions:
+            print(
+                f"REGRESSION {r.name}: {key} {_mb(r.baseline)} MB -> "
+                f"{_mb(r.current)} MB ({r.ratio:.2f}x, limit {1 + r.threshold:.2f}x)",
+                file=sys.stderr,
+            )
+        if not regressions:
+            print(f"\nNo regressions against {args.baseline}.")
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
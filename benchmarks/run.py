@@ -0,0 +1,319 @@
+"""
+Timed scenarios over the synthetic size ladder, with baseline comparison.
+
+    python -m benchmarks.run                          # small, medium, large
+    python -m benchmarks.run --sizes xlarge --scenarios diff,normalize
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+
+A scenario regresses when its median exceeds the baseline median by more than
+its threshold: `--threshold`, or a per-scenario entry in the baseline's
+"thresholds" (e.g. {"default": 0.25, "large/diff": 0.1}). Exits 1 on
+regressions. Baselines are machine specific: record them on the machine (or CI
+runner type) that checks them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from schema_diff._version import package_version
+from schema_diff.diff import diff_objects
+from schema_diff.loader import parse_document
+from schema_diff.models import DiffResult
+from schema_diff.openapi.diff import diff_normalized, diff_openapi
+from schema_diff.openapi.normalizer import NormalizedOpenAPI, normalize_openapi
+from schema_diff.openapi.resolver import resolve_schema
+from schema_diff.output import result_fields, write_json, write_plain
+
+from .generate import (
+    JSON_SIZES,
+    SIZES,
+    json_document,
+    mutate,
+    mutate_json,
+    openapi_spec,
+)
+
+DEFAULT_SIZES = ("small", "medium", "large")
+DEFAULT_THRESHOLD = 0.25
+
+
+class Inputs:
+    """
+    Inputs for one size, built on first use and shared by its scenarios.
+    """
+
+    def __init__(self, size: str) -> None:
+        self.size = size
+
+    @cached_property
+    def old(self) -> dict:
+        return openapi_spec(SIZES[self.size])
+
+    @cached_property
+    def new(self) -> dict:
+        return mutate(self.old, seed=SIZES[self.size].seed + 1)
+
+    @cached_property
+    def old_json(self) -> str:
+        return json.dumps(self.old)
+
+    @cached_property
+    def old_yaml(self) -> str:
+        import yaml  # type: ignore
+
+        return yaml.safe_dump(self.old, sort_keys=False)
+
+    @cached_property
+    def old_normalized(self) -> NormalizedOpenAPI:
+        return normalize_openapi(self.old)
+
+    @cached_property
+    def new_normalized(self) -> NormalizedOpenAPI:
+        return normalize_openapi(self.new)
+
+    @cached_property
+    def result(self) -> DiffResult:
+        return diff_normalized(self.old_normalized, self.new_normalized)
+
+    @cached_property
+    def document(self) -> dict:
+        depth, width = JSON_SIZES[self.size]
+        return json_document(depth, width)
+
+    @cached_property
+    def document_new(self) -> Any:
+        return mutate_json(self.document)
+
+
+def _resolve_components(spec: dict) -> None:
+    memo: dict = {}
+    for name in spec["components"]["schemas"]:
+        resolve_schema({"$ref": f"#/components/schemas/{name}"}, spec, cache=memo)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    run: Callable[[Inputs], Any]
+    # evaluated (untimed) before the first run, e.g. to build shared inputs
+    prepare: Callable[[Inputs], Any] = lambda inputs: None
+    sizes: Optional[tuple[str, ...]] = None  # None: every size
+
+
+SCENARIOS = (
+    Scenario(
+        "load",
+        lambda i: parse_document(i.old_json, Path("old.json")),
+        prepare=lambda i: i.old_json,
+    ),
+    # PyYAML is slow enough that bigger sizes only measure PyYAML
+    Scenario(
+        "load_yaml",
+        lambda i: parse_document(i.old_yaml, Path("old.yaml")),
+        prepare=lambda i: i.old_yaml,
+        sizes=("small", "medium"),
+    ),
+    Scenario("resolve", lambda i: _resolve_components(i.old), prepare=lambda i: i.old),
+    Scenario("normalize", lambda i: normalize_openapi(i.old), prepare=lambda i: i.old),
+    Scenario(
+        "diff",
+        lambda i: diff_normalized(i.old_normalized, i.new_normalized),
+        prepare=lambda i: (i.old_normalized, i.new_normalized),
+    ),
+    # component first, from the raw documents
+    Scenario(
+        "diff_openapi",
+        lambda i: diff_openapi(i.old, i.new),
+        prepare=lambda i: (i.old, i.new),
+    ),
+    Scenario(
+        "render_json",
+        lambda i: write_json(io.StringIO(), result_fields(i.result)),
+        prepare=lambda i: i.result,
+    ),
+    Scenario(
+        "render_plain",
+        lambda i: write_plain(io.StringIO(), i.result),
+        prepare=lambda i: i.result,
+    ),
+    Scenario(
+        "diff_json",
+        lambda i: diff_objects(i.document, i.document_new),
+        prepare=lambda i: (i.document, i.document_new),
+    ),
+)
+
+
+def measure(scenario: Scenario, inputs: Inputs, repeat: int) -> dict[str, float]:
+    """
+    Seconds per run: min and median of `repeat` runs.
+    """
+    scenario.prepare(inputs)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        scenario.run(inputs)
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def run(
+    sizes: tuple[str, ...],
+    names: Optional[set[str]] = None,
+    *,
+    repeat: int = 5,
+    log: Optional[Callable[[str], None]] = None,
+) -> dict[str, dict[str, float]]:
+    """
+    {"<size>/<scenario>": {"min": s, "median": s}} for the selected scenarios.
+    """
+    results = {}
+    for size in sizes:
+        inputs = Inputs(size)
+        for scenario in SCENARIOS:
+            if names is not None and scenario.name not in names:
+                continue
+            if scenario.sizes is not None and size not in scenario.sizes:
+                continue
+            if scenario.name == "load_yaml" and not _has_yaml():
+                continue
+            key = f"{size}/{scenario.name}"
+            results[key] = measure(scenario, inputs, repeat)
+            if log is not None:
+                log(f"{key:<24} {results[key]['median'] * 1000:>10.2f} ms")
+    return results
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    thresholds: dict[str, float],
+    key: str = "median",
+) -> list[Regression]:
+    """
+    Scenarios whose `key` measurement grew past their threshold. Scenarios
+    missing from either side are ignored.
+    """
+    default = thresholds.get("default", DEFAULT_THRESHOLD)
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get(key):
+            continue
+        threshold = thresholds.get(name, default)
+        if current[key] > base[key] * (1 + threshold):
+            regressions.append(Regression(name, base[key], current[key], threshold))
+    return regressions
+
+
+def _has_yaml() -> bool:
+    try:
+        import yaml  # type: ignore # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _environment() -> dict[str, str]:
+    return {
+        "schema_diff": package_version(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(DEFAULT_SIZES),
+        help=f"comma separated, from: {', '.join(SIZES)}",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help=f"comma separated, from: {', '.join(s.name for s in SCENARIOS)}",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"allowed slowdown as a fraction (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--save-baseline", type=Path, help="write results as a new baseline"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = tuple(s for s in args.sizes.split(",") if s)
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+    names = set(args.scenarios.split(",")) if args.scenarios else None
+
+    results = run(sizes, names, repeat=args.repeat, log=print)
+    document = {"environment": _environment(), "results": results}
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.save_baseline is not None:
+        thresholds = {}
+        if args.save_baseline.exists():
+            thresholds = json.loads(args.save_baseline.read_text()).get(
+                "thresholds", {}
+            )
+        document = {**document, "thresholds": thresholds}
+        args.save_baseline.write_text(json.dumps(document, indent=2) + "\n")
+
+    if args.baseline is None:
+        return 0
+
+    stored = json.loads(args.baseline.read_text())
+    thresholds = dict(stored.get("thresholds", {}))
+    if args.threshold is not None:
+        thresholds["default"] = args.threshold
+    regressions = compare(results, stored.get("results", {}), thresholds)
+    for r in regressions:
+        print(
+            f"REGRESSION {r.name}: {r.baseline * 1000:.2f} ms -> "
+            f"{r.current * 1000:.2f} ms ({r.ratio:.2f}x, limit {1 + r.threshold:.2f}x)",
+            file=sys.stderr,
+        )
+    if not regressions:
+        print(f"No regressions against {args.baseline}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Detect breaking changes between API schemas (OpenAPI / JSON Schema).
+
+The public API is re-exported lazily: `import schema_diff` is free, and each
+name imports its module on first access.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "Change": ".models",
+    "ChangeSeverity": ".models",
+    "ChangeType": ".models",
+    "DiffResult": ".models",
+    "SchemaDiffer": ".differ",
+    "diff_json_schema_document": ".json_schema",
+    "diff_objects": ".diff",
+    "diff_openapi": ".openapi.diff",
+    "load_schema": ".loader",
+}
+
+__all__ = [
+    "Change",
+    "ChangeSeverity",
+    "ChangeType",
+    "DiffResult",
+    "SchemaDiffer",
+    "diff_json_schema_document",
+    "diff_objects",
+    "diff_openapi",
+    "load_schema",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return __all__
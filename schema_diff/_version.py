@@ -0,0 +1,11 @@
+def package_version() -> str:
+    """
+    Installed version of api-schema-diff (fallback when running from a checkout
+    without package metadata).
+    """
+    try:
+        from importlib.metadata import version
+
+        return version("api-schema-diff")
+    except Exception:
+        return "0.1.0"  # fallback version
@@ -0,0 +1,166 @@
+"""
+asyncio variants of the public API.
+
+File reads, parsing and diffing run in an executor (the event loop's default
+one unless `executor` is given), so the loop keeps serving other requests
+while a large spec is processed:
+
+    result = await aio.diff_files(old, new, timeout=10)
+
+With a thread pool executor, cancelling the awaiting task (or hitting
+`timeout`) also stops the worker at its next checkpoint (see
+`schema_diff.cancellation`), so abandoned work does not keep holding the GIL.
+A `ProcessPoolExecutor` takes CPU-heavy work off the loop's interpreter
+entirely; there, cancellation only stops the waiting, and `diff` (which
+needs a shared `SchemaDiffer`) is not supported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, TypeVar
+
+from .cancellation import CancelToken, cancellable
+
+if TYPE_CHECKING:
+    from .differ import SchemaDiffer, Source
+    from .loader import LoadedSchema
+    from .models import DiffResult
+    from .rules import RuleSet
+
+T = TypeVar("T")
+
+
+async def _run(
+    executor: Optional[Executor],
+    timeout: Optional[float],
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if isinstance(executor, ProcessPoolExecutor):
+        return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+
+    token = CancelToken()
+
+    def work() -> T:
+        with cancellable(token):
+            return call()
+
+    # the caller's context, e.g. an active `profiling.profile()`
+    context = contextvars.copy_context()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(executor, context.run, work), timeout
+        )
+    finally:
+        # no-op once finished; stops the worker on cancellation or timeout
+        token.cancel()
+
+
+def _load(path: Path) -> "LoadedSchema":
+    from .loader import load_schema as load
+
+    return load(path)
+
+
+def _diff_objects(old: Any, new: Any, rules: "Optional[RuleSet]") -> "DiffResult":
+    from .diff import diff_objects as diff
+
+    return diff(old, new, rules=rules)
+
+
+def _diff_openapi(
+    old_raw: Mapping[str, Any], new_raw: Mapping[str, Any], rules: "Optional[RuleSet]"
+) -> "DiffResult":
+    from .openapi.diff import diff_openapi as diff
+
+    return diff(old_raw, new_raw, rules=rules)
+
+
+def _diff_files(
+    old_file: Path, new_file: Path, rules: "Optional[RuleSet]"
+) -> "DiffResult":
+    from .loader import diff_loaded
+
+    return diff_loaded(_load(old_file), _load(new_file), rules=rules)
+
+
+async def load_schema(
+    path: Path,
+    *,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> "LoadedSchema":
+    """
+    `schema_diff.load_schema`, read and parsed in `executor`.
+    """
+    return await _run(executor, timeout, _load, Path(path))
+
+
+async def diff_objects(
+    old: Any,
+    new: Any,
+    *,
+    rules: "Optional[RuleSet]" = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> "DiffResult":
+    """
+    `schema_diff.diff_objects`, run in `executor`.
+    """
+    return await _run(executor, timeout, _diff_objects, old, new, rules)
+
+
+async def diff_openapi(
+    old_raw: Mapping[str, Any],
+    new_raw: Mapping[str, Any],
+    *,
+    rules: "Optional[RuleSet]" = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> "DiffResult":
+    """
+    `schema_diff.diff_openapi`, run in `executor`.
+    """
+    return await _run(executor, timeout, _diff_openapi, old_raw, new_raw, rules)
+
+
+async def diff_files(
+    old_file: Path,
+    new_file: Path,
+    *,
+    rules: "Optional[RuleSet]" = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> "DiffResult":
+    """
+    Load two files and diff them (OpenAPI or JSON Schema against their own
+    kind, generic otherwise), as one job in `executor`.
+    """
+    return await _run(
+        executor, timeout, _diff_files, Path(old_file), Path(new_file), rules
+    )
+
+
+async def diff(
+    differ: "SchemaDiffer",
+    old: "Source",
+    new: "Source",
+    *,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> "DiffResult":
+    """
+    `differ.diff(old, new)` in a thread of `executor`, sharing the differ's
+    caches between requests.
+    """
+    if isinstance(executor, ProcessPoolExecutor):
+        raise TypeError("A SchemaDiffer cannot be shared with a process pool")
+    return await _run(executor, timeout, differ.diff, old, new)
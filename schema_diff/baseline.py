@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+from .models import Change, DiffResult
+
+BASELINE_VERSION = 1
+
+
+def load_baseline(path: Path) -> frozenset[str]:
+    """
+    Fingerprints of the accepted changes in a baseline file (see
+    `write_baseline`), for `RuleSet.with_baseline`.
+    """
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ValueError(f"{path}: not a JSON baseline file ({e})") from None
+    entries = data.get("accepted") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a top-level 'accepted' list")
+    version = data.get("version", BASELINE_VERSION)
+    if version != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {version!r}")
+
+    fingerprints = set()
+    for i, entry in enumerate(entries):
+        fingerprint = entry.get("fingerprint") if isinstance(entry, dict) else None
+        if not isinstance(fingerprint, str):
+            raise ValueError(f"{path}: accepted[{i}]: expected a 'fingerprint'")
+        fingerprints.add(fingerprint)
+    return frozenset(fingerprints)
+
+
+def baseline_entries(changes: Iterable[Change]) -> list[dict]:
+    """
+    One entry per distinct fingerprint, sorted by path so that regenerated
+    files diff cleanly under version control. Everything but the
+    fingerprint is there for reviewers.
+    """
+    entries = {}
+    for change in changes:
+        entries.setdefault(
+            change.fingerprint, {"fingerprint": change.fingerprint, **change.to_dict()}
+        )
+    return sorted(entries.values(), key=lambda e: (e["path"], e["fingerprint"]))
+
+
+def write_baseline(path: Path, result: DiffResult) -> int:
+    """
+    Accept every breaking change of `result`: (re)write `path` and return the
+    number of entries. The file is replaced atomically.
+    """
+    path = Path(path)
+    entries = baseline_entries(result.breaking)
+    payload = json.dumps(
+        {"version": BASELINE_VERSION, "accepted": entries}, indent=2, sort_keys=True
+    )
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return len(entries)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class Cancelled(RuntimeError):
+    """
+    Raised at a checkpoint once the work's `CancelToken` was cancelled.
+    """
+
+
+class CancelToken:
+    """
+    Cooperative cancellation for work running in another thread.
+
+    The engine calls `checkpoint()` between units of work (path items,
+    operations, object nodes); once `cancel()` is called the next checkpoint
+    raises `Cancelled`, so a worker thread stops instead of finishing a diff
+    nobody waits for.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+_TOKEN: ContextVar[Optional[CancelToken]] = ContextVar(
+    "schema_diff_cancel_token", default=None
+)
+
+
+@contextmanager
+def cancellable(token: CancelToken) -> Iterator[CancelToken]:
+    """
+    Make `checkpoint()` observe `token` in the current context.
+    """
+    reset = _TOKEN.set(token)
+    try:
+        yield token
+    finally:
+        _TOKEN.reset(reset)
+
+
+def checkpoint() -> None:
+    """
+    Raise `Cancelled` if the current work was cancelled; free otherwise.
+    """
+    token = _TOKEN.get()
+    if token is not None and token.cancelled:
+        raise Cancelled("Cancelled")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import marshal
+from typing import Any, Mapping, Optional
+
+from .profiling import timed
+
+
+@timed("canonicalize")
+def canonicalize_pair(
+    old_raw: Mapping[str, Any], new_raw: Mapping[str, Any]
+) -> tuple[Any, Any]:
+    """
+    Two versions of one document, canonicalized only where they differ.
+
+    Folded forms, in any schema:
+      - `type: [T, "null"]` (OpenAPI 3.1 / JSON Schema) -> `type: T` plus
+        `nullable: true` (OpenAPI 3.0); several non-null types are sorted
+      - `nullable: false` -> omitted (the default)
+      - `required`: duplicates dropped, sorted
+
+    Equal subtrees (see `same_json`) are not folded, as they would fold the
+    same way on both sides, but shared: the new side gets the old side's
+    object, so later comparisons stop at `is`. Everything else is folded,
+    sharing the subtrees without anything to fold. The results are equal
+    exactly when the documents are equivalent (key order never matters), at
+    a cost that grows with the size of the edit rather than of the
+    documents.
+    """
+    if same_json(old_raw, new_raw):
+        return old_raw, old_raw
+    return _pair(old_raw, new_raw)
+
+
+def same_json(a: Any, b: Any) -> bool:
+    """
+    `a == b` as JSON sees it: unlike for Python, `true` is not `1` and
+    `false` is not `0`.
+
+    Costs about one `==` plus one `marshal.dumps` per side (which spells
+    booleans and numbers apart); only values whose encodings differ anyway
+    (key order, `1` and `1.0`, non-JSON leaves) are walked in Python.
+    """
+    if a is b:
+        return True
+    if a != b:
+        return False
+    try:
+        if marshal.dumps(a) == marshal.dumps(b):
+            return True
+    except ValueError:
+        pass
+    return _same(a, b)
+
+
+def _same(a: Any, b: Any) -> bool:
+    # only called on values that are `==`: same keys, same lengths
+    if isinstance(a, dict):
+        return isinstance(b, dict) and all(_same(v, b[k]) for k, v in a.items())
+    if isinstance(a, list):
+        return isinstance(b, list) and all(map(_same, a, b))
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b)
+    return True
+
+
+def _pair(old: Any, new: Any) -> tuple[Any, Any]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        old_out, new_out = dict(old), dict(new)
+        for key, value in old.items():
+            if key not in new:
+                old_out[key] = _canonical(value)
+            elif same_json(value, new[key]):
+                new_out[key] = value
+            else:
+                old_out[key], new_out[key] = _pair(value, new[key])
+        for key, value in new.items():
+            if key not in old:
+                new_out[key] = _canonical(value)
+        return fold_schema(old_out), fold_schema(new_out)
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        pairs = [(a, a) if same_json(a, b) else _pair(a, b) for a, b in zip(old, new)]
+        return [a for a, _ in pairs], [b for _, b in pairs]
+    return _canonical(old), _canonical(new)
+
+
+def fold_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    `schema` with its equivalent spellings folded (see `canonicalize_pair`); the
+    same object when there is nothing to fold, else a shallow copy.
+    """
+    out: Optional[dict[str, Any]] = None
+    types = schema.get("type")
+    if isinstance(types, list) and all(isinstance(t, str) for t in types):
+        out = dict(schema)
+        named = sorted(set(types) - {"null"})
+        if "null" in types and named:
+            out["nullable"] = True
+        out["type"] = named[0] if len(named) == 1 else (named or "null")
+    if schema.get("nullable") is False:
+        out = dict(schema) if out is None else out
+        del out["nullable"]
+    required = schema.get("required")
+    if isinstance(required, list) and all(isinstance(r, str) for r in required):
+        names = sorted(set(required))
+        if names != required:
+            out = dict(schema) if out is None else out
+            out["required"] = names
+    return schema if out is None else out
+
+
+def _canonical(node: Any) -> Any:
+    if isinstance(node, list):
+        items = [_canonical(item) for item in node]
+        if all(a is b for a, b in zip(items, node)):
+            return node
+        return items
+    if not isinstance(node, dict):
+        return node
+
+    out = node
+    for key, value in node.items():
+        folded = _canonical(value)
+        if folded is not value:
+            if out is node:
+                out = dict(node)
+            out[key] = folded
+    return fold_schema(out)
@@ -1,34 +1,67 @@
-import json
+import functools
+import sys
 from pathlib import Path
-from typing import Optional
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
+from typer.core import TyperGroup
 
-from .diff import diff_objects
-from .loader import load_schema, SchemaKind
-from .models import DiffResult
-from .openapi.diff import diff_openapi
+from ._version import package_version
+from .loader import diff_loaded, load_schema, SchemaKind
+from .profiling import phase, profile
 
-app = typer.Typer(add_completion=False)
-console = Console()
+# Everything else is imported where it is used: rich only for text output, the
+# differs only once the inputs are loaded, so `--help`, `--version` and the
+# machine-readable formats do not pay for what they never touch.
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from .models import DiffMetrics, DiffResult
+    from .output import Field
+    from .profiling import Profile
+    from .replay import ReplayReport
+    from .rules import RuleSet
+    from .shard import Shard
+
+
+class _DefaultCommandGroup(TyperGroup):
+    """
+    Run the `diff` command when no subcommand is named, so that
+    `api-schema-diff OLD NEW` keeps working next to `api-schema-diff serve`.
+    """
+
+    default_command = "diff"
+
+    def parse_args(self, ctx, args):
+        if not args or (
+            args[0] not in self.commands and args[0] not in ctx.help_option_names
+        ):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(add_completion=False, cls=_DefaultCommandGroup)
+
+
+@functools.lru_cache(maxsize=None)
+def _console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
+_MACHINE_FORMATS = ("json", "ndjson")
 
 
 def version_callback(value: bool):
     """Callback for --version flag."""
     if value:
-        try:
-            from importlib.metadata import version
-
-            pkg_version = version("api-schema-diff")
-        except Exception:
-            pkg_version = "0.1.0"  # fallback version
-        console.print(f"api-schema-diff version {pkg_version}")
+        typer.echo(f"api-schema-diff version {package_version()}")
         raise typer.Exit()
 
 
-@app.command()
+@app.command("diff")
 def main(
     old_file: Path = typer.Argument(
         ..., exists=True, readable=True, help="Old schema/file (JSON or YAML)"
@@ -36,12 +69,115 @@ def main(
     new_file: Path = typer.Argument(
         ..., exists=True, readable=True, help="New schema/file (JSON or YAML)"
     ),
-    format: str = typer.Option("text", "--format", help="Output format: text|json"),
+    format: str = typer.Option(
+        "text", "--format", help="Output format: text|plain|json|ndjson"
+    ),
+    summary: bool = typer.Option(
+        False,
+        "--summary",
+        help="Report counts per operation and change type instead of every change.",
+    ),
+    summary_top: int = typer.Option(
+        3, "--summary-top", min=0, help="Sample changes shown per --summary group."
+    ),
+    compact: bool = typer.Option(
+        False,
+        "--compact",
+        help=(
+            "Report each change inside a shared OpenAPI component once, under "
+            "components.schemas.<Name>, with the operations it affects."
+        ),
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Write the json/ndjson report to this file instead of stdout.",
+    ),
     fail_on_breaking: bool = typer.Option(
         True,
         "--fail-on-breaking/--no-fail-on-breaking",
         help="Exit with code 1 when breaking changes are found (default: true).",
     ),
+    against: Optional[List[Path]] = typer.Option(
+        None,
+        "--against",
+        exists=True,
+        readable=True,
+        help=(
+            "Additional baseline to check NEW_FILE against (repeatable). "
+            "OLD_FILE and every --against file are diffed concurrently."
+        ),
+    ),
+    rules_file: Optional[Path] = typer.Option(
+        None,
+        "--rules",
+        exists=True,
+        readable=True,
+        help="Severity overrides (JSON or YAML) applied on top of the default rules.",
+    ),
+    baseline_file: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        exists=True,
+        readable=True,
+        help=(
+            "Drop changes accepted in this baseline file (see the `baseline` "
+            "command)."
+        ),
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        "--cache-dir",
+        envvar="SCHEMA_DIFF_CACHE_DIR",
+        help="Reuse results of identical diffs stored in this directory.",
+    ),
+    cache_max_mb: int = typer.Option(
+        64, "--cache-max-mb", min=1, help="Size limit of --cache-dir in MiB."
+    ),
+    profile_: bool = typer.Option(
+        False,
+        "--profile",
+        help=(
+            "Report wall/CPU time and allocated blocks per phase (read, parse, "
+            "canonicalize, resolve, normalize, diff, render): on stderr, or as "
+            "`timings` in JSON."
+        ),
+    ),
+    profile_out: Optional[Path] = typer.Option(
+        None,
+        "--profile-out",
+        help=(
+            "Run under the built-in sampling profiler and write the stacks here: "
+            "speedscope JSON for *.json, collapsed stacks (flamegraph.pl) otherwise."
+        ),
+    ),
+    metrics: bool = typer.Option(
+        False,
+        "--metrics",
+        help=(
+            "Report engine work counters (resolver calls, $ref cache hits, nodes "
+            "visited, depth, truncations): on stderr, or as `metrics` in JSON."
+        ),
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        help=(
+            "Keep running and re-diff whenever OLD_FILE or NEW_FILE changes, "
+            "re-normalizing only the path items an edit affects."
+        ),
+    ),
+    shard_: Optional[str] = typer.Option(
+        None,
+        "--shard",
+        metavar="I/N",
+        help=(
+            "Diff only the OpenAPI operations of shard I of N (by a stable hash "
+            "of the operation key) and write a partial result for `merge`. "
+            "Requires --format json."
+        ),
+    ),
     version: Optional[bool] = typer.Option(
         None,
         "--version",
@@ -60,28 +196,352 @@ def main(
     With --no-fail-on-breaking:
       always exits 0 (report-only mode)
     """
+    fmt = format.lower()
+    if output is not None and fmt not in _MACHINE_FORMATS:
+        raise typer.BadParameter(
+            "--output requires --format json or ndjson", param_hint="--output"
+        )
+    if summary and against:
+        raise typer.BadParameter(
+            "--summary cannot be combined with --against", param_hint="--summary"
+        )
+    for flag, enabled in (
+        ("--cache-dir", cache_dir is not None),
+        ("--profile", profile_),
+        ("--metrics", metrics),
+        ("--compact", compact),
+    ):
+        if enabled and against:
+            raise typer.BadParameter(
+                f"{flag} cannot be combined with --against", param_hint=flag
+            )
+    if watch:
+        for flag, enabled in (
+            ("--against", bool(against)),
+            ("--cache-dir", cache_dir is not None),
+            ("--profile", profile_),
+            ("--metrics", metrics),
+            ("--compact", compact),
+        ):
+            if enabled:
+                raise typer.BadParameter(
+                    f"{flag} cannot be combined with --watch", param_hint=flag
+                )
+    shard = _parse_shard(shard_, fmt, summary, compact, bool(against), watch)
+    if shard is not None:
+        for flag, enabled in (
+            ("--cache-dir", cache_dir is not None),
+            ("--profile", profile_),
+            ("--metrics", metrics),
+        ):
+            if enabled:
+                raise typer.BadParameter(
+                    f"{flag} cannot be combined with --shard", param_hint=flag
+                )
+    rules = _with_baseline(_load_rules(rules_file), baseline_file)
+
+    sampler = None
+    if profile_out is not None:
+        from .sampling import Sampler
+
+        sampler = Sampler()
+        sampler.start()
+    try:
+        if watch:
+            _run_watch(
+                old_file,
+                new_file,
+                rules,
+                fmt,
+                output,
+                summary,
+                summary_top,
+                fail_on_breaking,
+            )
+        if shard is not None:
+            _run_shard(
+                old_file,
+                new_file,
+                shard,
+                rules,
+                _input_options(rules_file, baseline_file),
+                output,
+                fail_on_breaking,
+            )
+        if against:
+            _run_window(
+                old_file, new_file, against, fmt, fail_on_breaking, rules, output
+            )
+
+        with profile() if profile_ else nullcontext() as prof:
+            old_kind, new_kind, result = _cached_diff(
+                old_file,
+                new_file,
+                rules,
+                _input_options(rules_file, baseline_file),
+                cache_dir,
+                cache_max_mb,
+                compact,
+            )
+            with phase("render"):
+                _render(
+                    result,
+                    old_kind,
+                    new_kind,
+                    fmt,
+                    output,
+                    summary,
+                    summary_top,
+                    prof,
+                    result.metrics if metrics else None,
+                )
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(profile_out)
+
+    if fmt != "json":
+        if prof is not None:
+            _print_timings(prof)
+        if metrics:
+            _print_metrics(result.metrics)
+
+    exit_code = result.exit_code() if fail_on_breaking else 0
+    raise typer.Exit(code=exit_code)
+
+
+def _parse_shard(
+    text: Optional[str],
+    fmt: str,
+    summary: bool,
+    compact: bool,
+    against: bool,
+    watch: bool,
+) -> "Optional[Shard]":
+    if text is None:
+        return None
+
+    from .shard import Shard
+
+    try:
+        shard = Shard.parse(text)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard") from e
+    if fmt != "json":
+        raise typer.BadParameter("--shard requires --format json", param_hint="--shard")
+    for flag, enabled in (
+        ("--summary", summary),
+        ("--compact", compact),
+        ("--against", against),
+        ("--watch", watch),
+    ):
+        if enabled:
+            raise typer.BadParameter(
+                f"{flag} cannot be combined with --shard", param_hint=flag
+            )
+    return shard
+
+
+def _run_shard(
+    old_file: Path,
+    new_file: Path,
+    shard: "Shard",
+    rules: "Optional[RuleSet]",
+    options: dict,
+    output: Optional[Path],
+    fail_on_breaking: bool,
+) -> None:
+    """
+    Write the partial result of one shard; exit 1 if it has breaking changes.
+    """
+    from .openapi.diff import diff_openapi_shard, diff_shard
+    from .output import partial_fields
+    from .result_cache import ResultCache, file_digest
+
     old_loaded = load_schema(old_file)
     new_loaded = load_schema(new_file)
+    if old_loaded.kind != SchemaKind.OPENAPI or new_loaded.kind != SchemaKind.OPENAPI:
+        raise typer.BadParameter(
+            "--shard requires two OpenAPI documents", param_hint="--shard"
+        )
+    if old_loaded.normalized is None and new_loaded.normalized is None:
+        partial = diff_openapi_shard(old_loaded.raw, new_loaded.raw, shard, rules=rules)
+    else:
+        partial = diff_shard(
+            old_loaded.normalize(), new_loaded.normalize(), shard, rules=rules
+        )
 
-    if format.lower() != "json":
-        console.print(
-            f"[dim]Old schema:[/dim] {old_loaded.kind.value}  "
-            f"[dim]New schema:[/dim] {new_loaded.kind.value}"
+    # only partials of the same inputs and options can be merged
+    partial.inputs = ResultCache.key(
+        file_digest(old_file), file_digest(new_file), options
+    )
+    partial.old_kind = old_loaded.kind.value
+    partial.new_kind = new_loaded.kind.value
+    _write_report("json", output, partial_fields(partial), iter(()))
+
+    exit_code = partial.exit_code() if fail_on_breaking else 0
+    raise typer.Exit(code=exit_code)
+
+
+def _run_watch(
+    old_file: Path,
+    new_file: Path,
+    rules: "Optional[RuleSet]",
+    fmt: str,
+    output: Optional[Path],
+    summary: bool,
+    summary_top: int,
+    fail_on_breaking: bool,
+) -> None:
+    """
+    Render every new result until interrupted, then exit with the code of the
+    last one. Status lines go to stderr.
+    """
+    import gc
+
+    from .watch import WatchSession, watch
+
+    class FrozenSession(WatchSession):
+        def refresh(self):
+            # This process only holds the loaded documents. Moving them out of
+            # the collector's generations while the next version is parsed
+            # spares full collections over them (about 3x faster re-diffs of
+            # large specs); unfrozen right after, so nothing stays frozen.
+            gc.freeze()
+            try:
+                return super().refresh()
+            finally:
+                gc.unfreeze()
+
+    err = sys.stderr
+    last: list = []
+
+    def on_update(update) -> None:
+        if last and fmt not in _MACHINE_FORMATS:
+            sys.stdout.write("\n" + "-" * 72 + "\n")
+        _render(
+            update.result,
+            update.old_kind,
+            update.new_kind,
+            fmt,
+            output,
+            summary,
+            summary_top,
+            None,
+            None,
         )
+        sys.stdout.flush()
+        last[:] = [update.result]
+        detail = ""
+        if update.path_items:
+            detail = (
+                f", {update.renormalized}/{update.path_items} path items normalized"
+            )
+        err.write(
+            f"[watch] diffed in {update.elapsed * 1000:.0f} ms{detail}; "
+            "waiting for changes (Ctrl-C to stop)\n"
+        )
+        err.flush()
 
-    if old_loaded.kind == SchemaKind.OPENAPI and new_loaded.kind == SchemaKind.OPENAPI:
-        result: DiffResult = diff_openapi(old_loaded.raw, new_loaded.raw)
-    else:
-        result = diff_objects(old_loaded.raw, new_loaded.raw)
+    def on_error(error: Exception) -> None:
+        err.write(f"[watch] {error}\n")
+        err.flush()
+
+    try:
+        watch(
+            FrozenSession(old_file, new_file, rules=rules), on_update, on_error=on_error
+        )
+    except KeyboardInterrupt:
+        pass
+    exit_code = last[0].exit_code() if last and fail_on_breaking else 0
+    raise typer.Exit(code=exit_code)
 
-    exit_code = result.exit_code()
-    if not fail_on_breaking:
-        exit_code = 0
 
-    if format.lower() == "json":
-        console.print_json(json.dumps(result.to_dict()))
-        raise typer.Exit(code=exit_code)
+def _cached_diff(
+    old_file: Path,
+    new_file: Path,
+    rules: "Optional[RuleSet]",
+    options: dict,
+    cache_dir: Optional[Path],
+    cache_max_mb: int,
+    compact: bool = False,
+) -> "tuple[str, str, DiffResult]":
+    if cache_dir is None:
+        return _diff_files(old_file, new_file, rules, compact)
+
+    from .result_cache import ResultCache, file_digest
+
+    cache = ResultCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024)
+    if compact:
+        options = {**options, "compact": True}
+    key = ResultCache.key(file_digest(old_file), file_digest(new_file), options)
+    entry = cache.get(key)
+    if entry is None:
+        old_kind, new_kind, result = _diff_files(old_file, new_file, rules, compact)
+        result.metrics.result_cache_misses = 1
+        cache.put(key, result, old_kind=old_kind, new_kind=new_kind)
+        return old_kind, new_kind, result
+    # the other counters are those of the run that stored the entry
+    result = entry["result"]
+    result.metrics.result_cache_hits = 1
+    result.metrics.result_cache_misses = 0
+    return entry["old_kind"], entry["new_kind"], result
+
+
+def _render(
+    result: "DiffResult",
+    old_kind: str,
+    new_kind: str,
+    fmt: str,
+    output: Optional[Path],
+    summary: bool,
+    summary_top: int,
+    prof: "Optional[Profile]",
+    metrics: "Optional[DiffMetrics]",
+) -> None:
+    if fmt == "plain":
+        sys.stdout.write(f"Old schema: {old_kind}  New schema: {new_kind}\n\n")
+    elif fmt not in _MACHINE_FORMATS:
+        _console().print(
+            f"[dim]Old schema:[/dim] {old_kind}  [dim]New schema:[/dim] {new_kind}"
+        )
+
+    if summary:
+        from .output import write_summary
+        from .summary import summarize
 
+        groups = summarize(result, top_k=summary_top)
+        if fmt in _MACHINE_FORMATS:
+            records = (g.to_dict() for g in groups)
+            fields = [("summary", records)]
+            fields = _with_diagnostics(fields, prof, metrics)
+            _write_report(fmt, output, fields, records)
+        else:
+            write_summary(sys.stdout, groups)
+        return
+
+    if fmt in _MACHINE_FORMATS:
+        from .output import result_fields, result_records
+
+        fields = _with_diagnostics(result_fields(result), prof, metrics)
+        _write_report(fmt, output, fields, result_records(result))
+        return
+
+    if fmt == "plain":
+        from .output import write_plain
+
+        write_plain(sys.stdout, result)
+        return
+
+    from rich.table import Table
+
+    from .output import affected_summary
+
+    console = _console()
+    # only --compact results have component changes with affected operations
+    affected = any(
+        c.affected is not None for c in (*result.breaking, *result.non_breaking)
+    )
     if result.has_breaking_changes():
         console.print("\n[bold red]BREAKING CHANGES FOUND[/bold red]\n")
         t = Table(show_header=True, header_style="bold red")
@@ -90,14 +550,19 @@ def main(
         t.add_column("Old Type")
         t.add_column("New Type")
         t.add_column("Message")
+        if affected:
+            t.add_column("Affected")
         for c in result.breaking:
-            t.add_row(
+            row = [
                 c.change_type.value,
                 c.path,
                 c.old_type or "",
                 c.new_type or "",
                 c.message or "",
-            )
+            ]
+            if affected:
+                row.append(affected_summary(c))
+            t.add_row(*row)
         console.print(t)
     else:
         console.print("\n[bold green]No breaking changes found.[/bold green]")
@@ -108,8 +573,529 @@ def main(
         t2.add_column("Type")
         t2.add_column("Path")
         t2.add_column("Message")
+        if affected:
+            t2.add_column("Affected")
         for c in result.non_breaking:
-            t2.add_row(c.change_type.value, c.path, c.message or "")
+            row = [c.change_type.value, c.path, c.message or ""]
+            if affected:
+                row.append(affected_summary(c))
+            t2.add_row(*row)
+        console.print(t2)
+
+
+def _with_diagnostics(
+    fields: "Iterable[Field]",
+    prof: "Optional[Profile]",
+    metrics: "Optional[DiffMetrics]",
+) -> "Iterator[Field]":
+    """
+    Append `timings` / `metrics` fields. Timings are computed only once the
+    fields before them have been written (so they include most of the render
+    phase).
+    """
+    yield from fields
+    if prof is not None:
+        yield ("timings", prof.to_dict())
+    if metrics is not None:
+        yield ("metrics", metrics.to_dict())
+
+
+def _print_timings(prof: "Profile") -> None:
+    """
+    Per-phase breakdown on stderr, so it never mixes with the report.
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    timings = prof.timings()
+    t = Table(title="Profile (self time per phase)", show_header=True)
+    for column in ("Phase", "Calls", "Wall ms", "CPU ms", "Blocks"):
+        t.add_column(column, justify="left" if column == "Phase" else "right")
+    for timing in timings:
+        t.add_row(
+            timing.name,
+            str(timing.calls),
+            f"{timing.wall * 1000:.2f}",
+            f"{timing.cpu * 1000:.2f}",
+            str(timing.blocks),
+        )
+    t.add_row(
+        "total",
+        "",
+        f"{sum(x.wall for x in timings) * 1000:.2f}",
+        f"{sum(x.cpu for x in timings) * 1000:.2f}",
+        str(sum(x.blocks for x in timings)),
+        style="bold",
+    )
+    Console(stderr=True).print(t)
+
+
+def _print_metrics(metrics: "DiffMetrics") -> None:
+    """
+    Engine counters on stderr, so they never mix with the report.
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    t = Table(title="Metrics", show_header=True)
+    t.add_column("Counter")
+    t.add_column("Value", justify="right")
+    for name, value in metrics.to_dict().items():
+        t.add_row(name, str(value))
+    Console(stderr=True).print(t)
+
+
+def _write_report(
+    fmt: str,
+    output: Optional[Path],
+    fields: "Iterable[Field]",
+    records: Iterator[dict],
+) -> None:
+    """
+    Stream a json/ndjson report to `output` (or stdout) without rich.
+    """
+    from .output import write_json, write_ndjson
+
+    stream = sys.stdout if output is None else output.open("w", encoding="utf-8")
+    try:
+        if fmt == "ndjson":
+            write_ndjson(stream, records)
+        else:
+            write_json(stream, fields)
+        stream.flush()
+    finally:
+        if output is not None:
+            stream.close()
+
+
+def _load_rules(rules_file: Optional[Path]) -> "Optional[RuleSet]":
+    if rules_file is None:
+        return None
+
+    from .rules import load_rules
+
+    try:
+        return load_rules(rules_file)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--rules") from e
+
+
+def _with_baseline(
+    rules: "Optional[RuleSet]", baseline_file: Optional[Path]
+) -> "Optional[RuleSet]":
+    if baseline_file is None:
+        return rules
+
+    from .baseline import load_baseline
+    from .rules import DEFAULT_RULESET
+
+    try:
+        accepted = load_baseline(baseline_file)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--baseline") from e
+    return (rules or DEFAULT_RULESET).with_baseline(accepted)
+
+
+def _input_options(rules_file: Optional[Path], baseline_file: Optional[Path]) -> dict:
+    """
+    Digests of the option files that change a result, for cache keys. Only
+    options that are set are included.
+    """
+    from .result_cache import file_digest
+
+    options = {}
+    if rules_file is not None:
+        options["rules"] = file_digest(rules_file)
+    if baseline_file is not None:
+        options["baseline"] = file_digest(baseline_file)
+    return options
+
+
+def _diff_files(
+    old_file: Path,
+    new_file: Path,
+    rules: "Optional[RuleSet]" = None,
+    compact: bool = False,
+) -> "tuple[str, str, DiffResult]":
+    old_loaded = load_schema(old_file)
+    new_loaded = load_schema(new_file)
+    result = diff_loaded(old_loaded, new_loaded, rules=rules, compact=compact)
+    return old_loaded.kind.value, new_loaded.kind.value, result
+
+
+@app.command("merge")
+def merge(
+    parts: List[Path] = typer.Argument(
+        ...,
+        exists=True,
+        readable=True,
+        help="Partial results written with --shard, one per shard.",
+    ),
+    format: str = typer.Option(
+        "text", "--format", help="Output format: text|plain|json|ndjson"
+    ),
+    summary: bool = typer.Option(
+        False,
+        "--summary",
+        help="Report counts per operation and change type instead of every change.",
+    ),
+    summary_top: int = typer.Option(
+        3, "--summary-top", min=0, help="Sample changes shown per --summary group."
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Write the json/ndjson report to this file instead of stdout.",
+    ),
+    fail_on_breaking: bool = typer.Option(
+        True,
+        "--fail-on-breaking/--no-fail-on-breaking",
+        help="Exit with code 1 when breaking changes are found (default: true).",
+    ),
+):
+    """
+    Merge the partial results of `--shard 1/N` ... `--shard N/N` runs.
+
+    The report, in any format, is the one a single run over the same inputs
+    would have written.
+    """
+    import json
+
+    from .shard import PartialResult, merge_partials
+
+    fmt = format.lower()
+    if output is not None and fmt not in _MACHINE_FORMATS:
+        raise typer.BadParameter(
+            "--output requires --format json or ndjson", param_hint="--output"
+        )
+    try:
+        partials = [
+            PartialResult.from_dict(json.loads(part.read_text(encoding="utf-8")))
+            for part in parts
+        ]
+        result = merge_partials(partials)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="PARTS") from e
+
+    first = partials[0]
+    _render(
+        result,
+        first.old_kind or "",
+        first.new_kind or "",
+        fmt,
+        output,
+        summary,
+        summary_top,
+        None,
+        None,
+    )
+    exit_code = result.exit_code() if fail_on_breaking else 0
+    raise typer.Exit(code=exit_code)
+
+
+@app.command("baseline")
+def baseline(
+    old_file: Path = typer.Argument(
+        ..., exists=True, readable=True, help="Old schema/file (JSON or YAML)"
+    ),
+    new_file: Path = typer.Argument(
+        ..., exists=True, readable=True, help="New schema/file (JSON or YAML)"
+    ),
+    out_file: Path = typer.Argument(..., help="Baseline file to (re)write"),
+    rules_file: Optional[Path] = typer.Option(
+        None,
+        "--rules",
+        exists=True,
+        readable=True,
+        help="Severity overrides (JSON or YAML) applied on top of the default rules.",
+    ),
+    compact: bool = typer.Option(
+        False,
+        "--compact",
+        help="Accept the changes as reported with --compact.",
+    ),
+):
+    """
+    Accept every breaking change between OLD_FILE and NEW_FILE.
+
+    Writes their fingerprints to OUT_FILE, replacing its previous content;
+    pass it to `--baseline` to stop gating on them.
+    """
+    from .baseline import write_baseline
+
+    _, _, result = _diff_files(old_file, new_file, _load_rules(rules_file), compact)
+    count = write_baseline(out_file, result)
+    _console().print(f"[dim]Wrote[/dim] {out_file} ({count} accepted changes)")
+
+
+@app.command("replay")
+def replay(
+    old_file: Path = typer.Argument(
+        ..., exists=True, readable=True, help="Old OpenAPI spec (JSON or YAML)"
+    ),
+    new_file: Path = typer.Argument(
+        ..., exists=True, readable=True, help="New OpenAPI spec (JSON or YAML)"
+    ),
+    logs: List[Path] = typer.Argument(
+        ...,
+        exists=True,
+        readable=True,
+        help="Access logs recorded against OLD_FILE (NDJSON or HAR, optionally .gz).",
+    ),
+    format: str = typer.Option("text", "--format", help="Output format: text|json"),
+    log_format: str = typer.Option(
+        "auto", "--log-format", help="Log format: auto|ndjson|har"
+    ),
+    base_path: str = typer.Option(
+        "",
+        "--base-path",
+        help="Prefix stripped from request paths, e.g. /api/v1 (the server URL path).",
+    ),
+    rules_file: Optional[Path] = typer.Option(
+        None,
+        "--rules",
+        exists=True,
+        readable=True,
+        help="Severity overrides (JSON or YAML) applied on top of the default rules.",
+    ),
+    baseline_file: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        exists=True,
+        readable=True,
+        help="Drop changes accepted in this baseline file.",
+    ),
+    fail_on_breaking: bool = typer.Option(
+        True,
+        "--fail-on-breaking/--no-fail-on-breaking",
+        help="Exit with code 1 when a breaking change affects recorded calls.",
+    ),
+):
+    """
+    Count the recorded calls each breaking change would affect.
+
+    Every request of LOGS is matched to an operation of OLD_FILE; breaking
+    changes are listed with the number of calls to the operations they
+    affect, most called first.
+    """
+    from .replay import Replay, operation_keys, read_log
+
+    fmt = format.lower()
+    rules = _with_baseline(_load_rules(rules_file), baseline_file)
+    old_loaded = load_schema(old_file)
+    new_loaded = load_schema(new_file)
+    if old_loaded.kind != SchemaKind.OPENAPI or new_loaded.kind != SchemaKind.OPENAPI:
+        raise typer.BadParameter(
+            "replay requires two OpenAPI documents", param_hint="OLD_FILE"
+        )
+    result = diff_loaded(old_loaded, new_loaded, rules=rules)
+
+    if old_loaded.normalized is not None:
+        op_keys = list(old_loaded.normalized.operations)
+    else:
+        op_keys = operation_keys(old_loaded.raw)
+    session = Replay(op_keys, base_path=base_path)
+    try:
+        for log in logs:
+            session.feed(read_log(log, log_format))
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="LOGS") from e
+    report = session.report(result)
+
+    if fmt == "json":
+        from .output import write_json
+
+        write_json(sys.stdout, report.to_dict().items())
+    else:
+        _print_replay(report)
+    exit_code = report.exit_code() if fail_on_breaking else 0
+    raise typer.Exit(code=exit_code)
+
+
+def _print_replay(report: "ReplayReport") -> None:
+    from rich.table import Table
+
+    console = _console()
+    console.print(
+        f"[dim]Requests:[/dim] {report.requests}  [dim]matched:[/dim] "
+        f"{report.matched}  [dim]unmatched:[/dim] {report.unmatched}  "
+        f"[dim]invalid lines:[/dim] {report.invalid}"
+    )
+    if not report.impact:
+        console.print("\n[bold green]No breaking changes found.[/bold green]")
+        return
+    if report.has_affected_calls():
+        console.print("\n[bold red]BREAKING CHANGES WITH RECORDED CALLS[/bold red]\n")
+    else:
+        console.print(
+            "\n[bold green]No recorded call is affected by a breaking "
+            "change.[/bold green]\n"
+        )
+    t = Table(show_header=True, header_style="bold")
+    t.add_column("Calls", justify="right")
+    t.add_column("Type")
+    t.add_column("Path")
+    t.add_column("Message")
+    for change, calls in report.impact:
+        t.add_row(
+            str(calls), change.change_type.value, change.path, change.message or ""
+        )
+    console.print(t)
+
+
+@app.command("serve")
+def serve(
+    socket: Optional[Path] = typer.Option(
+        None, "--socket", help="Listen on this Unix socket path."
+    ),
+    port: Optional[int] = typer.Option(
+        None,
+        "--port",
+        help="Serve HTTP on 127.0.0.1:PORT (POST requests to /diff) instead.",
+    ),
+    cache_size: int = typer.Option(
+        64, "--cache-size", min=1, help="Maximum number of cached documents."
+    ),
+    rules_file: Optional[Path] = typer.Option(
+        None,
+        "--rules",
+        exists=True,
+        readable=True,
+        help="Severity overrides (JSON or YAML) applied on top of the default rules.",
+    ),
+):
+    """
+    Run a local diff daemon with warm document caches.
+
+    On --socket, send one JSON request per line, e.g. {"old": "a.yaml",
+    "new": "b.yaml"}; each gets one JSON response line with the diff result and
+    exit code. On --port, POST the same request to /diff over HTTP.
+    """
+    from .server import DiffService, make_server
+
+    console = _console()
+    if (socket is None) == (port is None):
+        console.print("[red]Pass exactly one of --socket or --port.[/red]")
+        raise typer.Exit(code=2)
+
+    service = DiffService(cache_size, rules=_load_rules(rules_file))
+    try:
+        server = make_server(service, socket_path=socket, port=port)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--socket") from e
+    where = str(socket) if socket is not None else f"http://127.0.0.1:{port}/diff"
+    console.print(f"[dim]Listening on[/dim] {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # removes the Unix socket this server bound, and only that
+        server.server_close()
+
+
+@app.command("snapshot")
+def snapshot(
+    spec_file: Path = typer.Argument(
+        ..., exists=True, readable=True, help="OpenAPI spec (JSON or YAML)"
+    ),
+    out_file: Path = typer.Argument(..., help="Where to write the snapshot"),
+):
+    """
+    Write a pre-normalized binary snapshot of an OpenAPI spec.
+
+    Snapshots can be passed anywhere a spec file is accepted; loading one skips
+    parsing, $ref resolution and normalization.
+    """
+    import hashlib
+
+    from .openapi.snapshot import write_snapshot
+
+    console = _console()
+    loaded = load_schema(spec_file)
+    if loaded.kind != SchemaKind.OPENAPI:
+        console.print(f"[red]Not an OpenAPI document:[/red] {spec_file}")
+        raise typer.Exit(code=2)
+
+    source_sha256 = hashlib.sha256(spec_file.read_bytes()).hexdigest()
+    size = write_snapshot(loaded.normalize(), out_file, source_sha256=source_sha256)
+    console.print(f"[dim]Wrote[/dim] {out_file} ({size} bytes)")
+
+
+def _run_window(
+    old_file: Path,
+    new_file: Path,
+    against: List[Path],
+    fmt: str,
+    fail_on_breaking: bool,
+    rules: "Optional[RuleSet]",
+    output: Optional[Path],
+) -> None:
+    from .window import diff_against
+
+    new_loaded = load_schema(new_file)
+    window = diff_against(new_loaded, [old_file, *against], rules=rules)
+
+    exit_code = window.exit_code() if fail_on_breaking else 0
+
+    if fmt in _MACHINE_FORMATS:
+        from .output import window_fields, window_records
+
+        _write_report(fmt, output, window_fields(window), window_records(window))
+        raise typer.Exit(code=exit_code)
+
+    if fmt == "plain":
+        from .output import write_plain_window
+
+        sys.stdout.write(
+            f"New schema: {new_loaded.kind.value}  "
+            f"Baselines: {len(window.baselines)}\n\n"
+        )
+        write_plain_window(sys.stdout, window)
+        raise typer.Exit(code=exit_code)
+
+    from rich.table import Table
+
+    console = _console()
+    console.print(
+        f"[dim]New schema:[/dim] {new_loaded.kind.value}  "
+        f"[dim]Baselines:[/dim] {len(window.baselines)}"
+    )
+
+    breaking = window.breaking()
+    if breaking:
+        console.print("\n[bold red]BREAKING CHANGES FOUND[/bold red]\n")
+        t = Table(show_header=True, header_style="bold red")
+        t.add_column("Type")
+        t.add_column("Path")
+        t.add_column("Old Type")
+        t.add_column("New Type")
+        t.add_column("Message")
+        t.add_column("Baselines")
+        for c, labels in breaking:
+            t.add_row(
+                c.change_type.value,
+                c.path,
+                c.old_type or "",
+                c.new_type or "",
+                c.message or "",
+                "\n".join(labels),
+            )
+        console.print(t)
+    else:
+        console.print("\n[bold green]No breaking changes found.[/bold green]")
+
+    non_breaking = window.non_breaking()
+    if non_breaking:
+        console.print("\n[bold]Non-breaking changes:[/bold]")
+        t2 = Table(show_header=True, header_style="bold")
+        t2.add_column("Type")
+        t2.add_column("Path")
+        t2.add_column("Message")
+        t2.add_column("Baselines")
+        for c, labels in non_breaking:
+            t2.add_row(c.change_type.value, c.path, c.message or "", "\n".join(labels))
         console.print(t2)
 
     raise typer.Exit(code=exit_code)
@@ -1,11 +1,8 @@
 from typing import Any
 
-from .models import (
-    Change,
-    ChangeType,
-    ChangeSeverity,
-    DiffResult,
-)
+from .cancellation import checkpoint
+from .models import ChangeType, DiffResult
+from .rules import DEFAULT_RULESET, RuleSet
 
 
 def _typename(value: Any) -> str:
@@ -19,65 +16,76 @@ def diff_objects(
     new: Any,
     path: str = "",
     result: DiffResult | None = None,
+    *,
+    rules: RuleSet | None = None,
+    depth: int = 0,
 ) -> DiffResult:
     """
     Deterministic diff of two nested JSON-like objects.
 
-    Rules (v0.1):
+    Rules (v0.1, defaults; see `schema_diff.rules`):
     - Removed fields      → breaking
     - Type changes        → breaking
     - Added fields        → non-breaking
+
+    `depth` is the nesting level of `path` (for `result.metrics`).
     """
     if result is None:
         result = DiffResult()
+    metrics = result.metrics
+    metrics.object_nodes += 1
+    if depth > metrics.max_diff_depth:
+        metrics.max_diff_depth = depth
+    rules = rules or DEFAULT_RULESET
 
     # Type change at node level → breaking
     if _typename(old) != _typename(new):
-        result.breaking.append(
-            Change(
-                change_type=ChangeType.TYPE_CHANGE,
-                severity=ChangeSeverity.BREAKING,
-                path=path or "$",
-                old_type=_typename(old),
-                new_type=_typename(new),
-                message="Type changed",
-            )
+        rules.emit(
+            result,
+            "type_changed",
+            "document",
+            ChangeType.TYPE_CHANGE,
+            path or "$",
+            old_type=_typename(old),
+            new_type=_typename(new),
+            message="Type changed",
         )
         return result
 
     # Dict comparison
     if isinstance(old, dict) and isinstance(new, dict):
+        checkpoint()
         old_keys = set(old.keys())
         new_keys = set(new.keys())
 
         # Removed fields → breaking
         for key in sorted(old_keys - new_keys):
             p = f"{path}.{key}" if path else key
-            result.breaking.append(
-                Change(
-                    change_type=ChangeType.REMOVED_FIELD,
-                    severity=ChangeSeverity.BREAKING,
-                    path=p,
-                    message="Field removed",
-                )
+            rules.emit(
+                result,
+                "field_removed",
+                "document",
+                ChangeType.REMOVED_FIELD,
+                p,
+                message="Field removed",
             )
 
         # Added fields → non-breaking
         for key in sorted(new_keys - old_keys):
             p = f"{path}.{key}" if path else key
-            result.non_breaking.append(
-                Change(
-                    change_type=ChangeType.ADDED_FIELD,
-                    severity=ChangeSeverity.NON_BREAKING,
-                    path=p,
-                    message="Field added",
-                )
+            rules.emit(
+                result,
+                "field_added",
+                "document",
+                ChangeType.ADDED_FIELD,
+                p,
+                message="Field added",
             )
 
         # Recurse into common fields
         for key in sorted(old_keys & new_keys):
             p = f"{path}.{key}" if path else key
-            diff_objects(old[key], new[key], p, result)
+            diff_objects(old[key], new[key], p, result, rules=rules, depth=depth + 1)
 
         return result
 
@@ -89,6 +97,8 @@ def diff_objects(
                 new[0],
                 f"{path}[]" if path else "[]",
                 result,
+                rules=rules,
+                depth=depth + 1,
             )
         return result
 
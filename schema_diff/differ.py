@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping, Optional, Union
+
+from .cache import LRUCache
+from .diff import diff_objects
+from .json_schema import diff_json_schema_document
+from .loader import (
+    LoadedSchema,
+    SchemaKind,
+    detect_schema_kind,
+    load_schema,
+    parse_schema,
+)
+from .models import DiffResult
+from .openapi.diff import diff_normalized
+from .openapi.normalizer import NormalizedOpenAPI, normalize_openapi
+from .openapi.resolver import resolve_schema
+from .openapi.snapshot import MAGIC as SNAPSHOT_MAGIC
+from .rules import RuleSet
+
+# A file path, a loaded or already-parsed document, or a normalized spec.
+Source = Union[str, os.PathLike, LoadedSchema, Mapping[str, Any], NormalizedOpenAPI]
+
+
+@dataclass
+class _Document:
+    key: tuple
+    kind: SchemaKind
+    raw: Mapping[str, Any]
+    normalized: Optional[NormalizedOpenAPI] = None
+    # resolver memo: `#/components/...` ref -> resolved schema
+    resolved: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # the input itself, for documents only known by identity
+    pin: Any = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def normalize(self) -> NormalizedOpenAPI:
+        with self.lock:
+            if self.normalized is None:
+                self.normalized = normalize_openapi(self.raw, cache=self.resolved)
+            return self.normalized
+
+    def resolve(self, ref: str) -> dict[str, Any]:
+        with self.lock:
+            return resolve_schema({"$ref": ref}, self.raw, cache=self.resolved)
+
+
+@dataclass(frozen=True)
+class _Result:
+    old_pin: Any
+    new_pin: Any
+    result: DiffResult
+
+
+class SchemaDiffer:
+    """
+    Reusable diff engine that keeps bounded caches across calls.
+
+    - documents: parsed documents, with their normalized form and resolved
+      components once computed, keyed by content (SHA-256 of file bytes, or
+      of the canonical JSON of a parsed dict)
+    - results: diff results per (old, new) document pair
+
+    Inputs may be file paths, `LoadedSchema`s, parsed dicts or
+    `NormalizedOpenAPI` specs. Normalized specs (and dicts that cannot be
+    serialized canonically) are cached by identity instead of content.
+
+    Cached documents and results are shared between callers: treat them as
+    read-only, and do not mutate a dict after passing it in. Safe to use from
+    many threads.
+
+        differ = SchemaDiffer(rules=rules)
+        for new in candidates:
+            result = differ.diff(baseline, new)  # baseline parsed and
+                                                 # normalized only once
+    """
+
+    def __init__(
+        self,
+        *,
+        rules: RuleSet | None = None,
+        max_documents: int = 64,
+        max_results: int = 256,
+    ) -> None:
+        self.rules = rules
+        self.documents: LRUCache[tuple, _Document] = LRUCache(max_documents)
+        self.results: LRUCache[tuple, _Result] = LRUCache(max_results)
+
+    def diff(self, old: Source, new: Source) -> DiffResult:
+        """
+        Diff two documents: OpenAPI (compared operation by operation) and
+        JSON Schema (definition by definition) against their own kind,
+        anything else as generic JSON/YAML.
+        """
+        old_doc = self._document(old)
+        new_doc = self._document(new)
+
+        key = (old_doc.key, new_doc.key)
+        cached = self.results.get(key)
+        if (
+            cached is not None
+            and cached.old_pin is old_doc.pin
+            and cached.new_pin is new_doc.pin
+        ):
+            return cached.result
+
+        if old_doc.kind == SchemaKind.OPENAPI and new_doc.kind == SchemaKind.OPENAPI:
+            result = diff_normalized(
+                old_doc.normalize(), new_doc.normalize(), rules=self.rules
+            )
+        elif old_doc.normalized is not None or new_doc.normalized is not None:
+            raise ValueError("A normalized spec can only be diffed against OpenAPI")
+        elif (
+            old_doc.kind == SchemaKind.JSON_SCHEMA
+            and new_doc.kind == SchemaKind.JSON_SCHEMA
+        ):
+            result = diff_json_schema_document(
+                old_doc.raw, new_doc.raw, rules=self.rules
+            )
+        else:
+            result = diff_objects(old_doc.raw, new_doc.raw, rules=self.rules)
+
+        self.results.put(key, _Result(old_doc.pin, new_doc.pin, result))
+        return result
+
+    def diff_files(self, old_file: Path, new_file: Path) -> DiffResult:
+        return self.diff(Path(old_file), Path(new_file))
+
+    def normalize(self, source: Source) -> NormalizedOpenAPI:
+        """
+        Normalized OpenAPI view of `source`, computed once per document.
+        """
+        doc = self._document(source)
+        if doc.kind != SchemaKind.OPENAPI:
+            raise ValueError("Not an OpenAPI document")
+        return doc.normalize()
+
+    def resolve(self, source: Source, ref: str) -> dict[str, Any]:
+        """
+        Resolve a local ref (e.g. "#/components/schemas/User") of `source`.
+        Components resolved here or while normalizing are reused.
+        """
+        doc = self._document(source)
+        if doc.normalized is not None and not doc.raw:
+            raise ValueError("Cannot resolve refs of a normalized spec")
+        return doc.resolve(ref)
+
+    def clear(self) -> None:
+        self.documents.clear()
+        self.results.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Size, hits and misses of each cache.
+        """
+        return {
+            name: {"size": len(cache), "hits": cache.hits, "misses": cache.misses}
+            for name, cache in (
+                ("documents", self.documents),
+                ("results", self.results),
+            )
+        }
+
+    def _document(self, source: Source) -> _Document:
+        if isinstance(source, NormalizedOpenAPI):
+            return self._cached(
+                ("normalized", id(source)),
+                lambda key: _Document(
+                    key, SchemaKind.OPENAPI, {}, normalized=source, pin=source
+                ),
+                pin=source,
+            )
+        if isinstance(source, LoadedSchema):
+            if source.normalized is not None:
+                return self._document(source.normalized)
+            return self._parsed(source.raw, source.kind)
+        if isinstance(source, Mapping):
+            return self._parsed(source, None)
+        return self._file(Path(source))
+
+    def _file(self, path: Path) -> _Document:
+        data = path.read_bytes()
+        key = ("file", hashlib.sha256(data).hexdigest(), path.suffix.lower())
+
+        def load(key: tuple) -> _Document:
+            if data.startswith(SNAPSHOT_MAGIC):
+                loaded = load_schema(path)
+            else:
+                loaded = parse_schema(data.decode("utf-8"), path)
+            return _Document(key, loaded.kind, loaded.raw, normalized=loaded.normalized)
+
+        return self._cached(key, load)
+
+    def _parsed(self, raw: Mapping[str, Any], kind: Optional[SchemaKind]) -> _Document:
+        digest = _digest(raw)
+        if digest is None:
+            key: tuple = ("object", id(raw))
+            pin: Any = raw
+        else:
+            key, pin = ("content", digest), None
+        return self._cached(
+            key,
+            lambda key: _Document(key, kind or detect_schema_kind(raw), raw, pin=pin),
+            pin=pin,
+        )
+
+    def _cached(self, key: tuple, make, *, pin: Any = None) -> _Document:
+        doc = self.documents.get(key)
+        # identity keys are only valid while the object they came from lives
+        if doc is None or doc.pin is not pin:
+            doc = make(key)
+            self.documents.put(key, doc)
+        return doc
+
+
+def _digest(raw: Mapping[str, Any]) -> Optional[str]:
+    try:
+        text = json.dumps(
+            raw, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+    except (TypeError, ValueError):
+        # e.g. keys JSON cannot encode, or int and str keys in one mapping
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
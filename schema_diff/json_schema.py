@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, Iterable, Iterator, Mapping, Set
+
+from .cancellation import checkpoint
+from .canonical import canonicalize_pair, same_json
+from .models import ChangeType, DiffResult
+from .openapi.json_schema_diff import EnumDeltas, diff_json_schema
+from .openapi.resolver import resolve_schema
+from .profiling import timed
+from .rules import DEFAULT_RULESET, RuleSet
+
+# 2019-09+ and draft-07 spellings of the definitions section
+DEFINITION_SECTIONS = ("$defs", "definitions")
+
+ROOT = "#"
+
+
+def definitions_index(raw: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Local ref -> target for every definition of a JSON Schema document:
+
+        "#"                -> the document itself
+        "#/$defs/Name"     -> raw["$defs"]["Name"]
+        "#/definitions/X"  -> raw["definitions"]["X"]
+
+    Used as the resolver's `index`, so looking up a ref is one dict access
+    however many definitions the document has.
+    """
+    index: dict[str, Any] = {ROOT: raw}
+    for section in DEFINITION_SECTIONS:
+        entries = raw.get(section)
+        if not isinstance(entries, dict):
+            continue
+        for name, definition in entries.items():
+            index[f"#/{section}/{_escape(str(name))}"] = definition
+    return index
+
+
+@timed("diff")
+def diff_json_schema_document(
+    old_raw: Mapping[str, Any],
+    new_raw: Mapping[str, Any],
+    *,
+    rules: RuleSet | None = None,
+) -> DiffResult:
+    """
+    Diff two standalone JSON Schema documents (context "schema").
+
+    - definitions (`$defs` / `definitions`) removed -> breaking, added ->
+      non-breaking (path "$defs.Name")
+    - common definitions, then the root schema (path "$"), are compared with
+      `diff_json_schema` after resolving their refs into the document
+
+    Documents that only differ in spelling (see `canonicalize_pair`) are not
+    compared any further. Definitions whose own content and every definition
+    they reach are unchanged are skipped without being resolved, so a small
+    edit to a large registry only costs the definitions that depend on it.
+    Each side resolves a definition once, however many others reference it.
+    """
+    rules = rules or DEFAULT_RULESET
+    result = DiffResult()
+    metrics = result.metrics
+    old_raw, new_raw = canonicalize_pair(old_raw, new_raw)
+    if same_json(old_raw, new_raw):
+        return result
+
+    old_index = definitions_index(old_raw)
+    new_index = definitions_index(new_raw)
+    old_defs = {ref: t for ref, t in old_index.items() if ref != ROOT}
+    new_defs = {ref: t for ref, t in new_index.items() if ref != ROOT}
+
+    for ref in sorted(old_defs.keys() - new_defs.keys()):
+        rules.emit(
+            result,
+            "definition_removed",
+            "schema",
+            ChangeType.REMOVED_FIELD,
+            _path(ref),
+            message="Definition removed",
+        )
+    for ref in sorted(new_defs.keys() - old_defs.keys()):
+        rules.emit(
+            result,
+            "definition_added",
+            "schema",
+            ChangeType.ADDED_FIELD,
+            _path(ref),
+            message="Definition added",
+        )
+
+    old_root = _root(old_raw)
+    new_root = _root(new_raw)
+    changed = old_defs.keys() ^ new_defs.keys()
+    changed.update(
+        ref
+        for ref in old_defs.keys() & new_defs.keys()
+        if not same_json(old_defs[ref], new_defs[ref])
+    )
+    if not same_json(old_root, new_root):
+        changed.add(ROOT)
+    if not changed:
+        return result
+
+    # A ref's target changes if anything it reaches changed, on either side.
+    # Unchanged definitions have the same refs on both, so only the new side
+    # and the old versions of changed ones are walked.
+    old_schemas = {**old_defs, ROOT: old_root}
+    new_schemas = {**new_defs, ROOT: new_root}
+    affected = _dependents(
+        itertools.chain(
+            new_schemas.items(),
+            ((ref, old_schemas[ref]) for ref in changed if ref in old_schemas),
+        ),
+        changed,
+    )
+
+    old_memo: dict[str, dict[str, Any]] = {}
+    new_memo: dict[str, dict[str, Any]] = {}
+    enum_deltas: EnumDeltas = {}
+
+    def resolved(schema, index, memo) -> dict[str, Any]:
+        return resolve_schema(schema, {}, cache=memo, metrics=metrics, index=index)
+
+    for ref in sorted(old_defs.keys() & new_defs.keys()):
+        if ref not in affected:
+            continue
+        checkpoint()
+        old_schema = resolved({"$ref": ref}, old_index, old_memo)
+        new_schema = resolved({"$ref": ref}, new_index, new_memo)
+        diff_json_schema(
+            old_schema,
+            new_schema,
+            path=_path(ref),
+            result=result,
+            context="schema",
+            rules=rules,
+            enum_deltas=enum_deltas,
+        )
+
+    if ROOT in affected:
+        diff_json_schema(
+            resolved(old_root, old_index, old_memo),
+            resolved(new_root, new_index, new_memo),
+            path="$",
+            result=result,
+            context="schema",
+            rules=rules,
+            enum_deltas=enum_deltas,
+        )
+    return result
+
+
+def _root(raw: Mapping[str, Any]) -> dict[str, Any]:
+    # the root schema itself, without the definitions it carries
+    return {k: v for k, v in raw.items() if k not in DEFINITION_SECTIONS}
+
+
+def _dependents(schemas: Iterable[tuple[str, Any]], changed: Set[str]) -> Set[str]:
+    """
+    `changed` plus every ref among `schemas` (ref, schema pairs) whose schema
+    reaches one of them through other refs.
+    """
+    referrers: dict[str, list[str]] = {}
+    for ref, schema in schemas:
+        for dependency in _iter_refs(schema):
+            referrers.setdefault(dependency, []).append(ref)
+    affected = set(changed)
+    stack = list(changed)
+    while stack:
+        for ref in referrers.get(stack.pop(), ()):
+            if ref not in affected:
+                affected.add(ref)
+                stack.append(ref)
+    return affected
+
+
+def _iter_refs(schema: Any) -> Iterator[str]:
+    # only where the resolver follows refs: a ref anywhere else (e.g. under
+    # "not") does not change the resolved schema, and enums and other
+    # keyword values are not walked at all
+    stack = [schema]
+    while stack:
+        schema = stack.pop()
+        if not isinstance(schema, dict):
+            continue
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            yield ref
+        props = schema.get("properties")
+        if isinstance(props, dict):
+            stack.extend(props.values())
+        stack.append(schema.get("items"))
+        for key in ("allOf", "oneOf", "anyOf"):
+            members = schema.get(key)
+            if isinstance(members, list):
+                stack.extend(members)
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _path(ref: str) -> str:
+    # "#/$defs/a~1b" -> "$defs.a/b"
+    section, name = ref[2:].split("/", 1)
+    return f"{section}.{name.replace('~1', '/').replace('~0', '~')}"
@@ -2,7 +2,18 @@ import json
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Mapping
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from .profiling import phase
+
+if TYPE_CHECKING:
+    from .models import DiffResult
+    from .openapi.normalizer import NormalizedOpenAPI
+    from .rules import RuleSet
+
+# Same bytes as `openapi.snapshot.MAGIC`; checked here so that plain specs do
+# not pay for importing the snapshot reader.
+_SNAPSHOT_MAGIC = b"SDSNAP\r\n"
 
 
 class SchemaKind(str, Enum):
@@ -16,6 +27,48 @@ class LoadedSchema:
     kind: SchemaKind
     raw: dict[str, Any]
     source: Path
+    # Set when loaded from a snapshot; `raw` is empty in that case.
+    normalized: Optional["NormalizedOpenAPI"] = None
+
+    def normalize(self) -> "NormalizedOpenAPI":
+        """
+        Normalized OpenAPI view of this schema (precomputed for snapshots).
+        """
+        if self.normalized is not None:
+            return self.normalized
+
+        from .openapi.normalizer import normalize_openapi
+
+        return normalize_openapi(self.raw)
+
+
+def diff_loaded(
+    old: LoadedSchema,
+    new: LoadedSchema,
+    *,
+    rules: Optional["RuleSet"] = None,
+    compact: bool = False,
+) -> "DiffResult":
+    """
+    Diff two loaded schemas: OpenAPI (compared operation by operation) and
+    JSON Schema (definition by definition) against their own kind, anything
+    else as generic JSON/YAML. See `diff_normalized` for `compact`, which
+    only applies to OpenAPI.
+    """
+    from .diff import diff_objects
+    from .json_schema import diff_json_schema_document
+    from .openapi.diff import diff_normalized, diff_openapi
+
+    if old.kind == SchemaKind.OPENAPI and new.kind == SchemaKind.OPENAPI:
+        if old.normalized is None and new.normalized is None:
+            return diff_openapi(old.raw, new.raw, rules=rules, compact=compact)
+        return diff_normalized(
+            old.normalize(), new.normalize(), rules=rules, compact=compact
+        )
+    if old.kind == SchemaKind.JSON_SCHEMA and new.kind == SchemaKind.JSON_SCHEMA:
+        return diff_json_schema_document(old.raw, new.raw, rules=rules)
+    with phase("diff"):
+        return diff_objects(old.raw, new.raw, rules=rules)
 
 
 def load_schema(path: Path) -> LoadedSchema:
@@ -25,6 +78,7 @@ def load_schema(path: Path) -> LoadedSchema:
     Supported inputs:
       - JSON (.json)
       - YAML (.yml/.yaml) if PyYAML is installed
+      - Snapshots written by `api-schema-diff snapshot` (detected by content)
 
     Returns:
       LoadedSchema(kind=..., raw=..., source=path)
@@ -34,8 +88,46 @@ def load_schema(path: Path) -> LoadedSchema:
     if not path.exists():
         raise FileNotFoundError(f"Schema file not found: {path}")
 
+    with path.open("rb") as f:
+        is_snapshot = f.read(len(_SNAPSHOT_MAGIC)) == _SNAPSHOT_MAGIC
+
+    if is_snapshot:
+        from .openapi.snapshot import read_snapshot
+
+        with phase("parse"):
+            snapshot = read_snapshot(path)
+        return LoadedSchema(
+            kind=SchemaKind.OPENAPI,
+            raw={},
+            source=path,
+            normalized=snapshot.normalized,
+        )
+
+    with phase("read"):
+        text = path.read_text(encoding="utf-8")
+    with phase("parse"):
+        return parse_schema(text, path)
+
+
+def parse_schema(text: str, source: Path) -> LoadedSchema:
+    """
+    Parse schema text that was read from `source` and detect its kind.
+
+    The format (JSON or YAML) is picked from the suffix of `source`, exactly
+    like `load_schema`.
+    """
+    path = Path(source)
+    raw = parse_document(text, path)
+    kind = detect_schema_kind(raw)
+    return LoadedSchema(kind=kind, raw=raw, source=path)
+
+
+def parse_document(text: str, source: Path) -> dict[str, Any]:
+    """
+    Parse JSON or YAML text (picked by the suffix of `source`) into a dict.
+    """
+    path = Path(source)
     suffix = path.suffix.lower()
-    text = path.read_text(encoding="utf-8")
 
     if suffix in {".yml", ".yaml"}:
         raw = _load_yaml(text, path)
@@ -46,8 +138,7 @@ def load_schema(path: Path) -> LoadedSchema:
     if not isinstance(raw, dict):
         raise ValueError(f"Top-level schema must be an object/dict in {path}")
 
-    kind = detect_schema_kind(raw)
-    return LoadedSchema(kind=kind, raw=raw, source=path)
+    return raw
 
 
 def _load_json(text: str, path: Path) -> dict[str, Any]:
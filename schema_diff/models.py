@@ -1,6 +1,8 @@
-from dataclasses import dataclass, field
+import hashlib
+import re
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
 
 
 class ChangeType(str, Enum):
@@ -8,6 +10,7 @@ class ChangeType(str, Enum):
     ADDED_FIELD = "added_field"
     TYPE_CHANGE = "type_change"
     REQUIRED_CHANGE = "required_change"
+    ENUM_CHANGE = "enum_change"
 
 
 class ChangeSeverity(str, Enum):
@@ -15,6 +18,34 @@ class ChangeSeverity(str, Enum):
     NON_BREAKING = "non_breaking"
 
 
+# "{id}" and "{userId}" name the same path segment
+_PATH_PARAMETER = re.compile(r"\{[^{}/]*\}")
+
+
+def normalize_change_path(path: str) -> str:
+    """
+    `path` with path template parameters unnamed:
+    "operations.GET /users/{id}.responses" -> "operations.GET /users/{}.responses".
+    """
+    return _PATH_PARAMETER.sub("{}", path)
+
+
+def change_fingerprint(
+    change_type: "ChangeType",
+    path: str,
+    old_type: Optional[str] = None,
+    new_type: Optional[str] = None,
+) -> str:
+    """
+    SHA-256 of a change's type, normalized path and old/new types (see
+    `Change.fingerprint`).
+    """
+    material = "\0".join(
+        (change_type.value, normalize_change_path(path), old_type or "", new_type or "")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
 @dataclass(frozen=True)
 class Change:
     """
@@ -28,16 +59,101 @@ class Change:
     old_type: Optional[str] = None
     new_type: Optional[str] = None
     message: Optional[str] = None
+    # operations reaching a component change reported once (compact mode)
+    affected: Optional[Tuple[str, ...]] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Stable identity of the change across runs, versions and machines: a
+        hash of its type, path (parameter names ignored) and old/new types.
+        Severity, message and `affected` are not part of it, so a change stays
+        accepted in a baseline when rules or wording change.
+        """
+        return change_fingerprint(
+            self.change_type, self.path, self.old_type, self.new_type
+        )
+
+    def to_dict(self) -> dict:
+        data = {
+            "type": self.change_type.value,
+            "severity": self.severity.value,
+            "path": self.path,
+            "old_type": self.old_type,
+            "new_type": self.new_type,
+            "message": self.message,
+        }
+        if self.affected is not None:
+            data["affected"] = list(self.affected)
+        return data
+
+
+@dataclass
+class DiffMetrics:
+    """
+    Work counters from the engine's hot spots, to spot specs that trigger
+    pathological expansion.
+
+    Resolver counters describe how the inputs were normalized (zero for
+    snapshots, which are stored already resolved).
+    """
+
+    # $ref resolver
+    resolve_calls: int = 0  # schema nodes visited
+    ref_lookups: int = 0
+    ref_cache_hits: int = 0  # lookups answered by the per-document memo
+    ref_cache_misses: int = 0  # lookups that expanded a component
+    max_resolve_depth: int = 0
+    truncations: int = 0  # expansions cut at max_depth
+
+    # differs
+    schema_nodes: int = 0  # diff_json_schema calls
+    object_nodes: int = 0  # diff_objects calls
+    max_diff_depth: int = 0
+    enum_cache_hits: int = 0
+    enum_cache_misses: int = 0
+
+    # changes dropped because a baseline accepts them
+    accepted: int = 0
+
+    # results answered from / stored into the --cache-dir result cache
+    result_cache_hits: int = 0
+    result_cache_misses: int = 0
+
+    def merge(self, other: "DiffMetrics") -> "DiffMetrics":
+        """
+        Add `other` into this object (depths take the maximum). Returns self.
+        """
+        for name, value in vars(other).items():
+            if name.startswith("max_"):
+                setattr(self, name, max(getattr(self, name), value))
+            else:
+                setattr(self, name, getattr(self, name) + value)
+        return self
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DiffMetrics":
+        """
+        Inverse of `to_dict`; unknown counters are ignored.
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
 
 
 @dataclass
 class DiffResult:
     """
     Full diff result between two schemas.
+
+    `metrics` is not part of `to_dict()` (the report format) nor of equality.
     """
 
     breaking: List[Change] = field(default_factory=list)
     non_breaking: List[Change] = field(default_factory=list)
+    metrics: DiffMetrics = field(default_factory=DiffMetrics, compare=False, repr=False)
 
     def has_breaking_changes(self) -> bool:
         return bool(self.breaking)
@@ -57,13 +173,83 @@ class DiffResult:
             "non_breaking": [self._change_to_dict(c) for c in self.non_breaking],
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "DiffResult":
+        """
+        Inverse of `to_dict`.
+        """
+        return cls(
+            breaking=[cls._change_from_dict(c) for c in data.get("breaking", [])],
+            non_breaking=[
+                cls._change_from_dict(c) for c in data.get("non_breaking", [])
+            ],
+        )
+
+    @staticmethod
+    def _change_from_dict(data: dict) -> Change:
+        return Change(
+            change_type=ChangeType(data["type"]),
+            severity=ChangeSeverity(data["severity"]),
+            path=data["path"],
+            old_type=data.get("old_type"),
+            new_type=data.get("new_type"),
+            message=data.get("message"),
+            affected=(
+                tuple(data["affected"]) if data.get("affected") is not None else None
+            ),
+        )
+
     @staticmethod
     def _change_to_dict(change: Change) -> dict:
+        return change.to_dict()
+
+
+@dataclass
+class WindowResult:
+    """
+    Diff of one new schema against several baselines (compatibility window).
+
+    `results[i]` is the diff of the new schema against `baselines[i]`.
+    """
+
+    baselines: List[str] = field(default_factory=list)
+    results: List[DiffResult] = field(default_factory=list)
+
+    def breaking(self) -> List[Tuple[Change, List[str]]]:
+        """
+        Distinct breaking changes, each with the baselines it affects.
+        """
+        return self._group(lambda r: r.breaking)
+
+    def non_breaking(self) -> List[Tuple[Change, List[str]]]:
+        return self._group(lambda r: r.non_breaking)
+
+    def has_breaking_changes(self) -> bool:
+        return any(r.has_breaking_changes() for r in self.results)
+
+    def exit_code(self) -> int:
+        return 1 if self.has_breaking_changes() else 0
+
+    def to_dict(self) -> dict:
         return {
-            "type": change.change_type.value,
-            "severity": change.severity.value,
-            "path": change.path,
-            "old_type": change.old_type,
-            "new_type": change.new_type,
-            "message": change.message,
+            "baselines": list(self.baselines),
+            "breaking": [
+                {**DiffResult._change_to_dict(c), "baselines": labels}
+                for c, labels in self.breaking()
+            ],
+            "non_breaking": [
+                {**DiffResult._change_to_dict(c), "baselines": labels}
+                for c, labels in self.non_breaking()
+            ],
         }
+
+    def _group(self, pick) -> List[Tuple[Change, List[str]]]:
+        # Changes are frozen dataclasses, so identical findings against
+        # different baselines collapse onto one key (first-seen order).
+        affected: Dict[Change, List[str]] = {}
+        for label, result in zip(self.baselines, self.results):
+            for change in pick(result):
+                labels = affected.setdefault(change, [])
+                if not labels or labels[-1] != label:
+                    labels.append(label)
+        return list(affected.items())
@@ -1,263 +1,425 @@
-from typing import Any, Mapping
+from typing import Any, Iterator, Mapping
 
-from ..models import Change, ChangeSeverity, ChangeType, DiffResult
-from .json_schema_diff import diff_json_schema
-from .normalizer import normalize_openapi
+from ..canonical import canonicalize_pair, same_json
+from ..cancellation import checkpoint
+from ..models import ChangeType, DiffResult
+from ..profiling import timed
+from ..rules import DEFAULT_RULESET, RuleSet
+from ..shard import GroupKey, PartialResult, Shard
+from .incremental import normalize_changed
+from .json_schema_diff import EnumDeltas, SharedComponents, diff_json_schema
+from .normalizer import NormalizedOpenAPI, OperationSchemas
 
 
-def diff_openapi(old_raw: Mapping[str, Any], new_raw: Mapping[str, Any]) -> DiffResult:
-    old = normalize_openapi(old_raw)
-    new = normalize_openapi(new_raw)
+def diff_openapi(
+    old_raw: Mapping[str, Any],
+    new_raw: Mapping[str, Any],
+    *,
+    rules: RuleSet | None = None,
+    compact: bool = False,
+) -> DiffResult:
+    """
+    Diff two OpenAPI documents.
 
+    The parts that differ are canonicalized first (see `canonicalize_pair`):
+    documents that only differ in spelling are not normalized or diffed at
+    all. Otherwise components are compared first, and only the path items
+    that changed or reach a changed component are normalized and diffed (see
+    `normalize_changed`). See `diff_normalized` for `compact`.
+    """
+    old_raw, new_raw = canonicalize_pair(old_raw, new_raw)
+    if same_json(old_raw, new_raw):
+        return DiffResult()
+    old, new = normalize_changed(old_raw, new_raw)
+    return diff_normalized(old, new, rules=rules, compact=compact)
+
+
+def diff_openapi_shard(
+    old_raw: Mapping[str, Any],
+    new_raw: Mapping[str, Any],
+    shard: Shard,
+    *,
+    rules: RuleSet | None = None,
+) -> PartialResult:
+    """
+    The part of `diff_openapi(old_raw, new_raw)` owned by `shard`; only the
+    operations it owns are normalized. See `diff_shard`.
+    """
+    old_raw, new_raw = canonicalize_pair(old_raw, new_raw)
+    if same_json(old_raw, new_raw):
+        return PartialResult(shard)
+    old, new = normalize_changed(old_raw, new_raw, select=shard.owns)
+    return diff_shard(old, new, shard, rules=rules)
+
+
+@timed("diff")
+def diff_shard(
+    old: NormalizedOpenAPI,
+    new: NormalizedOpenAPI,
+    shard: Shard,
+    *,
+    rules: RuleSet | None = None,
+) -> PartialResult:
+    """
+    The changes of `diff_normalized(old, new)` that `shard` owns, grouped for
+    `merge_partials`.
+
+    Common operations, and added or removed ones, belong to the shard owning
+    their key ("GET /users"); added or removed paths to the shard owning the
+    path. Merging the partials of every shard gives the single-process result.
+    """
+    rules = rules or DEFAULT_RULESET
+    partial = PartialResult(shard)
+    enum_deltas: EnumDeltas = {}
+
+    for key, owner, kind, context, change_type, path, message in _diff_structure(
+        old, new
+    ):
+        if shard.owns(owner):
+            group = DiffResult()
+            rules.emit(group, kind, context, change_type, path, message=message)
+            partial.add(key, group)
+
+    common_ops = set(old.operations.keys()) & set(new.operations.keys())
+    for op_key in sorted(common_ops):
+        if not shard.owns(op_key):
+            continue
+        checkpoint()
+        group = DiffResult()
+        _diff_operation(
+            op_key,
+            old.operations[op_key],
+            new.operations[op_key],
+            group,
+            rules,
+            enum_deltas=enum_deltas,
+        )
+        partial.add((3, op_key), group)
+    return partial
+
+
+@timed("diff")
+def diff_normalized(
+    old: NormalizedOpenAPI,
+    new: NormalizedOpenAPI,
+    *,
+    rules: RuleSet | None = None,
+    cache: dict[str, tuple] | None = None,
+    compact: bool = False,
+) -> DiffResult:
+    """
+    Diff two already-normalized OpenAPI documents.
+
+    Useful when one side is reused across several diffs (it only has to be
+    normalized once). Severities come from `rules` (default rules if omitted).
+
+    `cache` keeps per-operation changes between calls with the same rules:
+    operations whose old and new `OperationSchemas` are the same objects as
+    in the previous call are not diffed again (see `IncrementalNormalizer`).
+
+    `compact` reports a change inside a shared component once, under
+    "components.schemas.<Name>", with the operations that reach it in
+    `Change.affected`, instead of once per operation, status and parameter
+    using the component. Each component is also diffed only once per context.
+    Components of snapshots are not known and stay reported per use.
+    """
+    if compact and cache is not None:
+        raise ValueError("compact cannot be combined with a per-operation cache")
+    rules = rules or DEFAULT_RULESET
+    emit = rules.emit
     result = DiffResult()
+    result.metrics.merge(old.metrics).merge(new.metrics)
+    seen: dict[str, tuple] = {}
+    shared = SharedComponents(old.resolved, new.resolved) if compact else None
+    enum_deltas: EnumDeltas = {}
+
+    for _, _, kind, context, change_type, path, message in _diff_structure(old, new):
+        emit(result, kind, context, change_type, path, message=message)
 
+    # Common operations: params + request + responses
+    common_ops = set(old.operations.keys()) & set(new.operations.keys())
+    for op_key in sorted(common_ops):
+        checkpoint()
+        old_op = old.operations[op_key]
+        new_op = new.operations[op_key]
+        if cache is None:
+            if shared is not None:
+                shared.owner = op_key
+            _diff_operation(op_key, old_op, new_op, result, rules, shared, enum_deltas)
+            continue
+
+        # operations normalized once and reused keep their identity
+        cached = cache.get(op_key)
+        if cached is None or cached[0] is not old_op or cached[1] is not new_op:
+            partial = DiffResult()
+            _diff_operation(
+                op_key, old_op, new_op, partial, rules, enum_deltas=enum_deltas
+            )
+            result.metrics.merge(partial.metrics)
+            cached = (old_op, new_op, partial)
+        seen[op_key] = cached
+        result.breaking.extend(cached[2].breaking)
+        result.non_breaking.extend(cached[2].non_breaking)
+
+    if cache is not None:
+        cache.clear()
+        cache.update(seen)
+    if shared is not None:
+        shared.report(result)
+
+    return result
+
+
+def _diff_structure(
+    old: NormalizedOpenAPI, new: NormalizedOpenAPI
+) -> Iterator[tuple[GroupKey, str, str, str, ChangeType, str, str]]:
+    """
+    Paths and operations removed or added, in report order, as (group key,
+    owner key for sharding, rule kind, context, change type, path, message).
+    """
     old_paths = set(old.paths.keys())
     new_paths = set(new.paths.keys())
 
-    # Paths removed/added
+    removed, added = ChangeType.REMOVED_FIELD, ChangeType.ADDED_FIELD
+
     for p in sorted(old_paths - new_paths):
-        result.breaking.append(
-            Change(
-                ChangeType.REMOVED_FIELD,
-                ChangeSeverity.BREAKING,
-                f"paths.{p}",
-                message="Path removed",
-            )
-        )
+        key = (0, p)
+        yield key, p, "path_removed", "path", removed, f"paths.{p}", "Path removed"
     for p in sorted(new_paths - old_paths):
-        result.non_breaking.append(
-            Change(
-                ChangeType.ADDED_FIELD,
-                ChangeSeverity.NON_BREAKING,
-                f"paths.{p}",
-                message="Path added",
-            )
-        )
+        key = (1, p)
+        yield key, p, "path_added", "path", added, f"paths.{p}", "Path added"
 
-    # Operations removed/added
     for p in sorted(old_paths & new_paths):
         old_methods = set(old.paths.get(p, set()))
         new_methods = set(new.paths.get(p, set()))
 
         for m in sorted(old_methods - new_methods):
-            result.breaking.append(
-                Change(
-                    ChangeType.REMOVED_FIELD,
-                    ChangeSeverity.BREAKING,
-                    f"paths.{p}.{m}",
-                    message="Operation removed",
-                )
-            )
+            key, op_key, path = (2, p, 0, m), f"{m.upper()} {p}", f"paths.{p}.{m}"
+            kind, message = "operation_removed", "Operation removed"
+            yield key, op_key, kind, "operation", removed, path, message
         for m in sorted(new_methods - old_methods):
-            result.non_breaking.append(
-                Change(
-                    ChangeType.ADDED_FIELD,
-                    ChangeSeverity.NON_BREAKING,
-                    f"paths.{p}.{m}",
-                    message="Operation added",
-                )
-            )
+            key, op_key, path = (2, p, 1, m), f"{m.upper()} {p}", f"paths.{p}.{m}"
+            kind, message = "operation_added", "Operation added"
+            yield key, op_key, kind, "operation", added, path, message
 
-    # Common operations: params + request + responses
-    common_ops = set(old.operations.keys()) & set(new.operations.keys())
-    for op_key in sorted(common_ops):
-        old_op = old.operations[op_key]
-        new_op = new.operations[op_key]
 
-        # ----------------------------
-        # PARAMETERS (query/path)
-        # ----------------------------
-        old_params = old_op.parameters
-        new_params = new_op.parameters
-
-        old_keys = set(old_params.keys())
-        new_keys = set(new_params.keys())
-
-        # removed params -> breaking
-        for k in sorted(old_keys - new_keys):
-            spec = old_params[k]
-            result.breaking.append(
-                Change(
-                    change_type=ChangeType.REMOVED_FIELD,
-                    severity=ChangeSeverity.BREAKING,
-                    path=f"operations.{op_key}.parameters.{spec.location}.{spec.name}",
-                    message="Parameter removed",
-                )
-            )
+def _diff_operation(
+    op_key: str,
+    old_op: OperationSchemas,
+    new_op: OperationSchemas,
+    result: DiffResult,
+    rules: RuleSet,
+    shared: SharedComponents | None = None,
+    enum_deltas: EnumDeltas | None = None,
+) -> None:
+    emit = rules.emit
 
-        # added params -> required? breaking else non-breaking
-        for k in sorted(new_keys - old_keys):
-            spec = new_params[k]
-            if spec.required:
-                result.breaking.append(
-                    Change(
-                        change_type=ChangeType.REQUIRED_CHANGE,
-                        severity=ChangeSeverity.BREAKING,
-                        path=f"operations.{op_key}.parameters.{spec.location}.{spec.name}",
-                        message="Required parameter added",
-                    )
-                )
-            else:
-                result.non_breaking.append(
-                    Change(
-                        change_type=ChangeType.ADDED_FIELD,
-                        severity=ChangeSeverity.NON_BREAKING,
-                        path=f"operations.{op_key}.parameters.{spec.location}.{spec.name}",
-                        message="Optional parameter added",
-                    )
-                )
+    # ----------------------------
+    # PARAMETERS (query/path)
+    # ----------------------------
+    old_params = old_op.parameters
+    new_params = new_op.parameters
 
-        # common params: required flip + schema diff
-        for k in sorted(old_keys & new_keys):
-            o = old_params[k]
-            n = new_params[k]
-
-            if o.required != n.required:
-                if n.required:
-                    result.breaking.append(
-                        Change(
-                            change_type=ChangeType.REQUIRED_CHANGE,
-                            severity=ChangeSeverity.BREAKING,
-                            path=f"operations.{op_key}.parameters.{n.location}.{n.name}.required",
-                            message="Parameter became required",
-                        )
-                    )
-                else:
-                    result.non_breaking.append(
-                        Change(
-                            change_type=ChangeType.REQUIRED_CHANGE,
-                            severity=ChangeSeverity.NON_BREAKING,
-                            path=f"operations.{op_key}.parameters.{n.location}.{n.name}.required",
-                            message="Parameter is no longer required",
-                        )
-                    )
-
-            if isinstance(o.schema, dict) and isinstance(n.schema, dict):
-                diff_json_schema(
-                    o.schema,
-                    n.schema,
-                    path=f"operations.{op_key}.parameters.{n.location}.{n.name}.schema",
-                    result=result,
-                )
+    old_keys = set(old_params.keys())
+    new_keys = set(new_params.keys())
 
-        # ----------------------------
-        # requestBody presence + schema
-        # ----------------------------
-        old_has_req = old_op.request_schema is not None
-        new_has_req = new_op.request_schema is not None
-
-        if old_has_req and not new_has_req:
-            result.breaking.append(
-                Change(
-                    ChangeType.REMOVED_FIELD,
-                    ChangeSeverity.BREAKING,
-                    f"operations.{op_key}.requestBody",
-                    message="Request body removed",
-                )
+    # removed params -> breaking
+    for k in sorted(old_keys - new_keys):
+        spec = old_params[k]
+        emit(
+            result,
+            "parameter_removed",
+            "parameter",
+            ChangeType.REMOVED_FIELD,
+            f"operations.{op_key}.parameters.{spec.location}.{spec.name}",
+            message="Parameter removed",
+        )
+
+    # added params -> required? breaking else non-breaking
+    for k in sorted(new_keys - old_keys):
+        spec = new_params[k]
+        path = f"operations.{op_key}.parameters.{spec.location}.{spec.name}"
+        if spec.required:
+            emit(
+                result,
+                "required_parameter_added",
+                "parameter",
+                ChangeType.REQUIRED_CHANGE,
+                path,
+                message="Required parameter added",
             )
-        elif (not old_has_req) and new_has_req:
-            if new_op.request_required:
-                result.breaking.append(
-                    Change(
-                        ChangeType.REQUIRED_CHANGE,
-                        ChangeSeverity.BREAKING,
-                        f"operations.{op_key}.requestBody",
-                        message="Required request body added",
-                    )
+        else:
+            emit(
+                result,
+                "optional_parameter_added",
+                "parameter",
+                ChangeType.ADDED_FIELD,
+                path,
+                message="Optional parameter added",
+            )
+
+    # common params: required flip + schema diff
+    for k in sorted(old_keys & new_keys):
+        o = old_params[k]
+        n = new_params[k]
+        path = f"operations.{op_key}.parameters.{n.location}.{n.name}"
+
+        if o.required != n.required:
+            if n.required:
+                emit(
+                    result,
+                    "parameter_became_required",
+                    "parameter",
+                    ChangeType.REQUIRED_CHANGE,
+                    f"{path}.required",
+                    message="Parameter became required",
                 )
             else:
-                result.non_breaking.append(
-                    Change(
-                        ChangeType.ADDED_FIELD,
-                        ChangeSeverity.NON_BREAKING,
-                        f"operations.{op_key}.requestBody",
-                        message="Optional request body added",
-                    )
+                emit(
+                    result,
+                    "parameter_became_optional",
+                    "parameter",
+                    ChangeType.REQUIRED_CHANGE,
+                    f"{path}.required",
+                    message="Parameter is no longer required",
                 )
-        elif old_has_req and new_has_req:
+
+        if isinstance(o.schema, dict) and isinstance(n.schema, dict):
             diff_json_schema(
-                old_op.request_schema or {},
-                new_op.request_schema or {},
-                path=f"operations.{op_key}.requestBody.schema",
+                o.schema,
+                n.schema,
+                path=f"{path}.schema",
                 result=result,
+                context="parameter",
+                rules=rules,
+                shared=shared,
+                enum_deltas=enum_deltas,
             )
 
-            if old_op.request_required != new_op.request_required:
-                if new_op.request_required:
-                    result.breaking.append(
-                        Change(
-                            ChangeType.REQUIRED_CHANGE,
-                            ChangeSeverity.BREAKING,
-                            f"operations.{op_key}.requestBody.required",
-                            message="Request body became required",
-                        )
-                    )
-                else:
-                    result.non_breaking.append(
-                        Change(
-                            ChangeType.REQUIRED_CHANGE,
-                            ChangeSeverity.NON_BREAKING,
-                            f"operations.{op_key}.requestBody.required",
-                            message="Request body is no longer required",
-                        )
-                    )
-
-        # ----------------------------
-        # responses: statuses + schema
-        # ----------------------------
-        old_statuses = set(old_op.responses.keys())
-        new_statuses = set(new_op.responses.keys())
-
-        for status in sorted(old_statuses - new_statuses):
-            result.breaking.append(
-                Change(
-                    ChangeType.REMOVED_FIELD,
-                    ChangeSeverity.BREAKING,
-                    f"operations.{op_key}.responses.{status}",
-                    message="Response status removed",
-                )
+    # ----------------------------
+    # requestBody presence + schema
+    # ----------------------------
+    old_has_req = old_op.request_schema is not None
+    new_has_req = new_op.request_schema is not None
+
+    if old_has_req and not new_has_req:
+        emit(
+            result,
+            "request_body_removed",
+            "request",
+            ChangeType.REMOVED_FIELD,
+            f"operations.{op_key}.requestBody",
+            message="Request body removed",
+        )
+    elif (not old_has_req) and new_has_req:
+        if new_op.request_required:
+            emit(
+                result,
+                "required_request_body_added",
+                "request",
+                ChangeType.REQUIRED_CHANGE,
+                f"operations.{op_key}.requestBody",
+                message="Required request body added",
             )
-        for status in sorted(new_statuses - old_statuses):
-            result.non_breaking.append(
-                Change(
-                    ChangeType.ADDED_FIELD,
-                    ChangeSeverity.NON_BREAKING,
-                    f"operations.{op_key}.responses.{status}",
-                    message="Response status added",
-                )
+        else:
+            emit(
+                result,
+                "optional_request_body_added",
+                "request",
+                ChangeType.ADDED_FIELD,
+                f"operations.{op_key}.requestBody",
+                message="Optional request body added",
             )
+    elif old_has_req and new_has_req:
+        diff_json_schema(
+            old_op.request_schema or {},
+            new_op.request_schema or {},
+            path=f"operations.{op_key}.requestBody.schema",
+            result=result,
+            context="request",
+            rules=rules,
+            shared=shared,
+            enum_deltas=enum_deltas,
+        )
 
-        for status in sorted(old_statuses & new_statuses):
-            old_schema = old_op.responses.get(status)
-            new_schema = new_op.responses.get(status)
-
-            if old_schema is not None and new_schema is None:
-                result.breaking.append(
-                    Change(
-                        ChangeType.REMOVED_FIELD,
-                        ChangeSeverity.BREAKING,
-                        f"operations.{op_key}.responses.{status}.schema",
-                        message="Response schema removed",
-                    )
-                )
-                continue
-            if old_schema is None and new_schema is not None:
-                result.non_breaking.append(
-                    Change(
-                        ChangeType.ADDED_FIELD,
-                        ChangeSeverity.NON_BREAKING,
-                        f"operations.{op_key}.responses.{status}.schema",
-                        message="Response schema added",
-                    )
+        if old_op.request_required != new_op.request_required:
+            if new_op.request_required:
+                emit(
+                    result,
+                    "request_body_became_required",
+                    "request",
+                    ChangeType.REQUIRED_CHANGE,
+                    f"operations.{op_key}.requestBody.required",
+                    message="Request body became required",
                 )
-                continue
-
-            if isinstance(old_schema, dict) and isinstance(new_schema, dict):
-                diff_json_schema(
-                    old_schema,
-                    new_schema,
-                    path=f"operations.{op_key}.responses.{status}.schema",
-                    result=result,
+            else:
+                emit(
+                    result,
+                    "request_body_became_optional",
+                    "request",
+                    ChangeType.REQUIRED_CHANGE,
+                    f"operations.{op_key}.requestBody.required",
+                    message="Request body is no longer required",
                 )
 
-    return result
+    # ----------------------------
+    # responses: statuses + schema
+    # ----------------------------
+    old_statuses = set(old_op.responses.keys())
+    new_statuses = set(new_op.responses.keys())
+
+    for status in sorted(old_statuses - new_statuses):
+        emit(
+            result,
+            "response_status_removed",
+            "response",
+            ChangeType.REMOVED_FIELD,
+            f"operations.{op_key}.responses.{status}",
+            message="Response status removed",
+        )
+    for status in sorted(new_statuses - old_statuses):
+        emit(
+            result,
+            "response_status_added",
+            "response",
+            ChangeType.ADDED_FIELD,
+            f"operations.{op_key}.responses.{status}",
+            message="Response status added",
+        )
+
+    for status in sorted(old_statuses & new_statuses):
+        old_schema = old_op.responses.get(status)
+        new_schema = new_op.responses.get(status)
+
+        if old_schema is not None and new_schema is None:
+            emit(
+                result,
+                "response_schema_removed",
+                "response",
+                ChangeType.REMOVED_FIELD,
+                f"operations.{op_key}.responses.{status}.schema",
+                message="Response schema removed",
+            )
+            continue
+        if old_schema is None and new_schema is not None:
+            emit(
+                result,
+                "response_schema_added",
+                "response",
+                ChangeType.ADDED_FIELD,
+                f"operations.{op_key}.responses.{status}.schema",
+                message="Response schema added",
+            )
+            continue
+
+        if isinstance(old_schema, dict) and isinstance(new_schema, dict):
+            diff_json_schema(
+                old_schema,
+                new_schema,
+                path=f"operations.{op_key}.responses.{status}.schema",
+                result=result,
+                context="response",
+                rules=rules,
+                shared=shared,
+                enum_deltas=enum_deltas,
+            )
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Set
+
+from ..cancellation import checkpoint
+from ..canonical import same_json
+from ..models import DiffMetrics
+from ..profiling import timed
+from .normalizer import NormalizedOpenAPI, OperationSchemas, normalize_path_item
+
+_PathItem = tuple[Set[str], Dict[str, OperationSchemas]]
+
+
+class IncrementalNormalizer:
+    """
+    Normalize successive versions of one OpenAPI document, redoing only what
+    changed.
+
+    A path item is normalized again when its own content changed or when it
+    references (directly or through other components) a component that
+    changed; every other path item keeps its previous `OperationSchemas`
+    objects, which lets `diff_normalized(..., cache=...)` skip them too.
+    Resolved components that did not change stay in the resolver memo.
+
+        normalizer = IncrementalNormalizer()
+        first = normalizer.update(raw)
+        second = normalizer.update(edited_raw)  # cheap for small edits
+    """
+
+    def __init__(self) -> None:
+        self.raw: Optional[Mapping[str, Any]] = None
+        self.normalized: Optional[NormalizedOpenAPI] = None
+        # path items normalized by the last `update`
+        self.renormalized = 0
+        self._memo: dict[str, dict[str, Any]] = {}
+        self._items: dict[str, _PathItem] = {}
+        # component ref / path -> component refs found in it
+        self._component_refs: dict[str, frozenset[str]] = {}
+        self._item_refs: dict[str, frozenset[str]] = {}
+
+    @timed("normalize")
+    def update(self, raw: Mapping[str, Any]) -> NormalizedOpenAPI:
+        paths_raw = raw.get("paths") or {}
+        if not isinstance(paths_raw, dict):
+            raise ValueError("OpenAPI 'paths' must be an object")
+
+        previous = self.raw or {}
+        old_components = _components(previous)
+        new_components = _components(raw)
+        changed = {
+            ref
+            for ref in old_components.keys() | new_components.keys()
+            if not same_json(old_components.get(ref), new_components.get(ref))
+        }
+        for ref in changed:
+            if ref in new_components:
+                self._component_refs[ref] = _refs(new_components[ref])
+            else:
+                self._component_refs.pop(ref, None)
+        affected = _dependents(self._component_refs.items(), changed)
+        for ref in [r for r in self._memo if _component_of(r) in affected]:
+            del self._memo[ref]
+
+        old_paths = previous.get("paths") or {}
+        if not isinstance(old_paths, dict):
+            old_paths = {}
+        metrics = DiffMetrics()
+        items: dict[str, _PathItem] = {}
+        renormalized = 0
+        for path, path_item in paths_raw.items():
+            checkpoint()
+            if not isinstance(path, str) or not isinstance(path_item, dict):
+                continue
+            item = self._items.get(path)
+            if (
+                item is None
+                or not same_json(old_paths.get(path), path_item)
+                or self._item_refs[path] & affected
+            ):
+                self._item_refs[path] = _refs(path_item)
+                item = normalize_path_item(path, path_item, raw, self._memo, metrics)
+                renormalized += 1
+            items[path] = item
+        for path in self._items.keys() - items.keys():
+            self._item_refs.pop(path, None)
+
+        operations: Dict[str, OperationSchemas] = {}
+        for _, item_operations in items.values():
+            operations.update(item_operations)
+        self.raw = raw
+        self._items = items
+        self.renormalized = renormalized
+        self.normalized = NormalizedOpenAPI(
+            paths={path: methods for path, (methods, _) in items.items()},
+            operations=operations,
+            metrics=metrics,
+            # a copy: the memo loses entries on the next update
+            resolved=dict(self._memo),
+        )
+        return self.normalized
+
+
+@timed("normalize")
+def normalize_changed(
+    old_raw: Mapping[str, Any],
+    new_raw: Mapping[str, Any],
+    *,
+    select: Optional[Callable[[str], bool]] = None,
+) -> tuple[NormalizedOpenAPI, NormalizedOpenAPI]:
+    """
+    Normalize only what can differ between two OpenAPI documents, for
+    `diff_normalized`.
+
+    Components are compared first, at the definition level. A path item found
+    in both documents is normalized (on both sides) only when its own content
+    changed or it references, directly or through other components, a
+    component that changed. The other path items cannot produce changes:
+    they are listed in `paths` without methods and left out of `operations`,
+    as are path items found on one side only.
+
+    `select` (an operation key predicate, e.g. `Shard.owns`) further limits
+    `operations` to the operations it accepts.
+    """
+    old_paths = _path_items(old_raw)
+    new_paths = _path_items(new_raw)
+
+    old_components = _components(old_raw)
+    new_components = _components(new_raw)
+    changed = {
+        ref
+        for ref in old_components.keys() | new_components.keys()
+        if not same_json(old_components.get(ref), new_components.get(ref))
+    }
+    # unchanged components have the same refs on both sides
+    component_refs = itertools.chain(
+        ((ref, _refs(definition)) for ref, definition in new_components.items()),
+        ((ref, _refs(old_components[ref])) for ref in changed if ref in old_components),
+    )
+    affected = _dependents(component_refs, changed) if changed else set()
+
+    old_items: dict[str, Set[str]] = {}
+    new_items: dict[str, Set[str]] = {}
+    deep: list[str] = []
+    # in document order, for reproducible resolver work
+    for path in {**new_paths, **old_paths}:
+        old_item = old_paths.get(path)
+        new_item = new_paths.get(path)
+        if (
+            old_item is None
+            or new_item is None
+            or (
+                same_json(old_item, new_item)
+                and not (affected and _refs(new_item) & affected)
+            )
+        ):
+            if old_item is not None:
+                old_items[path] = set()
+            if new_item is not None:
+                new_items[path] = set()
+        else:
+            deep.append(path)
+
+    old_memo: dict[str, dict[str, Any]] = {}
+    old_metrics = DiffMetrics()
+    old_operations: Dict[str, OperationSchemas] = {}
+    for path in deep:
+        checkpoint()
+        old_items[path], operations = normalize_path_item(
+            path, old_paths[path], old_raw, old_memo, old_metrics, select
+        )
+        old_operations.update(operations)
+
+    # Components that are not affected resolve to the same schema on both
+    # sides: share those objects, so that diff_json_schema skips them by
+    # identity instead of walking two equal copies.
+    new_memo = {
+        ref: schema
+        for ref, schema in old_memo.items()
+        if _component_of(ref) not in affected
+    }
+    new_metrics = DiffMetrics()
+    new_operations: Dict[str, OperationSchemas] = {}
+    for path in deep:
+        checkpoint()
+        new_items[path], operations = normalize_path_item(
+            path, new_paths[path], new_raw, new_memo, new_metrics, select
+        )
+        new_operations.update(operations)
+
+    return (
+        NormalizedOpenAPI(old_items, old_operations, old_metrics, old_memo),
+        NormalizedOpenAPI(new_items, new_operations, new_metrics, new_memo),
+    )
+
+
+def _path_items(raw: Mapping[str, Any]) -> dict[str, Mapping[str, Any]]:
+    paths_raw = raw.get("paths") or {}
+    if not isinstance(paths_raw, dict):
+        raise ValueError("OpenAPI 'paths' must be an object")
+    return {
+        path: path_item
+        for path, path_item in paths_raw.items()
+        if isinstance(path, str) and isinstance(path_item, dict)
+    }
+
+
+def _dependents(
+    component_refs: Iterable[tuple[str, frozenset[str]]], changed: Set[str]
+) -> Set[str]:
+    """
+    `changed` plus every component that references one of them, directly or
+    not, given (component ref, component refs found in it) pairs.
+    """
+    referrers: dict[str, list[str]] = {}
+    for ref, targets in component_refs:
+        for target in targets:
+            referrers.setdefault(target, []).append(ref)
+    affected = set(changed)
+    stack = list(changed)
+    while stack:
+        for ref in referrers.get(stack.pop(), ()):
+            if ref not in affected:
+                affected.add(ref)
+                stack.append(ref)
+    return affected
+
+
+def _components(raw: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    "#/components/<section>/<name>" -> definition, for every component.
+    """
+    out: dict[str, Any] = {}
+    components = raw.get("components")
+    if not isinstance(components, dict):
+        return out
+    for section, entries in components.items():
+        if not isinstance(entries, dict):
+            continue
+        for name, definition in entries.items():
+            out[f"#/components/{section}/{_escape(str(name))}"] = definition
+    return out
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _component_of(ref: str) -> str:
+    # "#/components/schemas/User/properties/id" -> "#/components/schemas/User"
+    return "/".join(ref.split("/", 4)[:4])
+
+
+def _refs(node: Any) -> frozenset[str]:
+    return frozenset(_component_of(ref) for ref in _iter_refs(node))
+
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/components/"):
+                yield ref
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
@@ -1,6 +1,127 @@
-from typing import Any, Mapping
+import dataclasses
+import json
+from typing import Any, Hashable, Mapping, Optional
 
-from ..models import Change, ChangeSeverity, ChangeType, DiffResult
+from ..canonical import same_json
+from ..models import ChangeSeverity, ChangeType, DiffMetrics, DiffResult
+from ..rules import DEFAULT_RULESET, RuleSet
+
+# Enum changes are reported in bulk: a count plus this many sample values.
+ENUM_SAMPLE_SIZE = 5
+
+# (id(old), id(new)) -> (old, new, removed, added), for one diff (see
+# `diff_json_schema`). Resolved components are shared objects, so a large enum
+# used under many operations is compared once. Entries hold the lists
+# themselves, which keeps their ids stable while the diff runs.
+EnumDeltas = dict[tuple[int, int], tuple[list, list, list, list]]
+
+
+class SharedComponents:
+    """
+    Component-level reporting for `diff_normalized(..., compact=True)`.
+
+    A schema pair that is the resolved form of the same component on both
+    sides (e.g. "#/components/schemas/User") is diffed once per context,
+    under "components.schemas.User", however many operations reach it; every
+    later use only records its owner (the operation, or the component that
+    embeds it). `report` then adds each of those changes once, with the
+    operations that reach it as `Change.affected`.
+    """
+
+    def __init__(
+        self,
+        old_resolved: Mapping[str, Mapping[str, Any]],
+        new_resolved: Mapping[str, Mapping[str, Any]],
+    ) -> None:
+        # resolvers memoize each component as one object, so a pair of
+        # object ids identifies it (both memos keep the objects alive)
+        self._pairs: dict[tuple[int, int], str] = {}
+        for ref, old in old_resolved.items():
+            new = new_resolved.get(ref)
+            if new is not None and _is_schema_component(ref):
+                self._pairs[(id(old), id(new))] = ref
+        # op key, or component ref, whose schemas are being diffed
+        self.owner = ""
+        self._results: dict[tuple[str, str], DiffResult] = {}
+        self._owners: dict[tuple[str, str], set[str]] = {}
+
+    def component(self, old: Mapping[str, Any], new: Mapping[str, Any]) -> str | None:
+        ref = self._pairs.get((id(old), id(new)))
+        return None if ref == self.owner else ref
+
+    def use(
+        self,
+        ref: str,
+        old: Mapping[str, Any],
+        new: Mapping[str, Any],
+        *,
+        context: str,
+        rules: RuleSet,
+        metrics: DiffMetrics,
+        enum_deltas: Optional[EnumDeltas] = None,
+    ) -> None:
+        key = (ref, context)
+        owners = self._owners.get(key)
+        if owners is None:
+            owners = self._owners[key] = set()
+            partial = DiffResult()
+            outer, self.owner = self.owner, ref
+            try:
+                diff_json_schema(
+                    old,
+                    new,
+                    path=_component_path(ref),
+                    result=partial,
+                    context=context,
+                    rules=rules,
+                    shared=self,
+                    enum_deltas=enum_deltas,
+                )
+            finally:
+                self.owner = outer
+            metrics.merge(partial.metrics)
+            self._results[key] = partial
+        owners.add(self.owner)
+
+    def report(self, result: DiffResult) -> None:
+        """
+        Append every component change, in path order, to `result`.
+        """
+        reached: dict[tuple[str, str], frozenset[str]] = {}
+
+        def operations(key: tuple[str, str]) -> frozenset[str]:
+            found = reached.get(key)
+            if found is None:
+                reached[key] = frozenset()  # cycle guard
+                ops: set[str] = set()
+                for owner in self._owners[key]:
+                    if owner.startswith("#/"):
+                        ops |= operations((owner, key[1]))
+                    else:
+                        ops.add(owner)
+                found = reached[key] = frozenset(ops)
+            return found
+
+        for key in sorted(self._results, key=lambda k: (_component_path(k[0]), k[1])):
+            partial = self._results[key]
+            if not partial.breaking and not partial.non_breaking:
+                continue
+            affected = tuple(sorted(operations(key)))
+            for change in partial.breaking + partial.non_breaking:
+                change = dataclasses.replace(change, affected=affected)
+                if change.severity is ChangeSeverity.BREAKING:
+                    result.breaking.append(change)
+                else:
+                    result.non_breaking.append(change)
+
+
+def _is_schema_component(ref: str) -> bool:
+    return ref.startswith("#/components/schemas/") and ref.count("/") == 3
+
+
+def _component_path(ref: str) -> str:
+    # "#/components/schemas/a~1b" -> "components.schemas.a/b"
+    return ref[2:].replace("/", ".").replace("~1", "/").replace("~0", "~")
 
 
 def _get_type(schema: Mapping[str, Any]) -> str | None:
@@ -10,12 +131,131 @@ def _get_type(schema: Mapping[str, Any]) -> str | None:
     return None
 
 
+def _enum_key(value: Any) -> Hashable:
+    # JSON semantics: true != 1, 1 == 1.0; unhashable values by canonical JSON
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    if value is None or isinstance(value, str):
+        return value
+    return ("json", json.dumps(value, sort_keys=True, default=str))
+
+
+def _enum_delta(
+    old_values: list,
+    new_values: list,
+    metrics: DiffMetrics,
+    enum_deltas: Optional[EnumDeltas],
+) -> tuple[list, list]:
+    """
+    Values removed from and added to an enum, in their original order.
+    """
+    key = (id(old_values), id(new_values))
+    hit = enum_deltas.get(key) if enum_deltas is not None else None
+    if hit is not None and hit[0] is old_values and hit[1] is new_values:
+        metrics.enum_cache_hits += 1
+        return hit[2], hit[3]
+    metrics.enum_cache_misses += 1
+
+    old_keys = frozenset(map(_enum_key, old_values))
+    new_keys = frozenset(map(_enum_key, new_values))
+    removed = [v for v in old_values if _enum_key(v) not in new_keys]
+    added = [v for v in new_values if _enum_key(v) not in old_keys]
+
+    if enum_deltas is not None:
+        enum_deltas[key] = (old_values, new_values, removed, added)
+    return removed, added
+
+
+def _enum_message(prefix: str, values: list) -> str:
+    sample = ", ".join(json.dumps(v, default=str) for v in values[:ENUM_SAMPLE_SIZE])
+    more = ", ..." if len(values) > ENUM_SAMPLE_SIZE else ""
+    return f"{prefix} ({len(values)}): {sample}{more}"
+
+
+def _diff_enum(
+    old: Mapping[str, Any],
+    new: Mapping[str, Any],
+    *,
+    path: str,
+    result: DiffResult,
+    context: str,
+    rules: RuleSet,
+    enum_deltas: Optional[EnumDeltas],
+) -> None:
+    old_enum = old.get("enum")
+    new_enum = new.get("enum")
+    old_is_enum = isinstance(old_enum, list)
+    new_is_enum = isinstance(new_enum, list)
+
+    if not old_is_enum and not new_is_enum:
+        return
+
+    # enum constraint added -> narrowing (breaking)
+    if not old_is_enum:
+        rules.emit(
+            result,
+            "enum_constraint_added",
+            context,
+            ChangeType.ENUM_CHANGE,
+            f"{path}.enum",
+            message=_enum_message("Enum constraint added", new_enum),
+        )
+        return
+
+    # enum constraint removed -> widening (non-breaking)
+    if not new_is_enum:
+        rules.emit(
+            result,
+            "enum_constraint_removed",
+            context,
+            ChangeType.ENUM_CHANGE,
+            f"{path}.enum",
+            message="Enum constraint removed",
+        )
+        return
+
+    # unchanged enums (the common case) never build sets
+    if same_json(old_enum, new_enum):
+        return
+
+    removed, added = _enum_delta(old_enum, new_enum, result.metrics, enum_deltas)
+
+    # values removed -> breaking
+    if removed:
+        rules.emit(
+            result,
+            "enum_values_removed",
+            context,
+            ChangeType.ENUM_CHANGE,
+            f"{path}.enum",
+            message=_enum_message("Enum values removed", removed),
+        )
+
+    # values added -> non-breaking
+    if added:
+        rules.emit(
+            result,
+            "enum_values_added",
+            context,
+            ChangeType.ENUM_CHANGE,
+            f"{path}.enum",
+            message=_enum_message("Enum values added", added),
+        )
+
+
 def diff_json_schema(
     old: Mapping[str, Any],
     new: Mapping[str, Any],
     *,
     path: str,
     result: DiffResult,
+    context: str = "schema",
+    rules: RuleSet | None = None,
+    depth: int = 0,
+    shared: Optional[SharedComponents] = None,
+    enum_deltas: Optional[EnumDeltas] = None,
 ) -> None:
     """
     Minimal JSON Schema diff used inside OpenAPI request/response checks.
@@ -24,33 +264,77 @@ def diff_json_schema(
       - type change
       - removed property
       - optional -> required (required added)
+      - enum values removed / enum constraint added
 
     Non-breaking:
       - added property
       - required -> optional (required removed)
+      - enum values added / enum constraint removed
+
+    These are the default severities; `rules` can override them per
+    `context` ("parameter", "request", "response" or "schema").
 
     Supports:
       - object/properties/required
       - array/items
       - primitive type comparison
+
+    `depth` is the nesting level below the diffed schema (for `result.metrics`).
+
+    With `shared`, changes inside a component are reported once, at the
+    component's own path (see `SharedComponents`). `enum_deltas` (one dict
+    per top-level diff) remembers enum comparisons, for enum lists shared by
+    many schemas.
     """
+    metrics = result.metrics
+    metrics.schema_nodes += 1
+    if depth > metrics.max_diff_depth:
+        metrics.max_diff_depth = depth
+    if old is new:
+        # e.g. a component resolved once and shared by both documents
+        return
+
+    rules = rules or DEFAULT_RULESET
+    if shared is not None:
+        ref = shared.component(old, new)
+        if ref is not None:
+            shared.use(
+                ref,
+                old,
+                new,
+                context=context,
+                rules=rules,
+                metrics=result.metrics,
+                enum_deltas=enum_deltas,
+            )
+            return
     old_type = _get_type(old)
     new_type = _get_type(new)
 
     # Type change: if both specified and different -> breaking
     if old_type and new_type and old_type != new_type:
-        result.breaking.append(
-            Change(
-                change_type=ChangeType.TYPE_CHANGE,
-                severity=ChangeSeverity.BREAKING,
-                path=path,
-                old_type=old_type,
-                new_type=new_type,
-                message="Schema type changed",
-            )
+        rules.emit(
+            result,
+            "type_changed",
+            context,
+            ChangeType.TYPE_CHANGE,
+            path,
+            old_type=old_type,
+            new_type=new_type,
+            message="Schema type changed",
         )
         return
 
+    _diff_enum(
+        old,
+        new,
+        path=path,
+        result=result,
+        context=context,
+        rules=rules,
+        enum_deltas=enum_deltas,
+    )
+
     # Object properties
     if (
         (old_type == "object")
@@ -72,24 +356,24 @@ def diff_json_schema(
 
         # removed properties -> breaking
         for k in sorted(old_keys - new_keys):
-            result.breaking.append(
-                Change(
-                    change_type=ChangeType.REMOVED_FIELD,
-                    severity=ChangeSeverity.BREAKING,
-                    path=f"{path}.properties.{k}",
-                    message="Property removed",
-                )
+            rules.emit(
+                result,
+                "property_removed",
+                context,
+                ChangeType.REMOVED_FIELD,
+                f"{path}.properties.{k}",
+                message="Property removed",
             )
 
         # added properties -> non-breaking
         for k in sorted(new_keys - old_keys):
-            result.non_breaking.append(
-                Change(
-                    change_type=ChangeType.ADDED_FIELD,
-                    severity=ChangeSeverity.NON_BREAKING,
-                    path=f"{path}.properties.{k}",
-                    message="Property added",
-                )
+            rules.emit(
+                result,
+                "property_added",
+                context,
+                ChangeType.ADDED_FIELD,
+                f"{path}.properties.{k}",
+                message="Property added",
             )
 
         # required changes
@@ -105,24 +389,24 @@ def diff_json_schema(
 
         # optional -> required (required added) => breaking
         for k in sorted(new_req_set - old_req_set):
-            result.breaking.append(
-                Change(
-                    change_type=ChangeType.REQUIRED_CHANGE,
-                    severity=ChangeSeverity.BREAKING,
-                    path=f"{path}.required.{k}",
-                    message="Field became required",
-                )
+            rules.emit(
+                result,
+                "field_became_required",
+                context,
+                ChangeType.REQUIRED_CHANGE,
+                f"{path}.required.{k}",
+                message="Field became required",
             )
 
         # required -> optional (required removed) => non-breaking
         for k in sorted(old_req_set - new_req_set):
-            result.non_breaking.append(
-                Change(
-                    change_type=ChangeType.REQUIRED_CHANGE,
-                    severity=ChangeSeverity.NON_BREAKING,
-                    path=f"{path}.required.{k}",
-                    message="Field is no longer required",
-                )
+            rules.emit(
+                result,
+                "field_became_optional",
+                context,
+                ChangeType.REQUIRED_CHANGE,
+                f"{path}.required.{k}",
+                message="Field is no longer required",
             )
 
         # recurse into common properties
@@ -130,7 +414,17 @@ def diff_json_schema(
             o = old_props.get(k)
             n = new_props.get(k)
             if isinstance(o, dict) and isinstance(n, dict):
-                diff_json_schema(o, n, path=f"{path}.properties.{k}", result=result)
+                diff_json_schema(
+                    o,
+                    n,
+                    path=f"{path}.properties.{k}",
+                    result=result,
+                    context=context,
+                    rules=rules,
+                    depth=depth + 1,
+                    shared=shared,
+                    enum_deltas=enum_deltas,
+                )
 
         return
 
@@ -145,5 +439,15 @@ def diff_json_schema(
         new_items = new.get("items")
 
         if isinstance(old_items, dict) and isinstance(new_items, dict):
-            diff_json_schema(old_items, new_items, path=f"{path}.items", result=result)
+            diff_json_schema(
+                old_items,
+                new_items,
+                path=f"{path}.items",
+                result=result,
+                context=context,
+                rules=rules,
+                depth=depth + 1,
+                shared=shared,
+                enum_deltas=enum_deltas,
+            )
         return
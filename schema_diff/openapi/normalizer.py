@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Set
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Set
 
+from ..cancellation import checkpoint
+from ..models import DiffMetrics
+from ..profiling import timed
 from .resolver import resolve_schema
 
+# Version of the normalized output (stored in snapshots). Bump it whenever
+# normalization or $ref resolution changes what `normalize_openapi` returns:
+#   2: allOf flattened into one schema
+#   3: type arrays / nullable / required folded (`fold_schema`)
+NORMALIZER_VERSION = 3
+
 _HTTP_METHODS = {"get", "put", "post", "delete", "patch", "head", "options", "trace"}
 _PARAM_IN_ALLOWED = {"query", "path", "header"}
 
@@ -29,82 +38,136 @@ class OperationSchemas:
 class NormalizedOpenAPI:
     paths: Dict[str, Set[str]]
     operations: Dict[str, OperationSchemas]
+    # resolver work done while normalizing
+    metrics: DiffMetrics = field(default_factory=DiffMetrics, compare=False)
+    # resolver memo: component ref -> the resolved schema shared by every
+    # operation using it (empty for snapshots)
+    resolved: Dict[str, Dict[str, Any]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+
+@timed("normalize")
+def normalize_openapi(
+    raw: Mapping[str, Any],
+    *,
+    cache: dict[str, dict[str, Any]] | None = None,
+) -> NormalizedOpenAPI:
+    """
+    Normalize an OpenAPI document into per-operation schemas.
 
-
-def normalize_openapi(raw: Mapping[str, Any]) -> NormalizedOpenAPI:
+    `cache` is the resolver memo (see `resolve_schema`); pass one to keep the
+    resolved components of `raw` for later use.
+    """
     paths_raw = raw.get("paths") or {}
     if not isinstance(paths_raw, dict):
         raise ValueError("OpenAPI 'paths' must be an object")
 
     paths: Dict[str, Set[str]] = {}
     operations: Dict[str, OperationSchemas] = {}
+    # one resolver memo per document: each component is resolved once
+    resolved: dict[str, dict[str, Any]] = {} if cache is None else cache
+    metrics = DiffMetrics()
 
     for path, path_item in paths_raw.items():
+        checkpoint()
         if not isinstance(path, str) or not isinstance(path_item, dict):
             continue
+        methods, item_operations = normalize_path_item(
+            path, path_item, raw, resolved, metrics
+        )
+        paths[path] = methods
+        operations.update(item_operations)
+
+    return NormalizedOpenAPI(
+        paths=paths, operations=operations, metrics=metrics, resolved=resolved
+    )
+
+
+def normalize_path_item(
+    path: str,
+    path_item: Mapping[str, Any],
+    doc: Mapping[str, Any],
+    cache: dict[str, dict[str, Any]],
+    metrics: DiffMetrics,
+    select: Optional[Callable[[str], bool]] = None,
+) -> tuple[Set[str], Dict[str, OperationSchemas]]:
+    """
+    Methods and operations of one path item of `doc` (see `normalize_openapi`).
 
-        # parameters can exist at PATH ITEM level and apply to all ops under that path
-        base_params = _parse_parameters(path_item.get("parameters"), raw)
-
-        methods: Set[str] = set()
+    With `select`, only operations whose key it accepts are normalized; every
+    method is still listed.
+    """
+    operations: Dict[str, OperationSchemas] = {}
+    # parameters can exist at PATH ITEM level and apply to all ops under that path
+    base_params = _parse_parameters(path_item.get("parameters"), doc, cache, metrics)
 
-        for k, op in path_item.items():
-            method = str(k).lower()
-            if method not in _HTTP_METHODS or not isinstance(op, dict):
-                continue
+    methods: Set[str] = set()
 
-            methods.add(method)
-            op_key = f"{method.upper()} {path}"
+    for k, op in path_item.items():
+        method = str(k).lower()
+        if method not in _HTTP_METHODS or not isinstance(op, dict):
+            continue
 
-            # merge: path-item params + op params (op overrides same (in,name))
-            op_params = dict(base_params)
-            op_params.update(_parse_parameters(op.get("parameters"), raw))
+        methods.add(method)
+        op_key = f"{method.upper()} {path}"
+        if select is not None and not select(op_key):
+            continue
 
-            # requestBody: application/json only (MVP)
-            req_required = False
-            req_schema = None
-            request_body = op.get("requestBody")
-            if isinstance(request_body, dict):
-                req_required = bool(request_body.get("required", False))
-                content = request_body.get("content", {})
+        # merge: path-item params + op params (op overrides same (in,name))
+        op_params = dict(base_params)
+        op_params.update(_parse_parameters(op.get("parameters"), doc, cache, metrics))
+
+        # requestBody: application/json only (MVP)
+        req_required = False
+        req_schema = None
+        request_body = op.get("requestBody")
+        if isinstance(request_body, dict):
+            req_required = bool(request_body.get("required", False))
+            content = request_body.get("content", {})
+            if isinstance(content, dict):
+                app_json = content.get("application/json")
+                if isinstance(app_json, dict):
+                    schema = app_json.get("schema")
+                    if isinstance(schema, dict):
+                        req_schema = resolve_schema(
+                            schema, doc, cache=cache, metrics=metrics
+                        )
+
+        # responses: collect application/json schemas per status code
+        responses_out: dict[str, dict[str, Any] | None] = {}
+        responses = op.get("responses", {})
+        if isinstance(responses, dict):
+            for status, resp in responses.items():
+                if not isinstance(status, str) or not isinstance(resp, dict):
+                    continue
+                schema_dict = None
+                content = resp.get("content", {})
                 if isinstance(content, dict):
                     app_json = content.get("application/json")
                     if isinstance(app_json, dict):
                         schema = app_json.get("schema")
                         if isinstance(schema, dict):
-                            req_schema = resolve_schema(schema, raw)
-
-            # responses: collect application/json schemas per status code
-            responses_out: dict[str, dict[str, Any] | None] = {}
-            responses = op.get("responses", {})
-            if isinstance(responses, dict):
-                for status, resp in responses.items():
-                    if not isinstance(status, str) or not isinstance(resp, dict):
-                        continue
-                    schema_dict = None
-                    content = resp.get("content", {})
-                    if isinstance(content, dict):
-                        app_json = content.get("application/json")
-                        if isinstance(app_json, dict):
-                            schema = app_json.get("schema")
-                            if isinstance(schema, dict):
-                                schema_dict = resolve_schema(schema, raw)
-                    responses_out[status] = schema_dict
-
-            operations[op_key] = OperationSchemas(
-                request_required=req_required,
-                request_schema=req_schema,
-                responses=responses_out,
-                parameters=op_params,
-            )
-
-        paths[path] = set(sorted(methods))
-
-    return NormalizedOpenAPI(paths=paths, operations=operations)
+                            schema_dict = resolve_schema(
+                                schema, doc, cache=cache, metrics=metrics
+                            )
+                responses_out[status] = schema_dict
+
+        operations[op_key] = OperationSchemas(
+            request_required=req_required,
+            request_schema=req_schema,
+            responses=responses_out,
+            parameters=op_params,
+        )
+
+    return set(sorted(methods)), operations
 
 
 def _parse_parameters(
-    params_obj: Any, doc: Mapping[str, Any]
+    params_obj: Any,
+    doc: Mapping[str, Any],
+    cache: dict[str, dict[str, Any]] | None = None,
+    metrics: DiffMetrics | None = None,
 ) -> dict[str, ParameterSpec]:
     """
     Parse a list of OpenAPI parameters (best-effort).
@@ -119,7 +182,8 @@ def _parse_parameters(
     for item in params_obj:
         param = item
         if isinstance(item, dict) and "$ref" in item:
-            param = resolve_schema(item, doc)  # resolve local ref (best-effort)
+            # resolve local ref (best-effort)
+            param = resolve_schema(item, doc, cache=cache, metrics=metrics)
 
         if not isinstance(param, dict):
             continue
@@ -138,7 +202,7 @@ def _parse_parameters(
         schema_dict = None
         schema = param.get("schema")
         if isinstance(schema, dict):
-            schema_dict = resolve_schema(schema, doc)
+            schema_dict = resolve_schema(schema, doc, cache=cache, metrics=metrics)
 
         # IMPORTANT: header names are case-insensitive
         key_name = name.lower() if location == "header" else name
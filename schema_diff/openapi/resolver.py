@@ -1,8 +1,34 @@
+from dataclasses import dataclass, field
 from typing import Any, Mapping
 
+from ..canonical import fold_schema
+from ..models import DiffMetrics
+from ..profiling import timed
 
+
+@dataclass
+class _Context:
+    doc: Mapping[str, Any]
+    max_depth: int
+    memo: dict[str, dict[str, Any]]
+    metrics: DiffMetrics
+    # ref -> target; when set, replaces the #/components/ lookup
+    index: Mapping[str, Any] | None = None
+    # refs currently being expanded, in order (used for cycle detection)
+    stack: list[str] = field(default_factory=list)
+    # lowest stack index a cycle stub pointed at while resolving the current ref
+    low: int = 0
+
+
+@timed("resolve")
 def resolve_schema(
-    schema: Mapping[str, Any], doc: Mapping[str, Any], *, max_depth: int = 20
+    schema: Mapping[str, Any],
+    doc: Mapping[str, Any],
+    *,
+    max_depth: int = 20,
+    cache: dict[str, dict[str, Any]] | None = None,
+    metrics: DiffMetrics | None = None,
+    index: Mapping[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
     Resolve local OpenAPI $ref for schema-like dicts (best-effort).
@@ -11,28 +37,52 @@ def resolve_schema(
       - #/components/schemas/Name
       - #/components/parameters/Name   (useful when parsing operation/path parameters)
 
+    `allOf` compositions are flattened into one effective schema (see
+    `merge_all_of`), and equivalent spellings such as `type: [T, "null"]`
+    are folded into one (see `canonical.fold_schema`).
+
+    Pass the same `cache` dict for every call on one document to resolve (and
+    flatten) each component only once; resolved components are shared between
+    all schemas that reference them, so treat results as read-only.
+
+    Work counters are added to `metrics` if given.
+
+    `index` maps refs to their targets (e.g. the `$defs` of a JSON Schema
+    document, see `schema_diff.json_schema`); when given, exactly the refs
+    it contains are resolved, instead of `#/components/` ones.
+
     Notes:
       - This returns a dict and does NOT preserve the original $ref.
+      - Recursive refs are left in place as {"$ref": ...} where they recur.
       - It is intentionally conservative: local refs only.
     """
-    return _resolve(schema, doc, depth=0, max_depth=max_depth)
-
-
-def _resolve(
-    schema: Any, doc: Mapping[str, Any], *, depth: int, max_depth: int
-) -> dict[str, Any]:
-    if depth > max_depth:
+    ctx = _Context(
+        doc=doc,
+        max_depth=max_depth,
+        memo={} if cache is None else cache,
+        metrics=DiffMetrics() if metrics is None else metrics,
+        index=index,
+    )
+    return _resolve(schema, ctx, depth=0)
+
+
+def _resolve(schema: Any, ctx: _Context, *, depth: int) -> dict[str, Any]:
+    metrics = ctx.metrics
+    metrics.resolve_calls += 1
+    if depth > metrics.max_resolve_depth:
+        metrics.max_resolve_depth = depth
+    if depth > ctx.max_depth:
+        metrics.truncations += 1
         return dict(schema) if isinstance(schema, dict) else {}
 
     if not isinstance(schema, dict):
         return {}
 
     ref = schema.get("$ref")
-    if isinstance(ref, str) and ref.startswith("#/components/"):
-        target = _resolve_components_ref(ref, doc)
-        if isinstance(target, dict):
-            return _resolve(target, doc, depth=depth + 1, max_depth=max_depth)
-        return {}
+    if isinstance(ref, str) and (
+        ref.startswith("#/components/") if ctx.index is None else ref in ctx.index
+    ):
+        return _resolve_ref(ref, ctx, depth=depth)
 
     # resolve nested structures we care about
     out = dict(schema)
@@ -40,34 +90,111 @@ def _resolve(
     props = out.get("properties")
     if isinstance(props, dict):
         out["properties"] = {
-            k: (
-                _resolve(v, doc, depth=depth + 1, max_depth=max_depth)
-                if isinstance(v, dict)
-                else v
-            )
+            k: (_resolve(v, ctx, depth=depth + 1) if isinstance(v, dict) else v)
             for k, v in props.items()
         }
 
     items = out.get("items")
     if isinstance(items, dict):
-        out["items"] = _resolve(items, doc, depth=depth + 1, max_depth=max_depth)
+        out["items"] = _resolve(items, ctx, depth=depth + 1)
 
     # composition (best-effort)
     for key in ("allOf", "oneOf", "anyOf"):
         val = out.get(key)
         if isinstance(val, list):
             out[key] = [
-                (
-                    _resolve(x, doc, depth=depth + 1, max_depth=max_depth)
-                    if isinstance(x, dict)
-                    else x
-                )
+                (_resolve(x, ctx, depth=depth + 1) if isinstance(x, dict) else x)
                 for x in val
             ]
 
+    if isinstance(out.get("allOf"), list):
+        out = merge_all_of(out)
+
+    return fold_schema(out)
+
+
+def _resolve_ref(ref: str, ctx: _Context, *, depth: int) -> dict[str, Any]:
+    metrics = ctx.metrics
+    metrics.ref_lookups += 1
+    cached = ctx.memo.get(ref)
+    if cached is not None:
+        metrics.ref_cache_hits += 1
+        return cached
+
+    if ref in ctx.stack:
+        # Recursive schema: stop here, and remember that everything above
+        # this point depends on an enclosing expansion (so it is not memoized).
+        ctx.low = min(ctx.low, ctx.stack.index(ref))
+        return {"$ref": ref}
+
+    if ctx.index is None:
+        target = _resolve_components_ref(ref, ctx.doc)
+    else:
+        target = ctx.index[ref]
+    if not isinstance(target, dict):
+        return {}
+
+    metrics.ref_cache_misses += 1
+    index = len(ctx.stack)
+    outer_low = ctx.low
+    truncations = metrics.truncations
+    ctx.stack.append(ref)
+    ctx.low = index
+    try:
+        out = _resolve(target, ctx, depth=depth + 1)
+    finally:
+        ctx.stack.pop()
+        low = ctx.low
+        ctx.low = min(outer_low, low)
+
+    # Only results that are independent of where the ref was reached are
+    # reusable: no cycle back into an enclosing ref, no max_depth cut.
+    if low >= index and metrics.truncations == truncations:
+        ctx.memo[ref] = out
     return out
 
 
+def merge_all_of(schema: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Fold (already resolved) `allOf` members into one effective schema.
+
+    - properties: union, later members win on conflicts, sibling keys last
+    - required: union, in first-seen order
+    - other keywords (type, description, ...): sibling value, else first member
+
+    Non-dict members and unresolved recursive {"$ref": ...} stubs contribute
+    nothing. Nested `allOf` is expected to be flattened already.
+    """
+    own = {k: v for k, v in schema.items() if k != "allOf"}
+    parts = [m for m in schema.get("allOf") or [] if isinstance(m, dict)]
+    parts.append(own)
+
+    merged: dict[str, Any] = {}
+    properties: dict[str, Any] = {}
+    required: list[Any] = []
+    has_properties = False
+
+    for part in parts:
+        for key, value in part.items():
+            if key == "properties" and isinstance(value, dict):
+                has_properties = True
+                properties.update(value)
+            elif key == "required" and isinstance(value, list):
+                for name in value:
+                    if name not in required:
+                        required.append(name)
+            elif key == "$ref":
+                continue
+            elif part is own or key not in merged:
+                merged[key] = value
+
+    if has_properties:
+        merged["properties"] = properties
+    if required:
+        merged["required"] = required
+    return merged
+
+
 def _resolve_components_ref(ref: str, doc: Mapping[str, Any]) -> Any:
     """
     Resolve a ref under #/components/*.
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import mmap
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .normalizer import (
+    NORMALIZER_VERSION,
+    NormalizedOpenAPI,
+    OperationSchemas,
+    ParameterSpec,
+)
+
+# File layout (little endian):
+#   magic (8) | format version (u16) | marshal version (u16)
+#   | normalizer version (u16) | Python major, minor (u8, u8)
+#   | sha256 of the source spec (32) | sha256 of the payload (32)
+#   | payload length (u64) | payload (marshal)
+#
+# marshal keeps the resolved components shared by many operations shared
+# (JSON would copy them at every use: 100x larger, 200x slower to load on the
+# large benchmark spec), but its format is only stable within one Python
+# version and it is not safe against malicious data: snapshots are only read
+# by the Python version that wrote them, and must come from a trusted source.
+MAGIC = b"SDSNAP\r\n"
+FORMAT_VERSION = 3
+_MARSHAL_VERSION = 4
+_PYTHON_VERSION = sys.version_info[:2]
+_HEADER = struct.Struct("<8sHHHBB32s32sQ")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    normalized: NormalizedOpenAPI
+    source_sha256: str
+    format_version: int = FORMAT_VERSION
+    normalizer_version: int = NORMALIZER_VERSION
+    python_version: tuple[int, int] = _PYTHON_VERSION
+
+
+def is_snapshot(path: Path) -> bool:
+    """
+    True if `path` starts with the snapshot magic bytes.
+    """
+    with Path(path).open("rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(
+    normalized: NormalizedOpenAPI, path: Path, *, source_sha256: str
+) -> int:
+    """
+    Write `normalized` as a binary snapshot. Returns the number of bytes written.
+
+    `source_sha256` is the hex digest of the spec the snapshot was built from;
+    it is stored so releases can be matched back to their source. The
+    normalizer and Python versions are stored too: snapshots only load with
+    the same ones.
+    """
+    payload = _dumps(_encode(normalized))
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        _MARSHAL_VERSION,
+        NORMALIZER_VERSION,
+        *_PYTHON_VERSION,
+        bytes.fromhex(source_sha256),
+        hashlib.sha256(payload).digest(),
+        len(payload),
+    )
+    data = header + payload
+    Path(path).write_bytes(data)
+    return len(data)
+
+
+def read_snapshot(path: Path, *, verify: bool = True) -> Snapshot:
+    """
+    Read a snapshot written by `write_snapshot`.
+
+    The file is memory-mapped and decoded straight from the mapping. With
+    `verify` (default) the payload checksum is checked first. Snapshots of
+    another format or normalizer version are rejected, as their schemas would
+    not compare like freshly normalized ones, and so are snapshots written by
+    another Python version, whose marshal format may differ. Only read
+    snapshots from a trusted source: the checksum detects corruption, not
+    tampering.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if size < _HEADER.size:
+        raise ValueError(f"Truncated snapshot: {path}")
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            if view[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"Not a schema-diff snapshot: {path}")
+            # the format version comes first, so older layouts are still named
+            (version,) = struct.unpack_from("<H", view, len(MAGIC))
+            if version != FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported snapshot format version {version} in {path} "
+                    f"(expected {FORMAT_VERSION}); re-create it with "
+                    "`api-schema-diff snapshot`"
+                )
+            (
+                _,
+                _,
+                _,
+                normalizer,
+                major,
+                minor,
+                source_hash,
+                payload_hash,
+                length,
+            ) = _HEADER.unpack(view[: _HEADER.size])
+            if normalizer != NORMALIZER_VERSION:
+                raise ValueError(
+                    f"Snapshot {path} was normalized by normalizer version "
+                    f"{normalizer} (expected {NORMALIZER_VERSION}); re-create it "
+                    "with `api-schema-diff snapshot`"
+                )
+            if (major, minor) != _PYTHON_VERSION:
+                raise ValueError(
+                    f"Snapshot {path} was written by Python {major}.{minor} "
+                    f"(this is {_PYTHON_VERSION[0]}.{_PYTHON_VERSION[1]}); "
+                    "re-create it with `api-schema-diff snapshot`"
+                )
+            if _HEADER.size + length != size:
+                raise ValueError(f"Truncated snapshot: {path}")
+
+            with view[_HEADER.size :] as payload:
+                if verify and hashlib.sha256(payload).digest() != payload_hash:
+                    raise ValueError(f"Snapshot checksum mismatch: {path}")
+                data = marshal.loads(payload)
+
+    return Snapshot(
+        normalized=_decode(data),
+        source_sha256=source_hash.hex(),
+        format_version=version,
+        normalizer_version=normalizer,
+        python_version=(major, minor),
+    )
+
+
+def _encode(normalized: NormalizedOpenAPI) -> tuple:
+    operations = {
+        op_key: (
+            op.request_required,
+            op.request_schema,
+            op.responses,
+            {
+                key: (p.name, p.location, p.required, p.schema)
+                for key, p in op.parameters.items()
+            },
+        )
+        for op_key, op in normalized.operations.items()
+    }
+    paths = {p: sorted(methods) for p, methods in normalized.paths.items()}
+    return (paths, operations)
+
+
+def _decode(data: Any) -> NormalizedOpenAPI:
+    try:
+        paths_raw, operations_raw = data
+        paths = {p: set(methods) for p, methods in paths_raw.items()}
+        operations = {
+            op_key: OperationSchemas(
+                request_required=req_required,
+                request_schema=req_schema,
+                responses=responses,
+                parameters={
+                    key: ParameterSpec(
+                        name=name, location=location, required=required, schema=schema
+                    )
+                    for key, (name, location, required, schema) in params.items()
+                },
+            )
+            for op_key, (
+                req_required,
+                req_schema,
+                responses,
+                params,
+            ) in operations_raw.items()
+        }
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Malformed snapshot payload: {e}") from e
+    return NormalizedOpenAPI(paths=paths, operations=operations)
+
+
+def _dumps(obj: Any) -> bytes:
+    try:
+        return marshal.dumps(obj, _MARSHAL_VERSION)
+    except ValueError:
+        # YAML can produce values marshal cannot store (dates, timestamps);
+        # they only appear in examples/defaults, so keep them as strings.
+        return marshal.dumps(_plain(obj), _MARSHAL_VERSION)
+
+
+def _plain(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_plain(v) for v in obj)
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from typing import Any, Callable, Iterable, TextIO, Tuple
+
+from .models import Change, ChangeSeverity, ChangeType, DiffResult, WindowResult
+from .shard import PartialResult
+from .summary import SummaryGroup
+
+
+def _json_encoder() -> Callable[[Any], str]:
+    """
+    orjson when installed (optional, much faster), else the stdlib encoder.
+    """
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return json.JSONEncoder().encode
+
+    dumps = orjson.dumps
+    return lambda obj: dumps(obj).decode("utf-8")
+
+
+encode = _json_encoder()
+
+# A field value that is an iterator is streamed as a JSON array, one item per
+# line; anything else is encoded in one go.
+Field = Tuple[str, Any]
+
+
+def write_json(stream: TextIO, fields: Iterable[Field]) -> None:
+    """
+    Write one JSON object, field by field, without building it in memory.
+    """
+    stream.write("{")
+    first_field = True
+    for key, value in fields:
+        stream.write("\n  " if first_field else ",\n  ")
+        first_field = False
+        stream.write(encode(key))
+        stream.write(": ")
+
+        if not isinstance(value, Iterator):
+            stream.write(encode(value))
+            continue
+
+        stream.write("[")
+        first_item = True
+        for item in value:
+            stream.write("\n    " if first_item else ",\n    ")
+            first_item = False
+            stream.write(encode(item))
+        stream.write("]" if first_item else "\n  ]")
+    stream.write("\n}\n")
+
+
+def write_ndjson(stream: TextIO, records: Iterable[dict]) -> None:
+    """
+    Write one JSON object per line.
+    """
+    for record in records:
+        stream.write(encode(record))
+        stream.write("\n")
+
+
+def result_fields(result: DiffResult) -> list[Field]:
+    """
+    Streaming equivalent of `DiffResult.to_dict()`.
+    """
+    return [
+        ("breaking", (c.to_dict() for c in result.breaking)),
+        ("non_breaking", (c.to_dict() for c in result.non_breaking)),
+    ]
+
+
+def result_records(result: DiffResult) -> Iterator[dict]:
+    """
+    NDJSON records: one per change, breaking first.
+    """
+    for c in result.breaking:
+        yield c.to_dict()
+    for c in result.non_breaking:
+        yield c.to_dict()
+
+
+def partial_fields(partial: PartialResult) -> list[Field]:
+    """
+    Streaming equivalent of `PartialResult.to_dict()`.
+    """
+    return [
+        ("shard", str(partial.shard)),
+        ("inputs", partial.inputs),
+        ("old_kind", partial.old_kind),
+        ("new_kind", partial.new_kind),
+        (
+            "groups",
+            ({"key": list(key), **group.to_dict()} for key, group in partial.groups),
+        ),
+    ]
+
+
+def window_fields(window: WindowResult) -> list[Field]:
+    """
+    Streaming equivalent of `WindowResult.to_dict()`.
+    """
+    return [
+        ("baselines", list(window.baselines)),
+        (
+            "breaking",
+            ({**c.to_dict(), "baselines": labels} for c, labels in window.breaking()),
+        ),
+        (
+            "non_breaking",
+            (
+                {**c.to_dict(), "baselines": labels}
+                for c, labels in window.non_breaking()
+            ),
+        ),
+    ]
+
+
+def window_records(window: WindowResult) -> Iterator[dict]:
+    for c, labels in window.breaking():
+        yield {**c.to_dict(), "baselines": labels}
+    for c, labels in window.non_breaking():
+        yield {**c.to_dict(), "baselines": labels}
+
+
+# operations listed by `affected_summary`
+AFFECTED_SAMPLE_SIZE = 3
+
+
+def affected_summary(change: Change) -> str:
+    """
+    "3 operations: GET /a, GET /b, POST /c" (with a capped sample), or ""
+    for changes reported per operation.
+    """
+    if change.affected is None:
+        return ""
+    count = len(change.affected)
+    sample = ", ".join(change.affected[:AFFECTED_SAMPLE_SIZE])
+    more = ", ..." if count > AFFECTED_SAMPLE_SIZE else ""
+    noun = "operation" if count == 1 else "operations"
+    return f"{count} {noun}: {sample}{more}"
+
+
+# precomputed "type" column (enum attribute access is slow in hot loops)
+_TYPE_COLUMN = {t: f"{t.value:<16}" for t in ChangeType}
+
+
+def _plain_line(change: Change) -> str:
+    line = f"  {_TYPE_COLUMN[change.change_type]} {change.path}"
+    if change.old_type or change.new_type:
+        line += f" ({change.old_type or '-'} -> {change.new_type or '-'})"
+    if change.message:
+        line += f": {change.message}"
+    if change.affected is not None:
+        line += f" [{affected_summary(change)}]"
+    return line
+
+
+def write_plain(stream: TextIO, result: DiffResult) -> None:
+    """
+    Plain-text report: one line per change, no tables or styling.
+    """
+    if result.breaking:
+        stream.write(f"BREAKING CHANGES FOUND ({len(result.breaking)})\n")
+        stream.writelines(_plain_line(c) + "\n" for c in result.breaking)
+    else:
+        stream.write("No breaking changes found.\n")
+
+    if result.non_breaking:
+        stream.write(f"\nNon-breaking changes ({len(result.non_breaking)}):\n")
+        stream.writelines(_plain_line(c) + "\n" for c in result.non_breaking)
+
+
+def write_plain_window(stream: TextIO, window: WindowResult) -> None:
+    """
+    Plain-text window report: `write_plain` with the baselines each change
+    affects.
+    """
+    breaking = window.breaking()
+    if breaking:
+        stream.write(f"BREAKING CHANGES FOUND ({len(breaking)})\n")
+        stream.writelines(
+            f"{_plain_line(c)} <- {', '.join(labels)}\n" for c, labels in breaking
+        )
+    else:
+        stream.write("No breaking changes found.\n")
+
+    non_breaking = window.non_breaking()
+    if non_breaking:
+        stream.write(f"\nNon-breaking changes ({len(non_breaking)}):\n")
+        stream.writelines(
+            f"{_plain_line(c)} <- {', '.join(labels)}\n" for c, labels in non_breaking
+        )
+
+
+def write_summary(stream: TextIO, groups: Iterable[SummaryGroup]) -> None:
+    """
+    Plain-text summary: one line per group followed by its sample changes.
+    """
+    groups = list(groups)
+    breaking = sum(g.count for g in groups if g.severity is ChangeSeverity.BREAKING)
+    total = sum(g.count for g in groups)
+    if breaking:
+        stream.write(f"BREAKING CHANGES FOUND ({breaking} of {total} changes)\n")
+    else:
+        stream.write(f"No breaking changes found ({total} changes).\n")
+
+    for g in groups:
+        stream.write(
+            f"\n{g.severity.value:<12} {g.change_type:<16} x{g.count:<6} {g.operation}\n"
+        )
+        stream.writelines(f"  {_plain_line(c)}\n" for c in g.sample)
+        if g.count > len(g.sample):
+            stream.write(f"    ... {g.count - len(g.sample)} more\n")
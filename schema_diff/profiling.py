@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Iterator, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class PhaseTiming:
+    """
+    Self cost of one phase: what was spent in it minus its nested phases, so
+    the phases of a profile add up to its total.
+
+    `blocks` is the net change in allocated memory blocks
+    (`sys.getallocatedblocks()`), a cheap proxy for allocations.
+    """
+
+    name: str
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    blocks: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "phase": self.name,
+            "calls": self.calls,
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "blocks": self.blocks,
+        }
+
+
+class _Frame:
+    __slots__ = (
+        "name",
+        "wall",
+        "cpu",
+        "blocks",
+        "child_wall",
+        "child_cpu",
+        "child_blocks",
+    )
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.blocks = sys.getallocatedblocks()
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.child_blocks = 0
+
+
+class Profile:
+    """
+    Per-phase timings collected while the profile is active (see `profile`).
+
+    Only the thread (or task) that activated the profile is recorded; work
+    handed to other threads is not.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, PhaseTiming] = {}
+        self._stack: list[_Frame] = []
+
+    def _enter(self, name: str) -> None:
+        self._stack.append(_Frame(name))
+
+    def _exit(self) -> None:
+        frame = self._stack.pop()
+        wall = time.perf_counter() - frame.wall
+        cpu = time.process_time() - frame.cpu
+        blocks = sys.getallocatedblocks() - frame.blocks
+
+        timing = self.phases.get(frame.name)
+        if timing is None:
+            timing = self.phases[frame.name] = PhaseTiming(frame.name)
+        timing.calls += 1
+        timing.wall += wall - frame.child_wall
+        timing.cpu += cpu - frame.child_cpu
+        timing.blocks += blocks - frame.child_blocks
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_wall += wall
+            parent.child_cpu += cpu
+            parent.child_blocks += blocks
+
+    def timings(self) -> list[PhaseTiming]:
+        """
+        Phases in the order they were first entered.
+
+        Phases that are still running are included with their cost so far.
+        """
+        timings = {
+            name: PhaseTiming(t.name, t.calls, t.wall, t.cpu, t.blocks)
+            for name, t in self.phases.items()
+        }
+        now_wall = time.perf_counter()
+        now_cpu = time.process_time()
+        now_blocks = sys.getallocatedblocks()
+
+        # innermost first: an open child is not in its parent's child_* yet
+        inner = (0.0, 0.0, 0)
+        for frame in reversed(self._stack):
+            wall = now_wall - frame.wall
+            cpu = now_cpu - frame.cpu
+            blocks = now_blocks - frame.blocks
+            timing = timings.setdefault(frame.name, PhaseTiming(frame.name))
+            timing.calls += 1
+            timing.wall += wall - frame.child_wall - inner[0]
+            timing.cpu += cpu - frame.child_cpu - inner[1]
+            timing.blocks += blocks - frame.child_blocks - inner[2]
+            inner = (wall, cpu, blocks)
+
+        return list(timings.values())
+
+    def to_dict(self) -> list[dict]:
+        return [t.to_dict() for t in self.timings()]
+
+
+_ACTIVE: ContextVar[Optional[Profile]] = ContextVar("schema_diff_profile", default=None)
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Record the phases (read, parse, normalize, resolve, diff, ...) run inside
+    the block:
+
+        with profile() as prof:
+            diff_openapi(old, new)
+        print(prof.to_dict())
+    """
+    prof = Profile()
+    token = _ACTIVE.set(prof)
+    try:
+        yield prof
+    finally:
+        _ACTIVE.reset(token)
+
+
+class _Phase:
+    __slots__ = ("profile", "name")
+
+    def __init__(self, profile: Profile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profile._enter(self.name)
+
+    def __exit__(self, *exc: object) -> None:
+        self.profile._exit()
+
+
+_NO_PHASE = nullcontext()
+
+
+def phase(name: str) -> ContextManager[None]:
+    """
+    Time the enclosed block as `name` if a profile is active (a no-op otherwise).
+    """
+    prof = _ACTIVE.get()
+    if prof is None:
+        return _NO_PHASE
+    return _Phase(prof, name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Decorator form of `phase`.
+    """
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            prof = _ACTIVE.get()
+            if prof is None:
+                return fn(*args, **kwargs)
+            with _Phase(prof, name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
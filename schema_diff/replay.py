@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional
+
+from .models import Change, DiffResult
+from .openapi.normalizer import _HTTP_METHODS
+from .summary import operation_of
+
+# distinct (method, path) pairs remembered by `Replay`; bounds memory however
+# many distinct URLs (ids, ...) a log has
+ROUTE_CACHE_SIZE = 65536
+
+_METHOD_KEYS = ("method", "request_method", "http_method", "verb")
+_URL_KEYS = ("path", "url", "uri", "request_uri")
+
+# A (method, URL) pair, or None for a line that is not a request record.
+Request = Optional[tuple[str, str]]
+
+
+def _json_decoder() -> Callable[[Any], Any]:
+    """
+    orjson when installed (optional, much faster), else the stdlib decoder.
+    """
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+decode = _json_decoder()
+
+
+class _Node:
+    __slots__ = ("literals", "patterns", "param", "operations")
+
+    def __init__(self) -> None:
+        self.literals: dict[str, _Node] = {}
+        # segments mixing text and parameters, e.g. "{name}.json"
+        self.patterns: list[tuple[re.Pattern[str], _Node]] = []
+        self.param: Optional[_Node] = None
+        self.operations: dict[str, str] = {}  # METHOD -> op_key
+
+    def child(self, segment: str) -> "_Node":
+        if "{" not in segment:
+            return self.literals.setdefault(segment, _Node())
+        if re.fullmatch(r"\{[^{}]*\}", segment):
+            if self.param is None:
+                self.param = _Node()
+            return self.param
+        pattern = re.compile(
+            "".join(
+                "[^/]+" if part.startswith("{") else re.escape(part)
+                for part in re.split(r"(\{[^{}]*\})", segment)
+                if part
+            )
+        )
+        for existing, node in self.patterns:
+            if existing.pattern == pattern.pattern:
+                return node
+        node = _Node()
+        self.patterns.append((pattern, node))
+        return node
+
+
+class RouteTrie:
+    """
+    OpenAPI operations ("GET /users/{id}") compiled into a trie of path
+    segments, for matching request paths to operation keys.
+
+    Matching costs about one dict lookup per segment, however many operations
+    there are. Literal segments win over templated ones ("/users/me" before
+    "/users/{id}"), falling back to the template when the literal branch has
+    no operation for the method.
+    """
+
+    def __init__(self, op_keys: Iterable[str]) -> None:
+        self._root = _Node()
+        for op_key in op_keys:
+            method, _, template = op_key.partition(" ")
+            node = self._root
+            for segment in _segments(template):
+                node = node.child(segment)
+            node.operations[method.upper()] = op_key
+
+    def match(self, method: str, path: str) -> Optional[str]:
+        """
+        Operation key for a request path (no scheme, host or query), or None.
+        """
+        return _match(self._root, _segments(path), 0, method.upper())
+
+
+def _segments(path: str) -> list[str]:
+    return path.strip("/").split("/")
+
+
+def _match(node: _Node, segments: list[str], i: int, method: str) -> Optional[str]:
+    if i == len(segments):
+        return node.operations.get(method)
+    segment = segments[i]
+    child = node.literals.get(segment)
+    if child is not None:
+        found = _match(child, segments, i + 1, method)
+        if found is not None:
+            return found
+    if not segment:
+        return None
+    for pattern, child in node.patterns:
+        if pattern.fullmatch(segment):
+            found = _match(child, segments, i + 1, method)
+            if found is not None:
+                return found
+    if node.param is not None:
+        return _match(node.param, segments, i + 1, method)
+    return None
+
+
+def operation_keys(raw: Mapping[str, Any]) -> list[str]:
+    """
+    "METHOD /path" of every operation of a raw OpenAPI document.
+    """
+    keys = []
+    paths = raw.get("paths")
+    if not isinstance(paths, dict):
+        return keys
+    for path, path_item in paths.items():
+        if not isinstance(path, str) or not isinstance(path_item, dict):
+            continue
+        for method, op in path_item.items():
+            if str(method).lower() in _HTTP_METHODS and isinstance(op, dict):
+                keys.append(f"{str(method).upper()} {path}")
+    return keys
+
+
+def read_log(path: Path, log_format: str = "auto") -> Iterator[Request]:
+    """
+    Requests recorded in an access log, in order (`*.gz` is decompressed).
+
+    - "ndjson": one JSON object per line, streamed; either a HAR entry
+      (`{"request": {"method", "url"}}`), an nginx-style
+      `{"request": "GET /path HTTP/1.1"}`, or flat `method` / `request_method`
+      and `path` / `url` / `uri` / `request_uri` fields
+    - "har": a HAR file. It is one JSON document, so it is loaded whole;
+      use NDJSON for very large logs
+    - "auto": "har" for *.har / *.har.gz, else "ndjson"
+    """
+    path = Path(path)
+    name = path.name.lower().removesuffix(".gz")
+    if log_format == "auto":
+        log_format = "har" if name.endswith(".har") else "ndjson"
+    if log_format not in ("ndjson", "har"):
+        raise ValueError(f"unknown log format {log_format!r}")
+
+    opener = gzip.open if path.name.lower().endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        if log_format == "har":
+            try:
+                entries = json.load(f)["log"]["entries"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}: not a HAR file ({e!r})") from None
+            for entry in entries:
+                yield _request_of(entry)
+            return
+
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = decode(line)
+            except ValueError:
+                yield None
+                continue
+            yield _request_of(record)
+
+
+def _request_of(record: Any) -> Request:
+    if not isinstance(record, dict):
+        return None
+    request = record.get("request")
+    if isinstance(request, str):
+        parts = request.split(" ", 2)
+        return (parts[0], parts[1]) if len(parts) >= 2 else None
+    if isinstance(request, dict):
+        record = request
+    # plain loops: this runs once per log line
+    for key in _METHOD_KEYS:
+        method = record.get(key)
+        if method is not None:
+            break
+    for key in _URL_KEYS:
+        url = record.get(key)
+        if url is not None:
+            break
+    if isinstance(method, str) and isinstance(url, str):
+        return method, url
+    return None
+
+
+def request_path(url: str, base_path: str = "") -> str:
+    """
+    Path of a request URL without scheme, host, query, fragment and
+    `base_path` (e.g. "/api/v1", the path of the spec's server URL).
+    """
+    scheme = url.find("://")
+    if scheme != -1:
+        start = url.find("/", scheme + 3)
+        url = url[start:] if start != -1 else "/"
+    for sep in ("?", "#"):
+        cut = url.find(sep)
+        if cut != -1:
+            url = url[:cut]
+    if base_path and (url == base_path or url.startswith(base_path + "/")):
+        url = url[len(base_path) :] or "/"
+    return url
+
+
+@dataclass
+class ReplayReport:
+    """
+    Recorded calls per breaking change.
+
+    `impact` pairs every breaking change with the number of recorded calls to
+    the operations it affects, most called first. Counters: `requests` read,
+    `matched` to an operation of the old spec, `unmatched` ones, and
+    `invalid` lines that are not a request record.
+    """
+
+    requests: int = 0
+    matched: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    calls: dict[str, int] = field(default_factory=dict)  # op_key -> calls
+    impact: list[tuple[Change, int]] = field(default_factory=list)
+
+    def has_affected_calls(self) -> bool:
+        return any(calls for _, calls in self.impact)
+
+    def exit_code(self) -> int:
+        """
+        1 when a breaking change affects recorded calls.
+        """
+        return 1 if self.has_affected_calls() else 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "matched": self.matched,
+            "unmatched": self.unmatched,
+            "invalid": self.invalid,
+            "breaking": [
+                {**change.to_dict(), "calls": calls} for change, calls in self.impact
+            ],
+        }
+
+
+class Replay:
+    """
+    Count recorded calls per operation, then per breaking change.
+
+        replay = Replay(operation_keys(old_raw), base_path="/api")
+        replay.feed(read_log(Path("access.ndjson")))
+        report = replay.report(result)
+
+    Memory is bounded by the number of operations and `ROUTE_CACHE_SIZE`,
+    not by the size of the logs.
+    """
+
+    def __init__(self, op_keys: Iterable[str], *, base_path: str = "") -> None:
+        self.op_keys = list(op_keys)
+        self.base_path = base_path.rstrip("/")
+        self._report = ReplayReport(calls={k: 0 for k in self.op_keys})
+        trie = RouteTrie(self.op_keys)
+        self._match = functools.lru_cache(maxsize=ROUTE_CACHE_SIZE)(trie.match)
+
+    def feed(self, requests: Iterable[Request]) -> None:
+        report = self._report
+        calls = report.calls
+        match = self._match
+        base_path = self.base_path
+        for request in requests:
+            if request is None:
+                report.invalid += 1
+                continue
+            report.requests += 1
+            method, url = request
+            op_key = match(method, request_path(url, base_path))
+            if op_key is None:
+                report.unmatched += 1
+            else:
+                report.matched += 1
+                calls[op_key] += 1
+
+    def report(self, result: DiffResult) -> ReplayReport:
+        """
+        The counters so far, with the calls affected by each breaking change
+        of `result` (a diff from the spec the operations came from).
+        """
+        by_path: dict[str, list[str]] = {}
+        for op_key in self.op_keys:
+            by_path.setdefault(op_key.partition(" ")[2], []).append(op_key)
+
+        calls = self._report.calls
+        impact = []
+        for change in result.breaking:
+            if change.affected is not None:
+                operations = list(change.affected)
+            else:
+                # "GET /users" for an operation, "/users" for a removed path
+                operation = operation_of(change.path)
+                operations = by_path.get(operation, [operation])
+            impact.append((change, sum(calls.get(op, 0) for op in operations)))
+        impact.sort(key=lambda item: -item[1])
+        self._report.impact = impact
+        return self._report
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from ._version import package_version
+from .models import DiffMetrics, DiffResult
+from .openapi.normalizer import NORMALIZER_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Part of every key, with NORMALIZER_VERSION and the package version (which is
+# a constant in source checkouts). Bump it whenever the entry format or the
+# results of a differ change, so that stale entries are never served.
+# 2: entries hold the metrics of the run that stored them
+CACHE_VERSION = 2
+
+# names of the entries this cache writes (see `_path`); nothing else in the
+# directory is ever evicted
+_ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.json")
+
+
+def file_digest(path: Path) -> str:
+    """
+    SHA-256 hex digest of a file's bytes.
+    """
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of diff results.
+
+    Entries are keyed by the content hashes of both inputs, the engine
+    versions (`CACHE_VERSION`, `NORMALIZER_VERSION`, the package version) and
+    the options that affect the result, so a hit never needs to
+    parse either file. The directory is kept under `max_bytes` by evicting the
+    least recently used entries (entry mtime is bumped on every hit).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        old_digest: str, new_digest: str, options: Mapping[str, Any] | None = None
+    ) -> str:
+        material = json.dumps(
+            {
+                "old": old_digest,
+                "new": new_digest,
+                "version": package_version(),
+                "cache": CACHE_VERSION,
+                "normalizer": NORMALIZER_VERSION,
+                "options": dict(options or {}),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        Cached entry for `key`: {"old_kind", "new_kind", "result": DiffResult}.
+        The result's metrics are those of the run that stored it.
+        """
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            result = DiffResult.from_dict(entry["result"])
+            result.metrics = DiffMetrics.from_dict(entry["metrics"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return {
+            "old_kind": entry.get("old_kind"),
+            "new_kind": entry.get("new_kind"),
+            "result": result,
+        }
+
+    def put(
+        self, key: str, result: DiffResult, *, old_kind: str, new_kind: str
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {
+                "old_kind": old_kind,
+                "new_kind": new_kind,
+                "result": result.to_dict(),
+                "metrics": result.metrics.to_dict(),
+            }
+        )
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            if not _ENTRY_NAME.fullmatch(path.name):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AbstractSet, Any, Iterable, Optional
+
+from .models import Change, ChangeSeverity, ChangeType, DiffResult, change_fingerprint
+
+B = ChangeSeverity.BREAKING
+NB = ChangeSeverity.NON_BREAKING
+
+# Where a change was found. Schema diffs inherit the context of the
+# parameter / request body / response they belong to.
+CONTEXTS = (
+    "document",  # generic JSON diff (diff_objects)
+    "path",
+    "operation",
+    "parameter",
+    "request",
+    "response",
+    "schema",  # standalone JSON Schema diff
+)
+
+# Config files may use "ignore" to drop a kind of change entirely.
+IGNORE = "ignore"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Severity for one kind of change, optionally restricted to one context.
+
+    `severity=None` drops matching changes.
+    """
+
+    kind: str
+    severity: Optional[ChangeSeverity]
+    context: Optional[str] = None
+
+
+DEFAULT_RULES: tuple[Rule, ...] = (
+    # generic JSON (diff_objects)
+    Rule("field_removed", B),
+    Rule("field_added", NB),
+    # JSON Schema documents
+    Rule("definition_removed", B),
+    Rule("definition_added", NB),
+    # paths / operations
+    Rule("path_removed", B),
+    Rule("path_added", NB),
+    Rule("operation_removed", B),
+    Rule("operation_added", NB),
+    # parameters
+    Rule("parameter_removed", B),
+    Rule("required_parameter_added", B),
+    Rule("optional_parameter_added", NB),
+    Rule("parameter_became_required", B),
+    Rule("parameter_became_optional", NB),
+    # request body
+    Rule("request_body_removed", B),
+    Rule("required_request_body_added", B),
+    Rule("optional_request_body_added", NB),
+    Rule("request_body_became_required", B),
+    Rule("request_body_became_optional", NB),
+    # responses
+    Rule("response_status_removed", B),
+    Rule("response_status_added", NB),
+    Rule("response_schema_removed", B),
+    Rule("response_schema_added", NB),
+    # schemas (any context)
+    Rule("type_changed", B),
+    Rule("property_removed", B),
+    Rule("property_added", NB),
+    Rule("field_became_required", B),
+    Rule("field_became_optional", NB),
+    Rule("enum_values_removed", B),
+    Rule("enum_values_added", NB),
+    Rule("enum_constraint_added", B),
+    Rule("enum_constraint_removed", NB),
+)
+
+KINDS = frozenset(r.kind for r in DEFAULT_RULES)
+
+
+class RuleSet:
+    """
+    Rules compiled into a (kind, context) -> severity table.
+
+    Later rules override earlier ones; a rule with a context beats a rule
+    without one. Every (kind, context) pair is precomputed, so classifying a
+    change is a single dict lookup.
+
+    Changes whose fingerprint is in `accepted` (see `load_baseline`) are
+    dropped as they are found, one set lookup each.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Rule] = DEFAULT_RULES,
+        *,
+        accepted: AbstractSet[str] = frozenset(),
+    ) -> None:
+        self.rules = tuple(rules)
+        self.accepted = frozenset(accepted)
+        self._table = _compile(self.rules)
+
+    def with_overrides(self, rules: Iterable[Rule]) -> "RuleSet":
+        return RuleSet(self.rules + tuple(rules), accepted=self.accepted)
+
+    def with_baseline(self, accepted: AbstractSet[str]) -> "RuleSet":
+        """
+        These rules, also dropping changes with a fingerprint in `accepted`.
+        """
+        return RuleSet(self.rules, accepted=self.accepted | accepted)
+
+    def severity(self, kind: str, context: str) -> Optional[ChangeSeverity]:
+        return self._table[(kind, context)]
+
+    def emit(
+        self,
+        result: DiffResult,
+        kind: str,
+        context: str,
+        change_type: ChangeType,
+        path: str,
+        *,
+        old_type: Optional[str] = None,
+        new_type: Optional[str] = None,
+        message: Optional[str] = None,
+    ) -> None:
+        """
+        Classify a change and append it to `result` (or drop it if ignored).
+        """
+        severity = self._table[(kind, context)]
+        if severity is None:
+            return
+        if self.accepted and (
+            change_fingerprint(change_type, path, old_type, new_type) in self.accepted
+        ):
+            result.metrics.accepted += 1
+            return
+        change = Change(
+            change_type=change_type,
+            severity=severity,
+            path=path,
+            old_type=old_type,
+            new_type=new_type,
+            message=message,
+        )
+        if severity is B:
+            result.breaking.append(change)
+        else:
+            result.non_breaking.append(change)
+
+
+def _compile(
+    rules: Iterable[Rule],
+) -> dict[tuple[str, str], Optional[ChangeSeverity]]:
+    generic: dict[str, Optional[ChangeSeverity]] = {}
+    specific: dict[tuple[str, str], Optional[ChangeSeverity]] = {}
+    for rule in rules:
+        if rule.context is None:
+            generic[rule.kind] = rule.severity
+        else:
+            specific[(rule.kind, rule.context)] = rule.severity
+
+    table: dict[tuple[str, str], Optional[ChangeSeverity]] = {}
+    for kind in KINDS | generic.keys() | {k for k, _ in specific}:
+        for context in CONTEXTS:
+            if (kind, context) in specific:
+                table[(kind, context)] = specific[(kind, context)]
+            elif kind in generic:
+                table[(kind, context)] = generic[kind]
+    return table
+
+
+DEFAULT_RULESET = RuleSet()
+
+
+def load_rules(path: Path) -> RuleSet:
+    """
+    Load severity overrides (JSON or YAML) on top of the default rules:
+
+        rules:
+          - kind: property_removed
+            context: request        # optional
+            severity: non_breaking  # breaking | non_breaking | ignore
+    """
+    from .loader import parse_document
+
+    path = Path(path)
+    data = parse_document(path.read_text(encoding="utf-8"), path)
+    return DEFAULT_RULESET.with_overrides(parse_rules(data, source=str(path)))
+
+
+def parse_rules(data: Any, *, source: str = "rules") -> list[Rule]:
+    entries = data.get("rules") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError(f"{source}: expected a top-level 'rules' list")
+
+    rules: list[Rule] = []
+    for i, entry in enumerate(entries):
+        where = f"{source}: rules[{i}]"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected an object")
+
+        kind = entry.get("kind")
+        if kind not in KINDS:
+            raise ValueError(f"{where}: unknown kind {kind!r}")
+
+        context = entry.get("context")
+        if context is not None and context not in CONTEXTS:
+            raise ValueError(f"{where}: unknown context {context!r}")
+
+        severity = entry.get("severity")
+        if severity == IGNORE:
+            rules.append(Rule(kind, None, context))
+            continue
+        try:
+            rules.append(Rule(kind, ChangeSeverity(severity), context))
+        except ValueError:
+            raise ValueError(f"{where}: unknown severity {severity!r}") from None
+
+    return rules
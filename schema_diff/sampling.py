@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import CodeType
+from typing import Iterator, Optional, TextIO
+
+from ._version import package_version
+
+# 200 Hz. Python hands the GIL over every 5 ms (sys.getswitchinterval()), so
+# sampling faster mostly measures the wait for it.
+DEFAULT_INTERVAL = 0.005
+
+# same form as the co_filename of our code objects
+_PACKAGE_PREFIX = os.path.dirname(__file__) + os.sep
+
+
+class Sampler:
+    """
+    Low-overhead statistical profiler: a daemon thread periodically captures
+    the Python stack of every other thread (`sys._current_frames()`).
+
+    Each stack starts where control last entered `schema_diff` from outside
+    code (so the CLI framework and thread pool plumbing above it are cut), and
+    stacks without a `schema_diff` frame are dropped: the output is attributed
+    to our functions, with whatever they call (e.g. the YAML parser) below.
+
+        with Sampler() as sampler:
+            diff_openapi(old, new)
+        sampler.write(Path("diff.collapsed"))
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        # root-first stack of code objects -> [samples, seconds]
+        self.samples: dict[tuple[CodeType, ...], list] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("sampler already started")
+        self._thread = threading.Thread(
+            target=self._run, name="schema-diff-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self) -> "Sampler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        samples = self.samples
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed = now - last
+            last = now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                key = tuple(stack)
+                entry = samples.get(key)
+                if entry is None:
+                    samples[key] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+
+    def stacks(self) -> dict[tuple[str, ...], list]:
+        """
+        Labelled, trimmed stacks -> [samples, seconds].
+        """
+        labels = _Labels()
+        out: dict[tuple[str, ...], list] = {}
+        for codes, (count, seconds) in self.samples.items():
+            start = None
+            outside = True
+            for i, code in enumerate(codes):
+                filename = code.co_filename
+                if filename == __file__:
+                    # waiting for the sampler to stop
+                    start = None
+                    break
+                if filename.startswith("<frozen importlib"):
+                    # a lazy import does not leave our code
+                    continue
+                ours = filename.startswith(_PACKAGE_PREFIX)
+                if ours and outside:
+                    start = i
+                outside = not ours
+            if start is None:
+                continue
+            key = tuple(labels.label(c) for c in codes[start:])
+            entry = out.setdefault(key, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        return out
+
+    def collapsed(self) -> Iterator[str]:
+        """
+        Brendan Gregg's collapsed-stack format ("a;b;c <samples>"), as read by
+        flamegraph.pl, inferno and speedscope.
+        """
+        for stack, (count, _) in sorted(self.stacks().items()):
+            yield f"{';'.join(stack)} {count}"
+
+    def write_collapsed(self, stream: TextIO) -> None:
+        for line in self.collapsed():
+            stream.write(line)
+            stream.write("\n")
+
+    def write_speedscope(
+        self, stream: TextIO, *, name: str = "api-schema-diff"
+    ) -> None:
+        """
+        speedscope's JSON format (https://www.speedscope.app), weighted in
+        seconds of wall time.
+        """
+        frames: list[dict] = []
+        index: dict[str, int] = {}
+        samples = []
+        weights = []
+        for stack, (_, seconds) in sorted(self.stacks().items()):
+            sample = []
+            for label in stack:
+                i = index.get(label)
+                if i is None:
+                    i = index[label] = len(frames)
+                    frames.append({"name": label})
+                sample.append(i)
+            samples.append(sample)
+            weights.append(seconds)
+
+        json.dump(
+            {
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "exporter": f"api-schema-diff {package_version()}",
+                "name": name,
+                "activeProfileIndex": 0,
+                "shared": {"frames": frames},
+                "profiles": [
+                    {
+                        "type": "sampled",
+                        "name": name,
+                        "unit": "seconds",
+                        "startValue": 0,
+                        "endValue": sum(weights),
+                        "samples": samples,
+                        "weights": weights,
+                    }
+                ],
+            },
+            stream,
+        )
+        stream.write("\n")
+
+    def write(self, path: Path) -> None:
+        """
+        Write speedscope JSON for `*.json` paths, collapsed stacks otherwise.
+        """
+        path = Path(path)
+        with path.open("w", encoding="utf-8") as f:
+            if path.suffix.lower() == ".json":
+                self.write_speedscope(f)
+            else:
+                self.write_collapsed(f)
+
+
+class _Labels:
+    """
+    "module:qualname" frame labels, cached per code object.
+    """
+
+    def __init__(self) -> None:
+        # by spec name, so `python -m schema_diff.cli` is not "__main__"
+        self._modules: dict[str, str] = {}
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, "__file__", None)
+            if filename:
+                spec = getattr(module, "__spec__", None)
+                self._modules[filename] = getattr(spec, "name", None) or name
+        self._labels: dict[CodeType, str] = {}
+
+    def label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            module = self._modules.get(code.co_filename) or Path(code.co_filename).stem
+            qualname = getattr(code, "co_qualname", code.co_name)
+            label = f"{module}:{qualname}".replace(";", ",").replace(" ", "_")
+            self._labels[code] = label
+        return label
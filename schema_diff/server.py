@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import http.server
+import json
+import os
+import socketserver
+import stat
+from pathlib import Path
+from typing import Any
+
+from .cache import LRUCache
+from .differ import SchemaDiffer
+from .models import DiffResult
+from .rules import RuleSet
+
+
+class DiffService:
+    """
+    Diff files against a warm document cache.
+
+    Parsed and normalized documents are kept in an LRU cache keyed by the
+    SHA-256 of their content (plus suffix, which selects the parser), so an
+    unchanged baseline is never re-parsed; results are cached per pair of
+    documents (see `SchemaDiffer`). Safe to call from many threads.
+    """
+
+    def __init__(
+        self, max_documents: int = 64, *, rules: RuleSet | None = None
+    ) -> None:
+        self.differ = SchemaDiffer(rules=rules, max_documents=max_documents)
+
+    @property
+    def rules(self) -> RuleSet | None:
+        return self.differ.rules
+
+    @property
+    def documents(self) -> LRUCache:
+        return self.differ.documents
+
+    def diff_files(self, old_file: Path, new_file: Path) -> DiffResult:
+        return self.differ.diff_files(old_file, new_file)
+
+    def handle(self, request: Any) -> dict[str, Any]:
+        """
+        Handle one decoded request: {"old": <path>, "new": <path>, "id": ...}.
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be a JSON object"}
+
+        response: dict[str, Any] = {}
+        if "id" in request:
+            response["id"] = request["id"]
+
+        old_file = request.get("old")
+        new_file = request.get("new")
+        if not isinstance(old_file, str) or not isinstance(new_file, str):
+            response.update(ok=False, error="'old' and 'new' must be file paths")
+            return response
+
+        try:
+            result = self.diff_files(Path(old_file), Path(new_file))
+        except (OSError, ValueError, RuntimeError) as e:
+            response.update(ok=False, error=str(e))
+            return response
+
+        response.update(ok=True, exit_code=result.exit_code(), result=result.to_dict())
+        return response
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Newline-delimited JSON: one request object per line, one response per line.
+    """
+
+    server: "_ServerMixin"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response: dict[str, Any] = {"ok": False, "error": f"Invalid JSON: {e}"}
+            else:
+                response = self.server.service.handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _HTTPHandler(http.server.BaseHTTPRequestHandler):
+    """
+    HTTP/1.1: POST one JSON request object to /diff, get the response object
+    back (status 200 when it is "ok", 400 otherwise). Connections are kept
+    alive between requests.
+    """
+
+    server: _ServerMixin
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != "/diff":
+            self.send_error(404, "POST requests to /diff")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            response: dict[str, Any] = {"ok": False, "error": f"Invalid JSON: {e}"}
+        else:
+            response = self.server.service.handle(request)
+
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(200 if response["ok"] else 400)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # one stderr line per request would drown the daemon's own output
+        pass
+
+
+class _ServerMixin(socketserver.ThreadingMixIn):
+    daemon_threads = True
+    service: DiffService
+
+
+class _UnixServer(_ServerMixin, socketserver.UnixStreamServer):
+    # (st_dev, st_ino) of the socket file this server bound
+    bound: tuple[int, int] | None = None
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        st = os.lstat(self.server_address)
+        self.bound = (st.st_dev, st.st_ino)
+
+    def server_close(self) -> None:
+        """
+        Close, and remove the socket file if it is still the one this server
+        bound (never a file something else has put there since).
+        """
+        super().server_close()
+        if self.bound is None:
+            return
+        try:
+            st = os.lstat(self.server_address)
+        except OSError:
+            return
+        if stat.S_ISSOCK(st.st_mode) and (st.st_dev, st.st_ino) == self.bound:
+            os.unlink(self.server_address)
+        self.bound = None
+
+
+class _HTTPServer(_ServerMixin, http.server.HTTPServer):
+    pass
+
+
+def make_server(
+    service: DiffService,
+    *,
+    socket_path: Path | None = None,
+    host: str = "127.0.0.1",
+    port: int | None = None,
+) -> socketserver.BaseServer:
+    """
+    Create (but do not start) a threaded diff server.
+
+    Listens on a Unix socket (newline-delimited JSON) when `socket_path` is
+    given, otherwise over HTTP on `host:port` (POST to /diff). A stale socket at `socket_path` is replaced; any
+    other file there raises ValueError. `server_close()` removes the socket.
+    """
+    server: _ServerMixin
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        _remove_stale_socket(socket_path)
+        server = _UnixServer(str(socket_path), _Handler)
+    elif port is not None:
+        server = _HTTPServer((host, port), _HTTPHandler)
+    else:
+        raise ValueError("Either socket_path or port is required")
+
+    server.service = service
+    return server
+
+
+def _remove_stale_socket(path: Path) -> None:
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} exists and is not a socket")
+    path.unlink()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .models import DiffResult
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    Shard `index` of `count` (1-based, as in `--shard 2/4`).
+
+    Operations are assigned by a hash of their key ("GET /users"), which is
+    the same on every machine and Python version, so N processes given the
+    same inputs split the work without coordinating.
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 1 <= self.index <= self.count:
+            raise ValueError(f"invalid shard {self.index}/{self.count}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        """
+        "2/4" -> Shard(2, 4).
+        """
+        index, sep, count = text.partition("/")
+        try:
+            if not sep:
+                raise ValueError
+            return cls(int(index), int(count))
+        except ValueError:
+            raise ValueError(
+                f"expected a shard as INDEX/COUNT (e.g. 1/4), got {text!r}"
+            ) from None
+
+    def owns(self, key: str) -> bool:
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index - 1
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+# Position of a group of changes in a single-process result, e.g.
+# (3, "GET /users") for the changes of one common operation.
+GroupKey = Tuple[Any, ...]
+
+
+@dataclass
+class PartialResult:
+    """
+    The changes one shard owns, in groups sorted by `GroupKey`.
+
+    Each group holds every change of one unit (a path, an added or removed
+    operation, a common operation) in the order a single-process diff emits
+    them, so `merge_partials` only has to interleave whole groups. `inputs`
+    identifies the documents and options diffed; partials with different
+    inputs cannot be merged.
+    """
+
+    shard: Shard
+    inputs: Optional[str] = None
+    old_kind: Optional[str] = None
+    new_kind: Optional[str] = None
+    groups: List[Tuple[GroupKey, DiffResult]] = field(default_factory=list)
+
+    def add(self, key: GroupKey, group: DiffResult) -> None:
+        if group.breaking or group.non_breaking:
+            self.groups.append((key, group))
+
+    def has_breaking_changes(self) -> bool:
+        return any(group.breaking for _, group in self.groups)
+
+    def exit_code(self) -> int:
+        return 1 if self.has_breaking_changes() else 0
+
+    def to_dict(self) -> dict:
+        return {
+            "shard": str(self.shard),
+            "inputs": self.inputs,
+            "old_kind": self.old_kind,
+            "new_kind": self.new_kind,
+            "groups": [
+                {"key": list(key), **group.to_dict()} for key, group in self.groups
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PartialResult":
+        """
+        Inverse of `to_dict`; raises ValueError for anything else.
+        """
+        try:
+            return cls(
+                shard=Shard.parse(data["shard"]),
+                inputs=data.get("inputs"),
+                old_kind=data.get("old_kind"),
+                new_kind=data.get("new_kind"),
+                groups=[
+                    (tuple(g["key"]), DiffResult.from_dict(g)) for g in data["groups"]
+                ],
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"not a partial result: {e!r}") from None
+
+
+def merge_partials(partials: Iterable[PartialResult]) -> DiffResult:
+    """
+    Combine the partial results of shards 1..N of one diff into the result a
+    single process would have produced (same changes, same order).
+
+    Each partial is already sorted, so this is a k-way merge of their groups.
+    Raises ValueError unless every shard of the same N and the same inputs
+    is given exactly once.
+    """
+    partials = sorted(partials, key=lambda p: p.shard.index)
+    if not partials:
+        raise ValueError("no partial results to merge")
+    count = partials[0].shard.count
+    indexes = [p.shard.index for p in partials]
+    if any(p.shard.count != count for p in partials) or indexes != list(
+        range(1, count + 1)
+    ):
+        shards = ", ".join(str(p.shard) for p in partials)
+        raise ValueError(f"expected shards 1/{count} to {count}/{count}, got {shards}")
+    if len({p.inputs for p in partials}) > 1:
+        raise ValueError("partial results come from different inputs or options")
+
+    result = DiffResult()
+    for _, group in heapq.merge(*(p.groups for p in partials), key=lambda g: g[0]):
+        result.breaking.extend(group.breaking)
+        result.non_breaking.extend(group.non_breaking)
+    return result
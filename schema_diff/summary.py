@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+from .models import Change, ChangeSeverity, ChangeType, DiffResult
+
+_HTTP_METHODS = {"get", "put", "post", "delete", "patch", "head", "options", "trace"}
+_OPERATION_SECTIONS = (".parameters.", ".requestBody", ".responses.")
+
+
+@dataclass(frozen=True)
+class SummaryGroup:
+    """
+    All changes of one type and severity under one operation.
+
+    `sample` holds up to K of them, shortest paths first.
+    """
+
+    operation: str
+    change_type: str
+    severity: ChangeSeverity
+    count: int
+    sample: tuple[Change, ...]
+
+    def to_dict(self) -> dict:
+        return {
+            "operation": self.operation,
+            "type": self.change_type,
+            "severity": self.severity.value,
+            "count": self.count,
+            "sample": [c.to_dict() for c in self.sample],
+        }
+
+
+def operation_of(path: str) -> str:
+    """
+    Group key of a change path:
+
+      operations.GET /users.responses.200... -> "GET /users"
+      paths./users.get                       -> "GET /users"
+      paths./users                           -> "/users"
+      components.schemas.User.properties.x   -> "components.schemas.User"
+      User.email (generic JSON)              -> "User"
+    """
+    if path.startswith("operations."):
+        start = len("operations.")
+        end = len(path)
+        for section in _OPERATION_SECTIONS:
+            i = path.find(section, start, end)
+            if i != -1:
+                end = i
+        return path[start:end]
+
+    if path.startswith("paths."):
+        rest = path[len("paths.") :]
+        head, _, method = rest.rpartition(".")
+        if head and method in _HTTP_METHODS:
+            return f"{method.upper()} {head}"
+        return rest
+
+    if path.startswith("components."):
+        return ".".join(path.split(".", 3)[:3])
+
+    return re.split(r"[.\[]", path, maxsplit=1)[0] or path
+
+
+class _Kept:
+    # heap entry ordered so the root is the *largest* kept key
+    __slots__ = ("key", "change")
+
+    def __init__(self, key: tuple[int, str], change: Change) -> None:
+        self.key = key
+        self.change = change
+
+    def __lt__(self, other: "_Kept") -> bool:
+        return self.key > other.key
+
+
+def summarize(result: DiffResult, *, top_k: int = 3) -> list[SummaryGroup]:
+    """
+    Aggregate changes per (operation, change type, severity) in one pass.
+
+    Each group keeps a bounded heap of its `top_k` shortest (i.e. shallowest)
+    paths, so memory is O(groups * top_k) no matter how many changes there
+    are.
+    """
+    counts: dict[tuple[str, ChangeType, ChangeSeverity], int] = {}
+    heaps: dict[tuple[str, ChangeType, ChangeSeverity], list[_Kept]] = {}
+
+    # The differ emits changes operation by operation, so consecutive paths
+    # usually share the operation prefix; reuse it instead of re-parsing.
+    prefix = None
+    operation = ""
+
+    for change in _all_changes(result):
+        path = change.path
+        if not (
+            prefix is not None
+            and path.startswith(prefix)
+            and path.startswith(_OPERATION_SECTIONS, len(prefix))
+        ):
+            operation = operation_of(path)
+            prefix = (
+                f"operations.{operation}" if path.startswith("operations.") else None
+            )
+
+        group = (operation, change.change_type, change.severity)
+        counts[group] = counts.get(group, 0) + 1
+        if top_k <= 0:
+            continue
+
+        key = (len(path), path)
+        heap = heaps.get(group)
+        if heap is None:
+            heaps[group] = [_Kept(key, change)]
+        elif len(heap) < top_k:
+            heapq.heappush(heap, _Kept(key, change))
+        elif key < heap[0].key:
+            heapq.heapreplace(heap, _Kept(key, change))
+
+    groups = []
+    for group, count in counts.items():
+        kept = sorted(heaps.get(group, []), key=lambda k: k.key)
+        operation, change_type, severity = group
+        groups.append(
+            SummaryGroup(
+                operation=operation,
+                change_type=change_type.value,
+                severity=severity,
+                count=count,
+                sample=tuple(k.change for k in kept),
+            )
+        )
+    groups.sort(
+        key=lambda g: (
+            g.severity is not ChangeSeverity.BREAKING,
+            g.operation,
+            g.change_type,
+        )
+    )
+    return groups
+
+
+def _all_changes(result: DiffResult) -> Iterable[Change]:
+    yield from result.breaking
+    yield from result.non_breaking
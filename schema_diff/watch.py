@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .diff import diff_objects
+from .json_schema import diff_json_schema_document
+from .loader import LoadedSchema, SchemaKind, load_schema
+from .models import DiffResult
+from .openapi.diff import diff_normalized
+from .openapi.incremental import IncrementalNormalizer
+from .openapi.normalizer import NormalizedOpenAPI
+from .rules import RuleSet
+
+# Polling two stat() calls every 50 ms costs nothing measurable and works the
+# same on every platform and on network or container-mounted files.
+DEFAULT_INTERVAL = 0.05
+
+
+def _signature(path: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        # e.g. mid-save by an editor that replaces the file
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@dataclass(frozen=True)
+class Update:
+    old_kind: str
+    new_kind: str
+    result: DiffResult
+    # seconds spent loading, normalizing and diffing
+    elapsed: float
+    # path items normalized again, out of all path items (OpenAPI only)
+    renormalized: int = 0
+    path_items: int = 0
+
+
+class _Side:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.signature: Optional[tuple[int, int, int]] = None
+        self.loaded: Optional[LoadedSchema] = None
+        self.normalizer = IncrementalNormalizer()
+
+    def changed(self) -> bool:
+        signature = _signature(self.path)
+        return signature is not None and signature != self.signature
+
+    def reload(self) -> None:
+        # taken first: a version that fails to load is not retried until it
+        # changes again
+        self.signature = _signature(self.path)
+        self.loaded = load_schema(self.path)
+        if self.loaded.kind == SchemaKind.OPENAPI and self.loaded.normalized is None:
+            self.normalizer.update(self.loaded.raw)
+
+    def normalized(self) -> NormalizedOpenAPI:
+        assert self.loaded is not None
+        if self.loaded.normalized is not None:  # snapshot
+            return self.loaded.normalized
+        assert self.normalizer.normalized is not None
+        return self.normalizer.normalized
+
+
+class WatchSession:
+    """
+    Keeps both sides of a diff loaded and normalized, and re-diffs when a
+    file changes: only the path items affected by the edit are normalized and
+    diffed again (see `IncrementalNormalizer`).
+
+        session = WatchSession(old, new)
+        update = session.refresh()  # first diff
+        ...
+        update = session.refresh()  # None until a file changes
+    """
+
+    def __init__(
+        self, old_file: Path, new_file: Path, *, rules: RuleSet | None = None
+    ) -> None:
+        self.rules = rules
+        self.old = _Side(Path(old_file))
+        self.new = _Side(Path(new_file))
+        self._operations: dict[str, tuple] = {}
+
+    def refresh(self) -> Optional[Update]:
+        """
+        Re-diff if either file changed since the last refresh (always on the
+        first call). Parse errors propagate; the session stays usable.
+        """
+        stale = [side for side in (self.old, self.new) if side.changed()]
+        if not stale:
+            return None
+
+        start = time.perf_counter()
+        for side in stale:
+            side.reload()
+        old, new = self.old.loaded, self.new.loaded
+        if old is None or new is None:
+            # the other side has not loaded yet
+            return None
+
+        renormalized = path_items = 0
+        if old.kind == SchemaKind.OPENAPI and new.kind == SchemaKind.OPENAPI:
+            new_normalized = self.new.normalized()
+            result = diff_normalized(
+                self.old.normalized(),
+                new_normalized,
+                rules=self.rules,
+                cache=self._operations,
+            )
+            if self.new in stale:
+                renormalized = self.new.normalizer.renormalized
+            path_items = len(new_normalized.paths)
+        elif old.kind == SchemaKind.JSON_SCHEMA and new.kind == SchemaKind.JSON_SCHEMA:
+            result = diff_json_schema_document(old.raw, new.raw, rules=self.rules)
+        else:
+            result = diff_objects(old.raw, new.raw, rules=self.rules)
+
+        return Update(
+            old_kind=old.kind.value,
+            new_kind=new.kind.value,
+            result=result,
+            elapsed=time.perf_counter() - start,
+            renormalized=renormalized,
+            path_items=path_items,
+        )
+
+
+def watch(
+    session: WatchSession,
+    on_update: Callable[[Update], None],
+    *,
+    on_error: Callable[[Exception], None],
+    interval: float = DEFAULT_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Poll the session's files until `stop` is set (or forever), calling
+    `on_update` with every new result and `on_error` for files that fail to
+    load (e.g. half-written JSON) without giving up.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            update = session.refresh()
+        except (OSError, ValueError) as e:
+            on_error(e)
+            update = None
+        if update is not None:
+            on_update(update)
+        stop.wait(interval)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+from .loader import LoadedSchema, SchemaKind, diff_loaded, load_schema
+from .models import DiffResult, WindowResult
+from .openapi.diff import diff_normalized
+from .openapi.normalizer import NormalizedOpenAPI
+from .rules import RuleSet
+
+
+def diff_against(
+    new: LoadedSchema,
+    baselines: Sequence[Path],
+    *,
+    rules: RuleSet | None = None,
+) -> WindowResult:
+    """
+    Diff one new schema against several baseline schemas (e.g. the last K
+    public releases).
+
+    Baselines are loaded and diffed one after another, each like a plain diff
+    (see `diff_loaded`): only the path items that differ from the new schema
+    are normalized, and only one baseline is held in memory at a time. The
+    work is pure-Python and CPU-bound, so threads would not speed it up.
+    Snapshot baselines share one normalized form of the new schema. Results
+    keep the order of `baselines`.
+    """
+    paths = [Path(p) for p in baselines]
+    new_normalized: NormalizedOpenAPI | None = None
+    results: list[DiffResult] = []
+    for path in paths:
+        old = load_schema(path)
+        if old.normalized is not None and new.kind == SchemaKind.OPENAPI:
+            if new_normalized is None:
+                new_normalized = new.normalize()
+            results.append(diff_normalized(old.normalized, new_normalized, rules=rules))
+        else:
+            results.append(diff_loaded(old, new, rules=rules))
+
+    return WindowResult(baselines=[str(p) for p in paths], results=results)
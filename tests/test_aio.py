@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from schema_diff import SchemaDiffer, aio
+from schema_diff.cancellation import CancelToken, Cancelled, cancellable, checkpoint
+from schema_diff.diff import diff_objects
+from schema_diff.openapi.diff import diff_openapi
+
+OLD = {
+    "openapi": "3.0.3",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/orders": {"get": {"responses": {"200": {"description": "ok"}}}},
+    },
+}
+NEW = {**OLD, "paths": {"/users": OLD["paths"]["/users"]}}
+
+
+def _huge() -> dict:
+    # shared subtrees: small in memory, 8**8 nodes to walk
+    level: dict = {"leaf": 1}
+    for _ in range(8):
+        level = {f"k{i}": level for i in range(8)}
+    return level
+
+
+def _write(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_async_functions_match_sync(tmp_path: Path):
+    old_file = _write(tmp_path / "old.json", OLD)
+    new_file = _write(tmp_path / "new.json", NEW)
+
+    async def main():
+        loaded = await aio.load_schema(old_file)
+        return (
+            loaded.raw,
+            await aio.diff_files(old_file, new_file),
+            await aio.diff_openapi(OLD, NEW),
+            await aio.diff_objects({"a": 1}, {"a": "1"}),
+            await aio.diff(SchemaDiffer(), old_file, NEW),
+        )
+
+    raw, from_files, from_dicts, generic, from_differ = asyncio.run(main())
+
+    assert raw == OLD
+    assert from_files == from_dicts == from_differ == diff_openapi(OLD, NEW)
+    assert generic == diff_objects({"a": 1}, {"a": "1"})
+
+
+def test_checkpoint_raises_once_cancelled():
+    token = CancelToken()
+    checkpoint()  # no token: free
+    with cancellable(token):
+        checkpoint()
+        token.cancel()
+        with pytest.raises(Cancelled):
+            checkpoint()
+    checkpoint()
+
+
+def test_timeout_stops_the_worker():
+    doc = _huge()
+    executor = ThreadPoolExecutor(1)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await aio.diff_objects(doc, doc, executor=executor, timeout=0.05)
+        # the single worker is free again long before the diff would be done
+        start = time.perf_counter()
+        await aio.diff_objects({}, {}, executor=executor, timeout=5)
+        return time.perf_counter() - start
+
+    try:
+        assert asyncio.run(main()) < 1
+    finally:
+        executor.shutdown()
+
+
+def test_cancelling_the_task_keeps_the_loop_responsive():
+    doc = _huge()
+    executor = ThreadPoolExecutor(1)
+
+    async def main():
+        task = asyncio.ensure_future(aio.diff_objects(doc, doc, executor=executor))
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await aio.diff_objects({}, {}, executor=executor, timeout=1)
+        return ticks
+
+    try:
+        assert asyncio.run(main()) == 5
+    finally:
+        executor.shutdown()
+
+
+def test_process_pool_executor():
+    async def main(executor):
+        result = await aio.diff_openapi(OLD, NEW, executor=executor)
+        with pytest.raises(TypeError):
+            await aio.diff(SchemaDiffer(), OLD, NEW, executor=executor)
+        return result
+
+    with ProcessPoolExecutor(1) as executor:
+        assert asyncio.run(main(executor)) == diff_openapi(OLD, NEW)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from schema_diff.baseline import load_baseline
+from schema_diff.cli import app
+from schema_diff.models import Change, ChangeSeverity, ChangeType
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.rules import DEFAULT_RULESET
+
+
+def _spec(param: str, fields: dict) -> dict:
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "t", "version": "1"},
+        "paths": {
+            f"/users/{{{param}}}": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"type": "object", "properties": fields}
+                                }
+                            },
+                        }
+                    }
+                }
+            }
+        },
+    }
+
+
+FIELDS = {"id": {"type": "string"}, "name": {"type": "string"}, "age": {}}
+OLD = _spec("id", FIELDS)
+NEW = _spec("id", {"id": {"type": "integer"}, "age": {}})
+
+
+def test_fingerprint_ignores_severity_message_and_parameter_names():
+    change = Change(
+        ChangeType.TYPE_CHANGE,
+        ChangeSeverity.BREAKING,
+        "operations.GET /users/{id}.responses.200.schema.properties.id",
+        "string",
+        "integer",
+        "Type changed",
+    )
+    renamed = Change(
+        ChangeType.TYPE_CHANGE,
+        ChangeSeverity.NON_BREAKING,
+        "operations.GET /users/{userId}.responses.200.schema.properties.id",
+        "string",
+        "integer",
+    )
+    assert change.fingerprint == renamed.fingerprint
+    assert len(change.fingerprint) == 64
+    other = Change(
+        ChangeType.TYPE_CHANGE,
+        ChangeSeverity.BREAKING,
+        change.path,
+        "string",
+        "number",
+    )
+    assert other.fingerprint != change.fingerprint
+
+
+def test_accepted_changes_are_dropped_while_diffing():
+    result = diff_openapi(OLD, NEW)
+    assert len(result.breaking) == 2
+
+    accepted = {result.breaking[0].fingerprint}
+    rules = DEFAULT_RULESET.with_baseline(accepted)
+    filtered = diff_openapi(OLD, NEW, rules=rules)
+    assert filtered.breaking == result.breaking[1:]
+    assert filtered.metrics.accepted == 1
+    # overrides keep the baseline
+    assert rules.with_overrides([]).accepted == rules.accepted
+
+
+def _write(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_cli_baseline_roundtrip(tmp_path: Path):
+    old_file = _write(tmp_path / "old.json", OLD)
+    new_file = _write(tmp_path / "new.json", NEW)
+    accepted = tmp_path / "accepted.json"
+    runner = CliRunner()
+
+    out = runner.invoke(app, ["baseline", str(old_file), str(new_file), str(accepted)])
+    assert out.exit_code == 0, out.output
+    assert "2 accepted changes" in out.stdout
+    entries = json.loads(accepted.read_text())["accepted"]
+    assert [e["path"].rsplit(".", 1)[-1] for e in entries] == ["id", "name"]
+    assert len(load_baseline(accepted)) == 2
+
+    args = [str(old_file), str(new_file), "--format", "json"]
+    out = runner.invoke(app, [*args, "--baseline", str(accepted)])
+    assert out.exit_code == 0
+    assert json.loads(out.stdout)["breaking"] == []
+
+    # a new breaking change is still reported, under renamed parameters too
+    newer = copy.deepcopy(NEW)
+    newer["paths"]["/users/{id}"]["get"]["responses"]["200"]["content"][
+        "application/json"
+    ]["schema"]["properties"].pop("age")
+    newer["paths"] = {"/users/{userId}": newer["paths"]["/users/{id}"]}
+    old_renamed = _write(tmp_path / "old2.json", _spec("userId", FIELDS))
+    newer_file = _write(tmp_path / "newer.json", newer)
+    out = runner.invoke(
+        app,
+        [str(old_renamed), str(newer_file), "--format", "json"]
+        + ["--baseline", str(accepted)],
+    )
+    assert out.exit_code == 1
+    assert [c["path"] for c in json.loads(out.stdout)["breaking"]] == [
+        "operations.GET /users/{userId}.responses.200.schema.properties.age"
+    ]
+
+    _write(accepted, {"accepted": [{"path": "x"}]})
+    out = runner.invoke(app, [*args, "--baseline", str(accepted)])
+    assert out.exit_code == 2
+    assert "expected a 'fingerprint'" in out.output
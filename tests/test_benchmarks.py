@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks import run as bench
+from benchmarks.generate import (
+    SIZES,
+    SpecShape,
+    json_document,
+    mutate,
+    mutate_json,
+    openapi_spec,
+)
+from schema_diff.diff import diff_objects
+from schema_diff.openapi.diff import diff_normalized
+from schema_diff.openapi.normalizer import normalize_openapi
+
+SHAPE = SpecShape(paths=10, components=12)
+
+
+def test_generator_is_deterministic():
+    assert openapi_spec(SHAPE) == openapi_spec(SHAPE)
+    assert openapi_spec(SHAPE) != openapi_spec(replace(SHAPE, seed=1))
+    assert mutate(openapi_spec(SHAPE)) == mutate(openapi_spec(SHAPE))
+    assert json_document(3, 4) == json_document(3, 4)
+
+
+def test_generated_spec_shape():
+    shape = replace(SHAPE, ops_per_path=3, all_of=1.0)
+    spec = openapi_spec(shape)
+
+    normalized = normalize_openapi(spec)
+
+    assert len(normalized.operations) == shape.paths * shape.ops_per_path
+    assert len(spec["components"]["schemas"]) == shape.components
+    assert any("allOf" in s for s in spec["components"]["schemas"].values())
+
+
+def test_mutations_produce_breaking_changes():
+    spec = openapi_spec(SHAPE)
+
+    result = diff_normalized(
+        normalize_openapi(spec), normalize_openapi(mutate(spec, rate=0.5))
+    )
+
+    assert result.has_breaking_changes()
+    assert result.non_breaking
+
+    doc = json_document(3, 4)
+    assert diff_objects(doc, mutate_json(doc, rate=0.5)).breaking
+
+
+def test_compare_uses_per_scenario_thresholds():
+    baseline = {
+        "small/diff": {"median": 1.0},
+        "small/load": {"median": 1.0},
+        "small/render_json": {"median": 1.0},
+    }
+    results = {
+        "small/diff": {"median": 1.2},
+        "small/load": {"median": 1.2},
+        "small/render_json": {"median": 0.5},
+        "small/new_scenario": {"median": 9.0},
+    }
+
+    regressions = bench.compare(results, baseline, {"default": 0.25, "small/diff": 0.1})
+
+    assert [r.name for r in regressions] == ["small/diff"]
+    assert round(regressions[0].ratio, 2) == 1.2
+
+
+def test_run_saves_and_checks_baseline(tmp_path: Path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--sizes", "small", "--scenarios", "normalize,diff", "--repeat", "1"]
+
+    assert bench.main([*args, "--save-baseline", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    assert set(saved["results"]) == {"small/normalize", "small/diff"}
+
+    # anything is a regression against a baseline ten times faster
+    for timing in saved["results"].values():
+        timing["median"] /= 10
+    baseline.write_text(json.dumps(saved))
+    assert bench.main([*args, "--baseline", str(baseline)]) == 1
+
+
+def test_size_ladder_grows():
+    shapes = list(SIZES.values())
+    for smaller, larger in zip(shapes, shapes[1:]):
+        assert larger.paths > smaller.paths
+        assert larger.components > smaller.components
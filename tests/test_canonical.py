@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import copy
+
+from schema_diff.canonical import canonicalize_pair, fold_schema
+from schema_diff.json_schema import diff_json_schema_document
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.profiling import profile
+
+
+def _spec(user: dict, *, reverse: bool = False) -> dict:
+    paths = {
+        "/users": {
+            "get": {
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/User"}
+                            }
+                        },
+                    }
+                }
+            }
+        },
+        "/health": {"get": {"responses": {"204": {"description": "up"}}}},
+    }
+    if reverse:
+        paths = dict(reversed(paths.items()))
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "t", "version": "1"},
+        "paths": paths,
+        "components": {"schemas": {"User": user}},
+    }
+
+
+USER = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "string"},
+        "name": {"type": "string", "nullable": True},
+    },
+}
+
+# the same schema, spelled differently
+USER_31 = {
+    "properties": {
+        "name": {"type": ["null", "string"]},
+        "id": {"nullable": False, "type": "string"},
+    },
+    "required": ["name", "id", "name"],
+    "type": "object",
+}
+
+
+def test_fold_schema():
+    assert fold_schema({"type": ["string", "null"]}) == {
+        "type": "string",
+        "nullable": True,
+    }
+    assert fold_schema({"type": ["string", "integer"]}) == {
+        "type": ["integer", "string"]
+    }
+    assert fold_schema({"type": ["null"]}) == {"type": "null"}
+    assert fold_schema({"required": ["b", "a", "b"]}) == {"required": ["a", "b"]}
+    schema = {"type": "string", "required": ["a"], "nullable": True}
+    assert fold_schema(schema) is schema
+
+
+def test_pair_only_folds_what_differs():
+    old, new = _spec(USER), _spec(USER_31, reverse=True)
+    old_out, new_out = canonicalize_pair(old, new)
+    assert old_out == new_out
+    assert old_out["paths"]["/users"] is old["paths"]["/users"]
+    # equal subtrees are shared
+    assert new_out["paths"]["/health"] is old["paths"]["/health"]
+
+    # equal as strings, not as keys
+    int_keys = copy.deepcopy(old)
+    int_keys["paths"]["/health"]["get"]["responses"] = {204: {"description": "up"}}
+    old_out, new_out = canonicalize_pair(old, int_keys)
+    assert old_out != new_out
+
+
+def test_equivalent_documents_are_not_normalized():
+    with profile() as prof:
+        result = diff_openapi(_spec(USER), _spec(USER_31, reverse=True))
+
+    assert not result.breaking and not result.non_breaking
+    assert result.metrics.resolve_calls == 0
+    assert [t.name for t in prof.timings()] == ["canonicalize"]
+
+
+def test_type_arrays_are_compared():
+    new = copy.deepcopy(USER_31)
+    new["properties"]["name"]["type"] = ["integer", "null"]
+    result = diff_openapi(_spec(USER), _spec(new))
+    assert [(c.path, c.old_type, c.new_type) for c in result.breaking] == [
+        (
+            "operations.GET /users.responses.200.schema.properties.name",
+            "string",
+            "integer",
+        )
+    ]
+
+
+def test_json_schema_documents():
+    old = {"$schema": "x", "$defs": {"User": USER}}
+    new = {"$defs": {"User": USER_31}, "$schema": "x"}
+    with profile() as prof:
+        result = diff_json_schema_document(old, new)
+    assert not result.breaking and not result.non_breaking
+    assert "resolve" not in [t.name for t in prof.timings()]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from schema_diff.cli import app
+from schema_diff.models import DiffResult
+from schema_diff.openapi.diff import diff_normalized, diff_openapi
+from schema_diff.openapi.normalizer import normalize_openapi
+
+
+def _ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _json(schema: dict) -> dict:
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def _responses(schema: dict) -> dict:
+    return {
+        "200": {"description": "ok", **_json(schema)},
+        "201": {"description": "created", **_json(schema)},
+    }
+
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users": {
+            "get": {"responses": _responses(_ref("User"))},
+            "post": {"requestBody": _json(_ref("User")), "responses": {}},
+        },
+        "/teams": {"get": {"responses": _responses(_ref("Team"))}},
+        "/health": {"get": {"responses": _responses({"type": "object"})}},
+    },
+    "components": {
+        "schemas": {
+            "User": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, "name": {"type": "string"}},
+            },
+            "Team": {
+                "type": "object",
+                "properties": {"members": {"type": "array", "items": _ref("User")}},
+            },
+        }
+    },
+}
+
+NEW = copy.deepcopy(SPEC)
+del NEW["components"]["schemas"]["User"]["properties"]["name"]
+# one inline schema, used by both statuses
+NEW["paths"]["/health"]["get"]["responses"]["200"]["content"]["application/json"][
+    "schema"
+]["properties"] = {"ok": {"type": "boolean"}}
+
+
+def _rows(changes) -> list[tuple]:
+    return [(c.path, c.affected) for c in changes]
+
+
+def test_component_changes_are_reported_once_per_context():
+    full = diff_openapi(SPEC, NEW)
+    assert len(full.breaking) == 5  # 2 statuses x 2 GETs, and the request
+
+    result = diff_openapi(SPEC, NEW, compact=True)
+    assert _rows(result.breaking) == [
+        # the request body and the responses use separate rules
+        ("components.schemas.User.properties.name", ("POST /users",)),
+        ("components.schemas.User.properties.name", ("GET /teams", "GET /users")),
+    ]
+    assert [c.message for c in result.breaking] == ["Property removed"] * 2
+    # inline schemas are still reported under their operation
+    assert _rows(result.non_breaking) == [
+        ("operations.GET /health.responses.200.schema.properties.ok", None),
+        ("operations.GET /health.responses.201.schema.properties.ok", None),
+    ]
+
+
+def test_compact_on_separately_normalized_documents():
+    old, new = normalize_openapi(SPEC), normalize_openapi(NEW)
+    assert diff_normalized(old, new, compact=True) == diff_openapi(
+        SPEC, NEW, compact=True
+    )
+    # unchanged components are diffed once, not once per use
+    unchanged = diff_normalized(old, normalize_openapi(SPEC), compact=True)
+    assert unchanged == DiffResult()
+    assert (
+        unchanged.metrics.schema_nodes
+        < diff_normalized(old, normalize_openapi(SPEC)).metrics.schema_nodes
+    )
+
+
+def test_affected_survives_to_dict():
+    result = diff_openapi(SPEC, NEW, compact=True)
+    data = result.to_dict()
+    assert data["breaking"][1]["affected"] == ["GET /teams", "GET /users"]
+    assert "affected" not in data["non_breaking"][0]
+    assert DiffResult.from_dict(data) == result
+
+
+def _write(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_cli_compact(tmp_path: Path):
+    old_file = _write(tmp_path / "old.json", SPEC)
+    new_file = _write(tmp_path / "new.json", NEW)
+    runner = CliRunner()
+
+    out = runner.invoke(
+        app, [str(old_file), str(new_file), "--compact", "--format", "plain"]
+    )
+    assert out.exit_code == 1
+    assert (
+        "components.schemas.User.properties.name: Property removed "
+        "[2 operations: GET /teams, GET /users]"
+    ) in out.stdout
+
+    out = runner.invoke(
+        app, [str(old_file), str(new_file), "--compact", "--against", str(old_file)]
+    )
+    assert out.exit_code == 2
+    assert "--compact cannot be combined with --against" in out.output
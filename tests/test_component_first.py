@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from benchmarks.generate import SIZES, mutate, openapi_spec
+from schema_diff.openapi.diff import diff_normalized, diff_openapi
+from schema_diff.openapi.incremental import normalize_changed
+from schema_diff.openapi.normalizer import normalize_openapi
+
+
+def _ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _get(schema: dict) -> dict:
+    return {
+        "get": {
+            "responses": {
+                "200": {
+                    "description": "ok",
+                    "content": {"application/json": {"schema": schema}},
+                }
+            }
+        }
+    }
+
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users": _get(_ref("User")),
+        "/teams": _get(_ref("Team")),
+        "/health": _get({"type": "object"}),
+    },
+    "components": {
+        "schemas": {
+            "User": {"type": "object", "properties": {"id": {"type": "string"}}},
+            "Team": {
+                "type": "object",
+                "properties": {
+                    "owner": _ref("User"),
+                    "tags": {"type": "array", "items": _ref("Tag")},
+                },
+            },
+            "Tag": {"type": "string", "enum": ["a", "b"]},
+        }
+    },
+}
+
+
+def _full(old: dict, new: dict):
+    return diff_normalized(normalize_openapi(old), normalize_openapi(new))
+
+
+def test_only_path_items_reaching_a_change_are_normalized():
+    new = copy.deepcopy(SPEC)
+    new["components"]["schemas"]["Tag"]["enum"] = ["a"]
+    new["paths"]["/orders"] = _get({"type": "object"})
+
+    old_normalized, new_normalized = normalize_changed(SPEC, new)
+    assert set(new_normalized.operations) == {"GET /teams"}
+    assert set(new_normalized.paths) == {"/users", "/teams", "/health", "/orders"}
+
+    # User did not change: one resolved object, shared by both sides
+    old_owner = old_normalized.operations["GET /teams"].responses["200"]
+    new_owner = new_normalized.operations["GET /teams"].responses["200"]
+    assert old_owner["properties"]["owner"] is new_owner["properties"]["owner"]
+
+    result = diff_openapi(SPEC, new)
+    assert result == _full(SPEC, new)
+    assert [c.path for c in result.breaking] == [
+        "operations.GET /teams.responses.200.schema.properties.tags.items.enum"
+    ]
+
+
+def test_unchanged_documents_normalize_nothing():
+    old, new = normalize_changed(SPEC, copy.deepcopy(SPEC))
+    assert old.operations == new.operations == {}
+    assert old.metrics.resolve_calls == new.metrics.resolve_calls == 0
+
+
+@pytest.mark.parametrize("rate", [0.003, 0.05, 0.3])
+def test_matches_full_normalization(rate: float):
+    old = openapi_spec(SIZES["small"])
+    new = mutate(old, rate=rate, seed=3)
+    assert diff_openapi(old, new) == _full(old, new)
+    assert diff_openapi(new, old) == _full(new, old)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from schema_diff import SchemaDiffer
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.openapi.normalizer import normalize_openapi
+
+
+def _spec(*paths: str, user_props: tuple[str, ...] = ("id", "name")) -> dict:
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "t", "version": "1"},
+        "paths": {
+            p: {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/User"}
+                                }
+                            },
+                        }
+                    }
+                }
+            }
+            for p in paths
+        },
+        "components": {
+            "schemas": {
+                "User": {
+                    "type": "object",
+                    "properties": {p: {"type": "string"} for p in user_props},
+                }
+            }
+        },
+    }
+
+
+OLD = _spec("/users", "/orders")
+NEW = _spec("/users", user_props=("id",))
+
+
+def test_diff_matches_free_functions():
+    differ = SchemaDiffer()
+
+    assert differ.diff(OLD, NEW) == diff_openapi(OLD, NEW)
+    assert differ.diff({"a": 1}, {"a": "1"}).breaking
+
+
+def test_documents_are_cached_by_content():
+    differ = SchemaDiffer()
+
+    first = differ.normalize(OLD)
+    again = differ.normalize(copy.deepcopy(OLD))
+
+    assert again is first
+    assert differ.stats()["documents"] == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_results_are_cached_per_pair():
+    differ = SchemaDiffer()
+
+    first = differ.diff(OLD, NEW)
+    second = differ.diff(copy.deepcopy(OLD), copy.deepcopy(NEW))
+    reverse = differ.diff(NEW, OLD)
+
+    assert second is first
+    assert reverse is not first
+    assert differ.stats()["results"]["hits"] == 1
+
+
+def test_accepts_files_and_normalized_specs(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    old_file.write_text(json.dumps(OLD), encoding="utf-8")
+    normalized = normalize_openapi(NEW)
+    differ = SchemaDiffer(max_documents=2)
+
+    expected = diff_openapi(OLD, NEW)
+    assert differ.diff(old_file, normalized) == expected
+    assert differ.diff(str(old_file), normalized) is differ.diff(old_file, normalized)
+    assert differ.normalize(normalized) is normalized
+
+    with pytest.raises(ValueError):
+        differ.diff({"a": 1}, normalized)
+
+
+def test_resolved_components_are_shared_with_normalization():
+    differ = SchemaDiffer()
+
+    normalized = differ.normalize(OLD)
+    user = differ.resolve(OLD, "#/components/schemas/User")
+
+    response = normalized.operations["GET /users"].responses["200"]
+    assert user is response
+    assert set(user["properties"]) == {"id", "name"}
+
+
+def test_unserializable_dicts_are_cached_by_identity():
+    # keys that JSON cannot encode (YAML allows any scalar as a key)
+    doc = {"matrix": {(0, 1): "ok"}}
+    differ = SchemaDiffer()
+
+    first = differ.diff(doc, doc)
+    assert differ.diff(doc, doc) is first
+    assert differ.diff(copy.deepcopy(doc), doc) is not first
+
+
+def test_safe_to_share_across_threads():
+    differ = SchemaDiffer(max_documents=4, max_results=2)
+    pairs = [(OLD, NEW), (NEW, OLD), (OLD, OLD)] * 20
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda pair: differ.diff(*pair), pairs))
+
+    for (old, new), result in zip(pairs, results):
+        assert result == diff_openapi(old, new)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+import schema_diff
+from schema_diff import loader
+from schema_diff.openapi import snapshot
+
+# Self time of our own modules when the CLI starts, in milliseconds. Generous on
+# purpose (CI machines are slow and noisy); it catches a heavy import sneaking
+# back into the startup path, not small regressions.
+CLI_IMPORT_BUDGET_MS = 60
+# Cumulative import time of `schema_diff.cli`, dependencies (typer, click)
+# included: about 65 ms locally. Too noisy to catch one eager rich or yaml
+# import (about 70 ms together); `test_cli_startup_skips_rich_yaml_and_differs`
+# checks those by name.
+CLI_STARTUP_BUDGET_MS = 200
+
+
+def _import_times(statement: str) -> dict[str, tuple[int, int]]:
+    """
+    `python -X importtime` for `statement`: module -> (self us, cumulative us).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        text=True,
+        capture_output=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():  # header line
+            continue
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _loaded_modules(statement: str) -> list[str]:
+    """
+    `sys.modules` after `statement` in a fresh interpreter. Unlike
+    `-X importtime`, this includes modules loaded via importlib.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(*sys.modules)"],
+        text=True,
+        capture_output=True,
+        check=True,
+    )
+    return proc.stdout.split()
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from schema_diff import diff_objects, diff_openapi",
+        "import schema_diff.diff, schema_diff.openapi.diff",
+    ],
+)
+def test_library_api_does_not_import_cli_dependencies(statement: str):
+    modules = _loaded_modules(statement)
+
+    assert "schema_diff.openapi.diff" in modules
+    assert not [m for m in modules if m.split(".")[0] in {"typer", "click", "rich"}]
+
+
+def test_cli_startup_skips_rich_yaml_and_differs():
+    modules = _loaded_modules("import schema_diff.cli")
+
+    assert "schema_diff.cli" in modules
+    heavy = {"rich", "yaml", "orjson", "schema_diff.openapi", "schema_diff.output"}
+    assert not [m for m in modules if any(m.startswith(h) for h in heavy)]
+
+
+def test_cli_import_time_budget():
+    modules = _import_times("import schema_diff.cli")
+
+    own_ms = sum(s for m, (s, _) in modules.items() if m.startswith("schema_diff"))
+    assert own_ms / 1000 < CLI_IMPORT_BUDGET_MS, sorted(
+        (s, m) for m, (s, _) in modules.items() if m.startswith("schema_diff")
+    )
+    _, total_us = modules["schema_diff.cli"]
+    assert total_us / 1000 < CLI_STARTUP_BUDGET_MS, sorted(
+        ((c, m) for m, (_, c) in modules.items()), reverse=True
+    )[:10]
+
+
+def test_loader_snapshot_magic_matches_snapshot_format():
+    assert loader._SNAPSHOT_MAGIC == snapshot.MAGIC
+
+
+def test_all_lists_every_lazy_export():
+    assert sorted(schema_diff.__all__) == sorted(schema_diff._EXPORTS)
+    assert all(getattr(schema_diff, name) for name in schema_diff.__all__)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from schema_diff import SchemaDiffer
+from schema_diff.cli import app
+from schema_diff.json_schema import definitions_index, diff_json_schema_document
+from schema_diff.openapi.resolver import resolve_schema
+
+SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {"event": {"$ref": "#/$defs/Event"}},
+    "$defs": {
+        "Event": {
+            "description": "an event",
+            "type": "object",
+            "properties": {
+                "id": {"type": "string"},
+                "user": {"$ref": "#/$defs/User"},
+            },
+        },
+        "User": {"type": "object", "properties": {"name": {"type": "string"}}},
+        "Tree": {
+            "type": "object",
+            "properties": {"children": {"type": "array", "items": {"$ref": "#"}}},
+        },
+        "a/b": {"type": "string"},
+    },
+}
+
+
+def _edited(fn) -> dict:
+    schema = copy.deepcopy(SCHEMA)
+    fn(schema)
+    return schema
+
+
+def _paths(result) -> tuple[list[str], list[str]]:
+    return (
+        [c.path for c in result.breaking],
+        [c.path for c in result.non_breaking],
+    )
+
+
+def test_index_resolves_refs_into_defs_and_definitions():
+    index = definitions_index({**SCHEMA, "definitions": {"Old": {"type": "integer"}}})
+    assert set(index) == {
+        "#",
+        "#/$defs/Event",
+        "#/$defs/User",
+        "#/$defs/Tree",
+        "#/$defs/a~1b",
+        "#/definitions/Old",
+    }
+
+    resolved = resolve_schema({"$ref": "#/$defs/Event"}, {}, index=index)
+    assert resolved["properties"]["user"] == SCHEMA["$defs"]["User"]
+    # recursion through the root stops at the cycle
+    tree = resolve_schema({"$ref": "#/$defs/Tree"}, {}, index=index)
+    assert tree["properties"]["children"]["items"]["properties"]["event"]
+
+
+def test_annotations_are_not_changes():
+    edited = _edited(lambda s: s["$defs"]["Event"].update(description="renamed"))
+    assert _paths(diff_json_schema_document(SCHEMA, edited)) == ([], [])
+
+
+def test_changes_are_reported_under_every_dependent():
+    # User is reached by Event, by the root through Event, and by Tree
+    # through the root
+    edited = _edited(lambda s: s["$defs"]["User"]["properties"].pop("name"))
+    breaking, _ = _paths(diff_json_schema_document(SCHEMA, edited))
+    assert breaking == [
+        "$defs.Event.properties.user.properties.name",
+        "$defs.Tree.properties.children.items.properties.event"
+        ".properties.user.properties.name",
+        "$defs.User.properties.name",
+        "$.properties.event.properties.user.properties.name",
+    ]
+
+
+def test_definitions_added_and_removed():
+    edited = _edited(lambda s: s["$defs"].pop("a/b"))
+    edited["$defs"]["Order"] = {"type": "object"}
+    result = diff_json_schema_document(SCHEMA, edited)
+    assert _paths(result) == (["$defs.a/b"], ["$defs.Order"])
+    assert result.breaking[0].message == "Definition removed"
+
+
+def test_only_affected_definitions_are_resolved():
+    registry = {
+        "$defs": {f"E{i}": {"type": "object", "properties": {}} for i in range(500)}
+    }
+    edited = copy.deepcopy(registry)
+    edited["$defs"]["E7"]["properties"]["id"] = {"type": "string"}
+
+    result = diff_json_schema_document(registry, edited)
+    assert _paths(result) == ([], ["$defs.E7.properties.id"])
+    assert result.metrics.ref_lookups == 2
+    assert diff_json_schema_document(registry, registry).metrics.ref_lookups == 0
+
+
+def _write(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_cli_and_differ_route_json_schema(tmp_path: Path):
+    edited = _edited(lambda s: s["$defs"]["User"].update(type="string"))
+    old_file = _write(tmp_path / "old.json", SCHEMA)
+    new_file = _write(tmp_path / "new.json", edited)
+
+    out = CliRunner().invoke(app, [str(old_file), str(new_file), "--format", "json"])
+    assert out.exit_code == 1
+    report = json.loads(out.stdout)
+    assert "$defs.User" in [c["path"] for c in report["breaking"]]
+
+    assert SchemaDiffer().diff(old_file, new_file) == diff_json_schema_document(
+        SCHEMA, edited
+    )
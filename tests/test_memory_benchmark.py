@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+
+from benchmarks import memory
+
+
+def test_measure_reports_every_phase():
+    data = memory.measure("small")
+
+    assert list(data["phases"]) == list(memory.PHASES)
+    assert data["changes"] > 0
+    load = data["phases"]["load"]
+    assert load["retained"] > 0
+    assert load["peak"] >= load["retained"]
+    # the parsed documents are still alive when the later phases run
+    assert data["phases"]["diff"]["peak"] >= load["retained"]
+
+
+def test_scaling_slope():
+    def run(input_bytes: int, peak: int) -> dict:
+        phase = {"peak": peak, "retained": 0, "rss_peak": None, "rss": None}
+        return {
+            "input_bytes": input_bytes,
+            "phases": {name: phase for name in memory.PHASES},
+        }
+
+    runs = {"a": run(100, 10), "b": run(1000, 100), "c": run(10000, 10000)}
+
+    curve = memory.scaling(runs)["diff"]
+
+    assert [(size, value) for size, value, _ in curve] == [
+        ("a", 10),
+        ("b", 100),
+        ("c", 10000),
+    ]
+    assert curve[0][2] is None
+    assert math.isclose(curve[1][2], 1.0)
+    assert math.isclose(curve[2][2], 2.0)
+
+
+def test_baseline_and_rss_limit(tmp_path: Path):
+    baseline = tmp_path / "memory.json"
+
+    assert memory.main(["--sizes", "small", "--save-baseline", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    assert set(saved["results"]) == {f"small/{p}" for p in memory.PHASES}
+
+    for phase in saved["results"].values():
+        phase["peak"] //= 4
+    baseline.write_text(json.dumps(saved))
+    assert memory.main(["--sizes", "small", "--baseline", str(baseline)]) == 1
+
+    if memory._rss() is not None:  # Linux
+        assert memory.main(["--sizes", "small", "--max-rss-mb", "1"]) == 1
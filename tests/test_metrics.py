@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from schema_diff.diff import diff_objects
+from schema_diff.models import DiffMetrics, DiffResult
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.openapi.resolver import resolve_schema
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def _spec(status_enum: list[str]) -> dict:
+    ref = {"$ref": "#/components/schemas/Status"}
+    return {
+        "openapi": "3.0.0",
+        "paths": {
+            path: {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {"application/json": {"schema": ref}},
+                        }
+                    }
+                }
+            }
+            for path in ("/a", "/b")
+        },
+        "components": {"schemas": {"Status": {"type": "string", "enum": status_enum}}},
+    }
+
+
+def test_openapi_diff_counts_resolver_and_enum_cache():
+    result = diff_openapi(_spec(["on", "off"]), _spec(["on"]))
+
+    m = result.metrics
+    # per document: one expansion of Status, then a memo hit for the second path
+    assert (m.ref_lookups, m.ref_cache_misses, m.ref_cache_hits) == (4, 2, 2)
+    assert m.schema_nodes == 2
+    # the resolved enum lists are shared, so the second comparison is cached
+    assert (m.enum_cache_misses, m.enum_cache_hits) == (1, 1)
+    assert m.truncations == 0
+
+
+def test_enum_cache_is_scoped_to_one_diff():
+    old, new = _spec(["on", "off"]), _spec(["on"])
+    first = diff_openapi(old, new)
+    # the same documents again: nothing is remembered from the first diff
+    assert diff_openapi(old, new).metrics == first.metrics
+
+
+def test_resolver_counts_depth_and_truncations():
+    doc = {
+        "components": {
+            "schemas": {
+                f"S{i}": {
+                    "properties": {"next": {"$ref": f"#/components/schemas/S{i + 1}"}}
+                }
+                for i in range(10)
+            }
+        }
+    }
+    metrics = DiffMetrics()
+
+    resolve_schema(
+        {"$ref": "#/components/schemas/S0"}, doc, max_depth=6, metrics=metrics
+    )
+
+    assert metrics.truncations == 1
+    assert metrics.max_resolve_depth == 7
+
+
+def test_diff_objects_counts_nodes_and_depth():
+    result = diff_objects({"a": {"b": [{"c": 1}]}}, {"a": {"b": [{"c": 2}]}})
+
+    assert result.metrics.object_nodes == 5
+    assert result.metrics.max_diff_depth == 4
+
+
+def test_metrics_are_not_part_of_the_report():
+    result = diff_objects({"a": 1}, {"a": 1})
+
+    assert result == DiffResult()
+    assert "metrics" not in result.to_dict()
+
+
+def test_merge_adds_counts_and_keeps_max_depth():
+    a = DiffMetrics(resolve_calls=2, max_resolve_depth=5)
+    b = DiffMetrics(resolve_calls=3, max_resolve_depth=4)
+
+    assert a.merge(b) == DiffMetrics(resolve_calls=5, max_resolve_depth=5)
+
+
+def test_cli_metrics_json(tmp_path: Path):
+    proc = _run_cli(
+        [
+            str(EXAMPLES / "api-v1.yaml"),
+            str(EXAMPLES / "api-v2-breaking.yaml"),
+            "--format",
+            "json",
+            "--metrics",
+        ],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    metrics = json.loads(proc.stdout)["metrics"]
+    assert metrics["resolve_calls"] > 0
+    assert metrics["schema_nodes"] > 0
+
+
+def test_cli_metrics_with_result_cache(tmp_path: Path):
+    args = [
+        str(EXAMPLES / "api-v1.yaml"),
+        str(EXAMPLES / "api-v2-breaking.yaml"),
+        "--format",
+        "json",
+        "--metrics",
+        "--cache-dir",
+        str(tmp_path / "cache"),
+    ]
+    first, second = (_run_cli(args, cwd=tmp_path) for _ in range(2))
+
+    assert first.returncode == second.returncode == 1, second.stderr
+    computed = json.loads(first.stdout)["metrics"]
+    cached = json.loads(second.stdout)["metrics"]
+    assert (computed["result_cache_hits"], computed["result_cache_misses"]) == (0, 1)
+    assert (cached["result_cache_hits"], cached["result_cache_misses"]) == (1, 0)
+    assert cached["resolve_calls"] == computed["resolve_calls"] > 0
+    assert cached["schema_nodes"] == computed["schema_nodes"] > 0
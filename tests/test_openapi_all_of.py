@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.openapi.resolver import merge_all_of, resolve_schema
+
+
+def _doc(schemas: dict, *refs: str) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "components": {"schemas": schemas},
+        "paths": {
+            f"/{ref.lower()}": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": f"#/components/schemas/{ref}"}
+                                }
+                            },
+                        }
+                    }
+                }
+            }
+            for ref in refs
+        },
+    }
+
+
+BASE = {
+    "type": "object",
+    "required": ["id"],
+    "properties": {"id": {"type": "string"}, "createdAt": {"type": "string"}},
+}
+
+
+USER = {
+    "allOf": [
+        {"$ref": "#/components/schemas/BaseEntity"},
+        {
+            "type": "object",
+            "required": ["email"],
+            "properties": {"email": {"type": "string"}},
+        },
+    ]
+}
+
+
+def test_merge_all_of_unions_properties_and_required():
+    merged = merge_all_of(
+        {
+            "description": "User",
+            "allOf": [
+                BASE,
+                {"required": ["email", "id"], "properties": {"email": {}}},
+            ],
+        }
+    )
+
+    assert merged["type"] == "object"
+    assert merged["description"] == "User"
+    assert list(merged["properties"]) == ["id", "createdAt", "email"]
+    assert merged["required"] == ["id", "email"]
+    assert "allOf" not in merged
+
+
+def test_change_in_base_is_detected_through_all_of():
+    new_base = {
+        "type": "object",
+        "required": ["id", "createdAt"],
+        "properties": {"id": {"type": "integer"}, "createdAt": {"type": "string"}},
+    }
+    old = _doc({"BaseEntity": BASE, "User": USER}, "User")
+    new = _doc({"BaseEntity": new_base, "User": USER}, "User")
+
+    result = diff_openapi(old, new)
+
+    paths = {(c.path, c.message) for c in result.breaking}
+    prefix = "operations.GET /user.responses.200.schema"
+    assert (f"{prefix}.properties.id", "Schema type changed") in paths
+    assert (f"{prefix}.required.createdAt", "Field became required") in paths
+
+
+def test_components_are_resolved_once_per_document():
+    doc = _doc({"BaseEntity": BASE, "User": USER})
+    cache: dict = {}
+
+    first = resolve_schema({"$ref": "#/components/schemas/User"}, doc, cache=cache)
+    second = resolve_schema(
+        {"type": "array", "items": {"$ref": "#/components/schemas/User"}},
+        doc,
+        cache=cache,
+    )
+
+    assert second["items"] is first
+    assert set(cache) == {
+        "#/components/schemas/User",
+        "#/components/schemas/BaseEntity",
+    }
+
+
+def test_recursive_schema_stops_at_cycle():
+    node = {
+        "type": "object",
+        "properties": {
+            "value": {"type": "string"},
+            "children": {
+                "type": "array",
+                "items": {"$ref": "#/components/schemas/Node"},
+            },
+        },
+    }
+    doc = _doc({"Node": node})
+
+    resolved = resolve_schema({"$ref": "#/components/schemas/Node"}, doc)
+
+    assert resolved["properties"]["children"]["items"] == {
+        "$ref": "#/components/schemas/Node"
+    }
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from schema_diff.models import ChangeType, DiffResult
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.openapi.json_schema_diff import diff_json_schema
+
+
+def _diff(old: dict, new: dict) -> DiffResult:
+    result = DiffResult()
+    diff_json_schema(old, new, path="$", result=result)
+    return result
+
+
+def test_removed_enum_values_are_one_breaking_change():
+    old = {"type": "string", "enum": ["EUR", "USD", "GBP", "JPY"]}
+    new = {"type": "string", "enum": ["EUR", "JPY", "CHF"]}
+
+    result = _diff(old, new)
+
+    assert [(c.change_type, c.path) for c in result.breaking] == [
+        (ChangeType.ENUM_CHANGE, "$.enum")
+    ]
+    assert result.breaking[0].message == 'Enum values removed (2): "USD", "GBP"'
+    assert result.non_breaking[0].message == 'Enum values added (1): "CHF"'
+
+
+def test_enum_constraint_added_and_removed():
+    narrowed = _diff({"type": "string"}, {"type": "string", "enum": ["a"]})
+    widened = _diff({"type": "string", "enum": ["a"]}, {"type": "string"})
+
+    assert narrowed.breaking[0].message == 'Enum constraint added (1): "a"'
+    assert not widened.breaking
+    assert widened.non_breaking[0].message == "Enum constraint removed"
+
+
+def test_enum_values_follow_json_equality():
+    result = _diff({"enum": [1, True, {"a": 1}]}, {"enum": [1.0, {"a": 1}]})
+
+    assert result.breaking[0].message == "Enum values removed (1): true"
+    assert not result.non_breaking
+
+
+def test_booleans_are_not_numbers_anywhere_in_a_document():
+    def doc(values: list) -> dict:
+        schema = {"type": "integer", "enum": values}
+        return {
+            "openapi": "3.0.0",
+            "paths": {
+                "/r": {
+                    "get": {
+                        "parameters": [{"name": "q", "in": "query", "schema": schema}],
+                        "responses": {"200": {"description": "ok"}},
+                    }
+                }
+            },
+        }
+
+    result = diff_openapi(doc([0, 1]), doc([False, True]))
+
+    assert [c.message for c in result.breaking] == ["Enum values removed (2): 0, 1"]
+    assert [c.message for c in result.non_breaking] == [
+        "Enum values added (2): false, true"
+    ]
+    assert diff_openapi(doc([0, 1]), doc([0.0, 1])) == DiffResult()
+
+
+def test_large_shared_enum_is_compared_once():
+    codes = [f"C{i:05d}" for i in range(20_000)]
+
+    def doc(values: list) -> dict:
+        ref = {"$ref": "#/components/schemas/Country"}
+        return {
+            "openapi": "3.0.0",
+            "components": {"schemas": {"Country": {"type": "string", "enum": values}}},
+            "paths": {
+                f"/r{i}": {
+                    "get": {
+                        "parameters": [
+                            {"name": "country", "in": "query", "schema": ref}
+                        ],
+                        "responses": {"200": {"description": "ok"}},
+                    }
+                }
+                for i in range(50)
+            },
+        }
+
+    result = diff_openapi(doc(codes), doc(codes[7:]))
+
+    assert len(result.breaking) == 50
+    assert all(
+        c.message.startswith("Enum values removed (7): ") and c.message.endswith("...")
+        for c in result.breaking
+    )
+    assert result.metrics.enum_cache_hits == 49
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from schema_diff import output
+from schema_diff.diff import diff_objects
+from schema_diff.models import DiffResult
+from schema_diff.output import (
+    result_fields,
+    result_records,
+    write_json,
+    write_ndjson,
+)
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+RESULT = diff_objects({"a": 1, "b": {"c": "x"}}, {"a": "1", "b": {}, "d": []})
+
+
+@pytest.mark.parametrize("stdlib", [False, True])
+def test_write_json_matches_to_dict(monkeypatch, stdlib: bool):
+    if stdlib:
+        monkeypatch.setattr(output, "encode", json.JSONEncoder().encode)
+    stream = io.StringIO()
+
+    write_json(stream, result_fields(RESULT))
+
+    assert json.loads(stream.getvalue()) == RESULT.to_dict()
+
+
+def test_write_json_handles_empty_and_scalar_fields(monkeypatch):
+    monkeypatch.setattr(output, "encode", json.JSONEncoder().encode)
+    stream = io.StringIO()
+
+    write_json(stream, [*result_fields(DiffResult()), ("meta", {"n": 0})])
+
+    assert stream.getvalue() == (
+        '{\n  "breaking": [],\n  "non_breaking": [],\n  "meta": {"n": 0}\n}\n'
+    )
+
+
+def test_write_ndjson_one_change_per_line():
+    stream = io.StringIO()
+
+    write_ndjson(stream, result_records(RESULT))
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines == RESULT.to_dict()["breaking"] + RESULT.to_dict()["non_breaking"]
+
+
+def test_cli_ndjson_to_file(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    report = tmp_path / "report.ndjson"
+    old_file.write_text(json.dumps({"User": {"email": "x"}}), encoding="utf-8")
+    new_file.write_text(json.dumps({"User": {}}), encoding="utf-8")
+
+    proc = _run_cli(
+        [str(old_file), str(new_file), "--format", "ndjson", "-o", str(report)],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert proc.stdout == ""
+    records = [json.loads(line) for line in report.read_text().splitlines()]
+    assert [(r["severity"], r["path"]) for r in records] == [("breaking", "User.email")]
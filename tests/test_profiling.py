@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from schema_diff.loader import load_schema
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.profiling import phase, profile
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def test_library_phases_are_recorded():
+    with profile() as prof:
+        old = load_schema(EXAMPLES / "api-v1.yaml")
+        new = load_schema(EXAMPLES / "api-v2-breaking.yaml")
+        diff_openapi(old.raw, new.raw)
+
+    calls = {t.name: t.calls for t in prof.timings()}
+    assert calls["read"] == calls["parse"] == 2
+    # both documents are normalized together (component first)
+    assert calls["normalize"] == calls["diff"] == 1
+    assert calls["resolve"] > 0
+
+
+def test_self_time_excludes_nested_phases():
+    with profile() as prof:
+        with phase("outer"):
+            time.sleep(0.02)
+            with phase("inner"):
+                time.sleep(0.05)
+
+    timings = {t.name: t for t in prof.timings()}
+    assert 0.05 <= timings["inner"].wall
+    assert 0.02 <= timings["outer"].wall < 0.05
+
+
+def test_open_phases_are_reported_so_far():
+    with profile() as prof:
+        with phase("render"):
+            time.sleep(0.01)
+            (timing,) = prof.timings()
+
+    assert timing.name == "render"
+    assert timing.calls == 1
+    assert timing.wall >= 0.01
+
+
+def test_phases_outside_the_profile_block_are_ignored():
+    with profile() as prof:
+        pass
+    with phase("diff"):
+        pass
+
+    assert prof.timings() == []
+
+
+def test_cli_profile_json_has_timings(tmp_path: Path):
+    proc = _run_cli(
+        [
+            str(EXAMPLES / "api-v1.yaml"),
+            str(EXAMPLES / "api-v2-breaking.yaml"),
+            "--format",
+            "json",
+            "--profile",
+        ],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    timings = json.loads(proc.stdout)["timings"]
+    assert [t["phase"] for t in timings] == [
+        "read",
+        "parse",
+        "canonicalize",
+        "resolve",
+        "normalize",
+        "diff",
+        "render",
+    ]
+
+
+def test_cli_profile_table_goes_to_stderr(tmp_path: Path):
+    proc = _run_cli(
+        [
+            str(EXAMPLES / "api-v1.yaml"),
+            str(EXAMPLES / "api-v2-breaking.yaml"),
+            "--format",
+            "ndjson",
+            "--profile",
+        ],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert all("path" in json.loads(line) for line in proc.stdout.splitlines())
+    assert "normalize" in proc.stderr
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import copy
+import gzip
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from schema_diff.cli import app
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.replay import (
+    Replay,
+    RouteTrie,
+    operation_keys,
+    read_log,
+    request_path,
+)
+
+
+def test_trie_prefers_literals_and_falls_back_to_templates():
+    trie = RouteTrie(
+        [
+            "GET /users/{id}",
+            "DELETE /users/{id}",
+            "GET /users/me",
+            "GET /files/{name}.json",
+            "GET /files/{name}",
+            "GET /",
+        ]
+    )
+    assert trie.match("get", "/users/me") == "GET /users/me"
+    assert trie.match("GET", "/users/42") == "GET /users/{id}"
+    # no DELETE on the literal branch
+    assert trie.match("DELETE", "/users/me") == "DELETE /users/{id}"
+    assert trie.match("GET", "/files/a.json") == "GET /files/{name}.json"
+    assert trie.match("GET", "/files/a.txt") == "GET /files/{name}"
+    assert trie.match("GET", "/users/42/") == "GET /users/{id}"
+    assert trie.match("GET", "/") == "GET /"
+    assert trie.match("GET", "/users") is None
+    assert trie.match("GET", "/users//") is None
+    assert trie.match("POST", "/users/42") is None
+
+
+def test_request_path():
+    assert request_path("https://api.example.com/v1/users/1?x=2#f", "/v1") == (
+        "/users/1"
+    )
+    assert request_path("https://api.example.com") == "/"
+    assert request_path("/v1", "/v1") == "/"
+    assert request_path("/v10/users", "/v1") == "/v10/users"
+
+
+def test_read_log_formats(tmp_path: Path):
+    lines = [
+        {"method": "GET", "path": "/users/1"},
+        {"request_method": "POST", "request_uri": "/users?x=1"},
+        {"request": "DELETE /users/2 HTTP/1.1"},
+        {"request": {"method": "GET", "url": "https://h/users/3"}},
+        {"status": 200},
+    ]
+    text = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n\n"
+    log = tmp_path / "access.ndjson.gz"
+    with gzip.open(log, "wt", encoding="utf-8") as f:
+        f.write(text)
+    assert list(read_log(log)) == [
+        ("GET", "/users/1"),
+        ("POST", "/users?x=1"),
+        ("DELETE", "/users/2"),
+        ("GET", "https://h/users/3"),
+        None,
+        None,
+    ]
+
+    har = tmp_path / "session.har"
+    har.write_text(json.dumps({"log": {"entries": lines[3:4]}}), encoding="utf-8")
+    assert list(read_log(har)) == [("GET", "https://h/users/3")]
+
+
+def _op(responses_schema: dict) -> dict:
+    return {
+        "responses": {
+            "200": {
+                "description": "ok",
+                "content": {"application/json": {"schema": responses_schema}},
+            }
+        }
+    }
+
+
+USER = {"type": "object", "properties": {"id": {"type": "string"}}}
+OLD = {
+    "openapi": "3.0.3",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users/{id}": {"get": _op(USER), "delete": _op(USER)},
+        "/teams": {"get": _op(USER)},
+    },
+}
+NEW = copy.deepcopy(OLD)
+del NEW["paths"]["/teams"]
+NEW["paths"]["/users/{id}"]["get"] = _op({"type": "object"})
+
+
+def test_report_counts_calls_per_breaking_change():
+    session = Replay(operation_keys(OLD), base_path="/api/")
+    session.feed(
+        [
+            ("GET", "/api/users/1"),
+            ("GET", "/api/users/2?full=1"),
+            ("DELETE", "/api/users/2"),
+            ("GET", "/api/teams"),
+            ("GET", "/elsewhere"),
+            None,
+        ]
+    )
+    report = session.report(diff_openapi(OLD, NEW))
+    assert [(c.path, calls) for c, calls in report.impact] == [
+        ("operations.GET /users/{id}.responses.200.schema.properties.id", 2),
+        ("paths./teams", 1),
+    ]
+    assert (report.requests, report.matched, report.unmatched, report.invalid) == (
+        5,
+        4,
+        1,
+        1,
+    )
+    assert report.exit_code() == 1
+
+
+def test_cli_replay(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    old_file.write_text(json.dumps(OLD), encoding="utf-8")
+    new_file.write_text(json.dumps(NEW), encoding="utf-8")
+    log = tmp_path / "access.ndjson"
+    log.write_text(
+        json.dumps({"method": "DELETE", "path": "/users/1"}) + "\n", encoding="utf-8"
+    )
+    runner = CliRunner()
+
+    out = runner.invoke(
+        app, ["replay", str(old_file), str(new_file), str(log), "--format", "json"]
+    )
+    assert out.exit_code == 0  # breaking changes, but no call affected
+    report = json.loads(out.stdout)
+    assert report["matched"] == 1
+    assert [c["calls"] for c in report["breaking"]] == [0, 0]
+
+    out = runner.invoke(app, ["replay", str(old_file), str(new_file), str(log)])
+    assert out.exit_code == 0
+    assert "No recorded call is affected" in out.stdout
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from schema_diff import result_cache
+from schema_diff.diff import diff_objects
+from schema_diff.result_cache import ResultCache, file_digest
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def test_round_trip(tmp_path: Path):
+    cache = ResultCache(tmp_path)
+    result = diff_objects({"a": 1, "b": 2}, {"a": "1", "c": 3})
+    key = ResultCache.key("old", "new", {"mode": "pair"})
+
+    assert cache.get(key) is None
+    cache.put(key, result, old_kind="unknown", new_kind="unknown")
+    entry = cache.get(key)
+
+    assert entry is not None
+    assert entry["result"] == result
+    assert entry["old_kind"] == "unknown"
+
+
+def test_key_depends_on_inputs_options_and_engine(monkeypatch):
+    base = ResultCache.key("a", "b")
+
+    assert ResultCache.key("a", "b") == base
+    assert ResultCache.key("b", "a") != base
+    assert ResultCache.key("a", "b", {"rules": "x"}) != base
+
+    monkeypatch.setattr(result_cache, "NORMALIZER_VERSION", -1)
+    assert ResultCache.key("a", "b") != base
+    monkeypatch.undo()
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", -1)
+    assert ResultCache.key("a", "b") != base
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    result = diff_objects({"a": 1}, {})
+    keys = {name: ResultCache.key(name, name) for name in ("1", "2", "3", "4")}
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    for i, name in enumerate(["1", "2", "3"]):
+        cache.put(keys[name], result, old_kind="unknown", new_kind="unknown")
+        os.utime(tmp_path / f"{keys[name]}.json", ns=(i * 10**9, i * 10**9))
+
+    entry_size = (tmp_path / f"{keys['1']}.json").stat().st_size
+    cache.get(keys["1"])  # bump "1" to most recently used
+    cache.max_bytes = entry_size * 2
+    cache.put(keys["4"], result, old_kind="unknown", new_kind="unknown")
+
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == sorted(
+        [keys["1"], keys["4"]]
+    )
+
+
+def test_eviction_never_touches_other_files(tmp_path: Path):
+    spec = tmp_path / "my_spec.json"
+    spec.write_text("{}" * 1000, encoding="utf-8")
+    os.utime(spec, ns=(0, 0))
+    cache = ResultCache(tmp_path, max_bytes=1000)
+    cache.put(
+        ResultCache.key("a", "b"),
+        diff_objects({"a": 1}, {}),
+        old_kind="unknown",
+        new_kind="unknown",
+    )
+    assert spec.exists()
+
+
+def test_cli_uses_cached_result_without_parsing(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    # Not valid JSON: only a cache hit can produce a result for these files.
+    old_file.write_text("{old", encoding="utf-8")
+    new_file.write_text("{new", encoding="utf-8")
+
+    cache_dir = tmp_path / "cache"
+    cache = ResultCache(cache_dir)
+    key = ResultCache.key(file_digest(old_file), file_digest(new_file))
+    cache.put(
+        key,
+        diff_objects({"User": {"email": "x"}}, {"User": {}}),
+        old_kind="unknown",
+        new_kind="unknown",
+    )
+
+    proc = _run_cli(
+        [
+            str(old_file),
+            str(new_file),
+            "--format",
+            "json",
+            "--cache-dir",
+            str(cache_dir),
+        ],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert json.loads(proc.stdout)["breaking"][0]["path"] == "User.email"
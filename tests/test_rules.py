@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from schema_diff.diff import diff_objects
+from schema_diff.models import ChangeSeverity
+from schema_diff.openapi.diff import diff_openapi
+from schema_diff.rules import (
+    CONTEXTS,
+    DEFAULT_RULESET,
+    KINDS,
+    Rule,
+    load_rules,
+    parse_rules,
+)
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def _op(schema: dict) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "paths": {
+            "/users": {
+                "post": {
+                    "requestBody": {
+                        "content": {"application/json": {"schema": schema}}
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {"application/json": {"schema": schema}},
+                        }
+                    },
+                }
+            }
+        },
+    }
+
+
+OLD = _op({"type": "object", "properties": {"email": {}, "name": {}}})
+NEW = _op({"type": "object", "properties": {"name": {}}})
+
+
+def test_default_table_covers_every_kind_and_context():
+    for kind in KINDS:
+        for context in CONTEXTS:
+            assert DEFAULT_RULESET.severity(kind, context) is not None
+
+
+def test_context_specific_rule_beats_generic_rule():
+    rules = DEFAULT_RULESET.with_overrides(
+        [
+            Rule("property_removed", ChangeSeverity.NON_BREAKING, "request"),
+            Rule("property_removed", ChangeSeverity.BREAKING),
+        ]
+    )
+
+    result = diff_openapi(OLD, NEW, rules=rules)
+
+    assert [c.path for c in result.breaking] == [
+        "operations.POST /users.responses.200.schema.properties.email"
+    ]
+    assert [c.path for c in result.non_breaking] == [
+        "operations.POST /users.requestBody.schema.properties.email"
+    ]
+
+
+def test_ignore_drops_changes():
+    rules = DEFAULT_RULESET.with_overrides(
+        parse_rules({"rules": [{"kind": "field_removed", "severity": "ignore"}]})
+    )
+
+    result = diff_objects({"a": 1, "b": 2}, {"a": 1}, rules=rules)
+
+    assert not result.breaking
+    assert not result.non_breaking
+
+
+@pytest.mark.parametrize(
+    "entry, error",
+    [
+        ({"kind": "nope", "severity": "breaking"}, "unknown kind"),
+        ({"kind": "path_added", "severity": "fatal"}, "unknown severity"),
+        (
+            {"kind": "path_added", "context": "body", "severity": "breaking"},
+            "unknown context",
+        ),
+    ],
+)
+def test_invalid_rules_are_rejected(entry, error):
+    with pytest.raises(ValueError, match=error):
+        parse_rules({"rules": [entry]})
+
+
+def test_load_rules_from_yaml_and_cli(tmp_path: Path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text(
+        "rules:\n"
+        "  - kind: property_removed\n"
+        "    context: request\n"
+        "    severity: ignore\n"
+        "  - kind: property_removed\n"
+        "    context: response\n"
+        "    severity: non_breaking\n",
+        encoding="utf-8",
+    )
+    assert load_rules(rules_file).severity("property_removed", "request") is None
+
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    old_file.write_text(json.dumps(OLD), encoding="utf-8")
+    new_file.write_text(json.dumps(NEW), encoding="utf-8")
+
+    proc = _run_cli(
+        [str(old_file), str(new_file), "--format", "json", "--rules", str(rules_file)],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 0, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    payload = json.loads(proc.stdout)
+    assert payload["breaking"] == []
+    assert [c["path"] for c in payload["non_breaking"]] == [
+        "operations.POST /users.responses.200.schema.properties.email"
+    ]
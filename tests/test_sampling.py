@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from schema_diff.diff import diff_objects
+from schema_diff.sampling import Sampler
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def _nested(depth: int, width: int) -> dict:
+    if depth == 0:
+        return {f"k{i}": i for i in range(width)}
+    return {f"k{i}": _nested(depth - 1, width) for i in range(width)}
+
+
+DOC = _nested(3, 8)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        diff_objects(DOC, DOC)
+
+
+def test_stacks_start_at_schema_diff_frames():
+    with Sampler(interval=0.001) as sampler:
+        _busy(0.2)
+
+    stacks = sampler.stacks()
+    assert sum(count for count, _ in stacks.values()) > 0
+    for stack in stacks:
+        # the test function (outside code) calling in is cut off
+        assert stack[0] == "schema_diff.diff:diff_objects"
+
+
+def test_collapsed_and_speedscope_output(tmp_path: Path):
+    with Sampler(interval=0.001) as sampler:
+        _busy(0.1)
+
+    collapsed = tmp_path / "profile.collapsed"
+    speedscope = tmp_path / "profile.json"
+    sampler.write(collapsed)
+    sampler.write(speedscope)
+
+    for line in collapsed.read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("schema_diff.diff:diff_objects")
+        assert int(count) > 0
+
+    data = json.loads(speedscope.read_text())
+    (profile,) = data["profiles"]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    names = [f["name"] for f in data["shared"]["frames"]]
+    assert all(i < len(names) for sample in profile["samples"] for i in sample)
+
+
+def test_cli_profile_out(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    profile = tmp_path / "diff.collapsed"
+    old_file.write_text(json.dumps(_nested(5, 7)), encoding="utf-8")
+    new_file.write_text(json.dumps(_nested(5, 7)), encoding="utf-8")
+
+    proc = _run_cli(
+        [str(old_file), str(new_file), "--profile-out", str(profile)], cwd=tmp_path
+    )
+
+    assert proc.returncode == 0, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert profile.exists()
+    for line in profile.read_text().splitlines():
+        assert line.startswith("schema_diff.cli:main")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from schema_diff.server import DiffService, make_server
+
+
+def _write(path: Path, obj: object) -> Path:
+    path.write_text(json.dumps(obj), encoding="utf-8")
+    return path
+
+
+def _spec(*paths: str) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "paths": {
+            p: {"get": {"responses": {"200": {"description": "ok"}}}} for p in paths
+        },
+    }
+
+
+def test_service_reuses_cached_documents(tmp_path: Path):
+    old = _write(tmp_path / "old.json", _spec("/users", "/orders"))
+    new = _write(tmp_path / "new.json", _spec("/users"))
+    service = DiffService(max_documents=4)
+
+    first = service.diff_files(old, new)
+    second = service.diff_files(old, new)
+
+    assert first.to_dict() == second.to_dict()
+    assert first.exit_code() == 1
+    assert service.documents.misses == 2
+    assert service.documents.hits == 2
+
+
+def test_service_reports_errors_without_raising(tmp_path: Path):
+    service = DiffService()
+
+    response = service.handle({"id": 7, "old": str(tmp_path / "missing.json")})
+
+    assert response == {
+        "id": 7,
+        "ok": False,
+        "error": "'old' and 'new' must be file paths",
+    }
+
+
+def test_unix_socket_round_trip(tmp_path: Path):
+    old = _write(tmp_path / "old.json", {"User": {"email": "a@b.com"}})
+    new = _write(tmp_path / "new.json", {"User": {}})
+    socket_path = tmp_path / "diff.sock"
+
+    server = make_server(DiffService(), socket_path=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+            request = {"id": "a", "old": str(old), "new": str(new)}
+            client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            client.sendall(b"not json\n")
+            with client.makefile("r", encoding="utf-8") as reader:
+                first = json.loads(reader.readline())
+                second = json.loads(reader.readline())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert first["id"] == "a"
+    assert first["ok"] is True
+    assert first["exit_code"] == 1
+    assert first["result"]["breaking"][0]["path"] == "User.email"
+    assert second["ok"] is False
+
+
+def test_socket_path_is_only_removed_if_it_is_our_socket(tmp_path: Path):
+    important = tmp_path / "important.txt"
+    important.write_text("keep me", encoding="utf-8")
+    with pytest.raises(ValueError, match="not a socket"):
+        make_server(DiffService(), socket_path=important)
+    assert important.read_text(encoding="utf-8") == "keep me"
+
+    socket_path = tmp_path / "diff.sock"
+    stale = make_server(DiffService(), socket_path=socket_path)
+    stale.socket.close()  # left behind, e.g. by a crashed daemon
+    server = make_server(DiffService(), socket_path=socket_path)
+    server.server_close()
+    assert not socket_path.exists()
+
+    # a file that replaced the socket is left alone
+    server = make_server(DiffService(), socket_path=socket_path)
+    socket_path.unlink()
+    socket_path.write_text("other", encoding="utf-8")
+    server.server_close()
+    assert socket_path.read_text(encoding="utf-8") == "other"
+
+
+def test_http_round_trip(tmp_path: Path):
+    old = _write(tmp_path / "old.json", {"User": {"email": "a@b.com"}})
+    new = _write(tmp_path / "new.json", {"User": {}})
+
+    server = make_server(DiffService(), port=0)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        request = {"id": "a", "old": str(old), "new": str(new)}
+        client.request("POST", "/diff", body=json.dumps(request))
+        first = client.getresponse()
+        first_body = json.loads(first.read())
+        # same connection, kept alive
+        client.request("POST", "/diff", body=b"not json")
+        second = client.getresponse()
+        second_body = json.loads(second.read())
+        client.request("POST", "/other", body=b"{}")
+        third = client.getresponse()
+        third.read()
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert first.status == 200
+    assert first.getheader("Content-Type") == "application/json"
+    assert first_body["id"] == "a"
+    assert first_body["exit_code"] == 1
+    assert first_body["result"]["breaking"][0]["path"] == "User.email"
+    assert second.status == 400
+    assert second_body["ok"] is False
+    assert third.status == 404
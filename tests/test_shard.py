@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.generate import SIZES, mutate, openapi_spec
+from schema_diff.cli import app
+from schema_diff.openapi.diff import diff_openapi, diff_openapi_shard
+from schema_diff.shard import PartialResult, Shard, merge_partials
+
+OLD = openapi_spec(SIZES["small"])
+NEW = mutate(OLD)
+
+
+def test_parse_and_ownership():
+    assert Shard.parse("2/4") == Shard(2, 4)
+    for text in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            Shard.parse(text)
+
+    shards = [Shard(i, 3) for i in (1, 2, 3)]
+    keys = [f"GET /items/{i}" for i in range(300)]
+    owners = [[s for s in shards if s.owns(k)] for k in keys]
+    assert all(len(o) == 1 for o in owners)
+    # a stable hash, not Python's per-process one
+    assert Shard(4, 4).owns("GET /users") and Shard(2, 4).owns("POST /users")
+    assert {o[0] for o in owners} == set(shards)
+
+
+@pytest.mark.parametrize("count", [1, 2, 5])
+def test_merged_shards_equal_single_process_result(count):
+    expected = diff_openapi(OLD, NEW)
+    assert expected.breaking and expected.non_breaking
+
+    partials = [
+        diff_openapi_shard(OLD, NEW, Shard(i, count)) for i in range(1, 1 + count)
+    ]
+    # round-trip through the on-disk format, in any order
+    partials = [PartialResult.from_dict(p.to_dict()) for p in reversed(partials)]
+    merged = merge_partials(partials)
+    assert merged.to_dict() == expected.to_dict()
+
+
+def test_merge_rejects_incomplete_or_mixed_partials():
+    first, second = (diff_openapi_shard(OLD, NEW, Shard(i, 2)) for i in (1, 2))
+    with pytest.raises(ValueError, match="expected shards"):
+        merge_partials([first])
+    with pytest.raises(ValueError, match="expected shards"):
+        merge_partials([first, first])
+    first.inputs = "a"
+    with pytest.raises(ValueError, match="different inputs"):
+        merge_partials([first, second])
+
+
+def _write(path: Path, data: dict) -> Path:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_cli_shards_merge_byte_identical(tmp_path: Path):
+    old_file = _write(tmp_path / "old.json", OLD)
+    new_file = _write(tmp_path / "new.json", NEW)
+    runner = CliRunner()
+
+    single = runner.invoke(app, [str(old_file), str(new_file), "--format", "json"])
+    assert single.exit_code == 1
+
+    parts = []
+    for i in (1, 2, 3):
+        part = tmp_path / f"part{i}.json"
+        out = runner.invoke(
+            app,
+            [str(old_file), str(new_file), "--shard", f"{i}/3"]
+            + ["--format", "json", "-o", str(part)],
+        )
+        assert out.exit_code in (0, 1)
+        parts.append(str(part))
+
+    merged = runner.invoke(app, ["merge", *parts, "--format", "json"])
+    assert merged.exit_code == 1
+    assert merged.stdout == single.stdout
+
+    plain = runner.invoke(app, ["merge", *parts, "--format", "plain"])
+    single_plain = runner.invoke(
+        app, [str(old_file), str(new_file), "--format", "plain"]
+    )
+    assert plain.stdout == single_plain.stdout
+
+    out = runner.invoke(app, ["merge", *parts[:2]])
+    assert out.exit_code == 2
+    assert "expected shards 1/3 to 3/3" in out.output
+
+    out = runner.invoke(app, [str(old_file), str(new_file), "--shard", "1/3"])
+    assert out.exit_code == 2
+    assert "--shard requires --format json" in out.output
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from schema_diff.loader import SchemaKind, load_schema
+from schema_diff.openapi.diff import diff_normalized, diff_openapi
+from schema_diff.openapi.normalizer import normalize_openapi
+from schema_diff.openapi import snapshot as snapshot_module
+from schema_diff.openapi.snapshot import read_snapshot, write_snapshot
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def test_snapshot_round_trip_preserves_diff(tmp_path: Path):
+    old = load_schema(EXAMPLES / "api-v1.yaml")
+    new = load_schema(EXAMPLES / "api-v2-breaking.yaml")
+    out = tmp_path / "v1.sdsnap"
+
+    write_snapshot(normalize_openapi(old.raw), out, source_sha256="ab" * 32)
+    snapshot = read_snapshot(out)
+
+    assert snapshot.source_sha256 == "ab" * 32
+    assert snapshot.normalized == normalize_openapi(old.raw)
+    from_snapshot = diff_normalized(snapshot.normalized, normalize_openapi(new.raw))
+    assert from_snapshot.to_dict() == diff_openapi(old.raw, new.raw).to_dict()
+
+
+def test_load_schema_detects_snapshot(tmp_path: Path):
+    raw = {
+        "openapi": "3.0.0",
+        "paths": {
+            "/events": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "ok",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "string",
+                                        "example": datetime.date(2024, 1, 1),
+                                    }
+                                }
+                            },
+                        }
+                    }
+                }
+            }
+        },
+    }
+    out = tmp_path / "events.bin"
+    write_snapshot(normalize_openapi(raw), out, source_sha256="00" * 32)
+
+    loaded = load_schema(out)
+
+    assert loaded.kind == SchemaKind.OPENAPI
+    assert loaded.normalized is not None
+    schema = loaded.normalize().operations["GET /events"].responses["200"]
+    assert schema == {"type": "string", "example": "2024-01-01"}
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path: Path):
+    out = tmp_path / "broken.sdsnap"
+    write_snapshot(
+        normalize_openapi({"openapi": "3.0.0", "paths": {"/a": {"get": {}}}}),
+        out,
+        source_sha256="00" * 32,
+    )
+    data = bytearray(out.read_bytes())
+    data[-1] ^= 0xFF
+    out.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="checksum"):
+        read_snapshot(out)
+
+
+def test_snapshots_of_other_versions_are_rejected(tmp_path: Path, monkeypatch):
+    spec = {"openapi": "3.0.0", "paths": {"/a": {"get": {}}}}
+    out = tmp_path / "old.sdsnap"
+    monkeypatch.setattr(snapshot_module, "NORMALIZER_VERSION", 2)
+    write_snapshot(normalize_openapi(spec), out, source_sha256="00" * 32)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="normalizer version 2"):
+        read_snapshot(out)
+
+    monkeypatch.setattr(snapshot_module, "_PYTHON_VERSION", (3, 8))
+    write_snapshot(normalize_openapi(spec), out, source_sha256="00" * 32)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="written by Python 3.8"):
+        read_snapshot(out)
+
+    # format version 1 had no normalizer version at all
+    data = bytearray(out.read_bytes())
+    data[8:10] = (1).to_bytes(2, "little")
+    out.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="format version 1"):
+        read_snapshot(out)
+
+
+def test_cli_snapshot_then_diff(tmp_path: Path):
+    spec = EXAMPLES / "api-v1.yaml"
+    out = tmp_path / "v1.sdsnap"
+
+    proc = _run_cli(["snapshot", str(spec), str(out)], cwd=tmp_path)
+    assert proc.returncode == 0, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert (
+        read_snapshot(out).source_sha256
+        == hashlib.sha256(spec.read_bytes()).hexdigest()
+    )
+
+    proc = _run_cli(
+        [str(out), str(EXAMPLES / "api-v2-breaking.yaml"), "--format", "json"],
+        cwd=tmp_path,
+    )
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    assert json.loads(proc.stdout)["breaking"]
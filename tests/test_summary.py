@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from schema_diff.models import Change, ChangeSeverity, ChangeType, DiffResult
+from schema_diff.output import write_plain
+from schema_diff.summary import operation_of, summarize
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+@pytest.mark.parametrize(
+    "path, operation",
+    [
+        ("operations.GET /users.responses.200.schema.properties.id", "GET /users"),
+        ("operations.POST /v1.0/users.requestBody.schema", "POST /v1.0/users"),
+        ("operations.GET /a.parameters.query.limit.required", "GET /a"),
+        ("paths./users/{id}.delete", "DELETE /users/{id}"),
+        ("paths./users", "/users"),
+        ("components.schemas.User.properties.email", "components.schemas.User"),
+        ("User.email", "User"),
+        ("[].id", "[].id"),
+    ],
+)
+def test_operation_of(path: str, operation: str):
+    assert operation_of(path) == operation
+
+
+def _removed(path: str) -> Change:
+    return Change(ChangeType.REMOVED_FIELD, ChangeSeverity.BREAKING, path)
+
+
+def test_summarize_counts_and_keeps_shortest_paths():
+    prefix = "operations.GET /users.responses.200.schema"
+    result = DiffResult(
+        breaking=[
+            _removed(f"{prefix}.properties.a.properties.deep"),
+            _removed(f"{prefix}.properties.b"),
+            _removed(f"{prefix}.properties.a"),
+            _removed("operations.GET /orders.responses.200.schema.properties.x"),
+        ],
+        non_breaking=[
+            Change(
+                ChangeType.ADDED_FIELD,
+                ChangeSeverity.NON_BREAKING,
+                f"{prefix}.properties.c",
+            )
+        ],
+    )
+
+    groups = summarize(result, top_k=2)
+
+    assert [(g.severity, g.operation, g.count) for g in groups] == [
+        (ChangeSeverity.BREAKING, "GET /orders", 1),
+        (ChangeSeverity.BREAKING, "GET /users", 3),
+        (ChangeSeverity.NON_BREAKING, "GET /users", 1),
+    ]
+    assert [c.path for c in groups[1].sample] == [
+        f"{prefix}.properties.a",
+        f"{prefix}.properties.b",
+    ]
+
+
+def test_write_plain():
+    result = DiffResult(
+        breaking=[
+            Change(
+                ChangeType.TYPE_CHANGE,
+                ChangeSeverity.BREAKING,
+                "amount",
+                old_type="float",
+                new_type="str",
+                message="Type changed",
+            )
+        ]
+    )
+    stream = io.StringIO()
+
+    write_plain(stream, result)
+
+    assert stream.getvalue() == (
+        "BREAKING CHANGES FOUND (1)\n"
+        "  type_change      amount (float -> str): Type changed\n"
+    )
+
+
+def test_cli_summary_json(tmp_path: Path):
+    proc = _run_cli(
+        [
+            str(EXAMPLES / "api-v1.yaml"),
+            str(EXAMPLES / "api-v2-breaking.yaml"),
+            "--summary",
+            "--summary-top",
+            "1",
+            "--format",
+            "json",
+        ],
+        cwd=tmp_path,
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    summary = json.loads(proc.stdout)["summary"]
+    assert summary[0]["severity"] == "breaking"
+    assert all(len(g["sample"]) == min(1, g["count"]) for g in summary)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import copy
+import gc
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from schema_diff.openapi.diff import diff_normalized
+from schema_diff.openapi.incremental import IncrementalNormalizer
+from schema_diff.openapi.normalizer import normalize_openapi
+from schema_diff.watch import WatchSession, watch
+
+
+def _ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _get(schema: dict) -> dict:
+    return {
+        "get": {
+            "responses": {
+                "200": {
+                    "description": "ok",
+                    "content": {"application/json": {"schema": schema}},
+                }
+            }
+        }
+    }
+
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users": _get(_ref("User")),
+        "/teams": _get(_ref("Team")),
+        "/health": _get({"type": "object"}),
+    },
+    "components": {
+        "schemas": {
+            "User": {"type": "object", "properties": {"id": {"type": "string"}}},
+            "Team": {
+                "type": "object",
+                "properties": {"members": {"type": "array", "items": _ref("User")}},
+            },
+            "Node": {
+                "type": "object",
+                "properties": {"children": {"type": "array", "items": _ref("Node")}},
+            },
+        }
+    },
+}
+
+
+def _edited(fn, base: dict = SPEC) -> dict:
+    spec = copy.deepcopy(base)
+    fn(spec)
+    return spec
+
+
+def test_incremental_normalizer_redoes_only_affected_path_items():
+    normalizer = IncrementalNormalizer()
+    first = normalizer.update(SPEC)
+    assert normalizer.renormalized == 3
+
+    # Team only: /teams
+    team = _edited(
+        lambda s: s["components"]["schemas"]["Team"]["properties"].update(
+            name={"type": "string"}
+        )
+    )
+    second = normalizer.update(team)
+    assert normalizer.renormalized == 1
+    assert second == normalize_openapi(team)
+    assert second.operations["GET /users"] is first.operations["GET /users"]
+
+    # User: /users directly, /teams through Team
+    user = _edited(lambda s: s["components"]["schemas"]["User"].update(required=["id"]))
+    assert normalizer.update(user) == normalize_openapi(user)
+    assert normalizer.renormalized == 2
+
+    # the path item itself; a component nothing uses
+    edits = _edited(
+        lambda s: s["paths"]["/health"]["get"].update(deprecated=True), user
+    )
+    edits["components"]["schemas"]["Node"]["description"] = "tree"
+    assert normalizer.update(edits) == normalize_openapi(edits)
+    assert normalizer.renormalized == 1
+
+    removed = _edited(lambda s: s["paths"].pop("/teams"), edits)
+    assert normalizer.update(removed) == normalize_openapi(removed)
+    assert normalizer.renormalized == 0
+
+
+def test_diff_cache_reuses_unchanged_operations():
+    old = normalize_openapi(SPEC)
+    normalizer = IncrementalNormalizer()
+    cache: dict = {}
+
+    for spec in (
+        SPEC,
+        _edited(lambda s: s["components"]["schemas"]["User"].update(type="string")),
+        _edited(lambda s: s["paths"].pop("/health")),
+    ):
+        new = normalizer.update(spec)
+        cached = diff_normalized(old, new, cache=cache)
+        assert cached == diff_normalized(old, normalize_openapi(spec))
+        assert set(cache) == set(old.operations) & set(new.operations)
+
+
+def _write(path: Path, data: dict) -> None:
+    # atomically, like most editors: a watcher never sees a half-written file
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def test_watch_session(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    _write(old_file, SPEC)
+    _write(new_file, SPEC)
+    session = WatchSession(old_file, new_file)
+
+    first = session.refresh()
+    assert first is not None and not first.result.has_breaking_changes()
+    assert session.refresh() is None
+
+    edited = _edited(lambda s: s["components"]["schemas"]["User"].update(type="array"))
+    _write(new_file, edited)
+    update = session.refresh()
+    assert update is not None
+    assert (update.renormalized, update.path_items) == (2, 3)
+    assert update.result.has_breaking_changes()
+
+    new_file.write_text("{", encoding="utf-8")
+    with pytest.raises(ValueError):
+        session.refresh()
+    assert session.refresh() is None  # not retried until it changes again
+
+    _write(new_file, SPEC)
+    update = session.refresh()
+    assert update is not None and not update.result.has_breaking_changes()
+
+
+def test_watch_leaves_the_collector_alone(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    _write(old_file, SPEC)
+    _write(new_file, SPEC)
+    stop = threading.Event()
+    updates = []
+
+    def on_update(update) -> None:
+        updates.append(update)
+        stop.set()
+
+    frozen = gc.get_freeze_count()
+    watch(WatchSession(old_file, new_file), on_update, on_error=print, stop=stop)
+    assert len(updates) == 1
+    assert gc.get_freeze_count() == frozen
+
+
+def _lines(stream, out: "queue.Queue[str]") -> None:
+    for line in stream:
+        out.put(line)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="no SIGINT for child processes")
+def test_cli_watch(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    new_file = tmp_path / "new.json"
+    _write(old_file, SPEC)
+    _write(new_file, SPEC)
+
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "schema_diff.cli",
+            str(old_file),
+            str(new_file),
+            "--format",
+            "plain",
+            "--watch",
+        ],
+        cwd=str(tmp_path),
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    status: "queue.Queue[str]" = queue.Queue()
+    threading.Thread(target=_lines, args=(proc.stderr, status), daemon=True).start()
+    try:
+        assert "[watch] diffed" in status.get(timeout=30)
+        _write(new_file, _edited(lambda s: s["paths"].pop("/users")))
+        assert "0/2 path items normalized" in status.get(timeout=30)
+    finally:
+        proc.send_signal(signal.SIGINT)
+        stdout, _ = proc.communicate(timeout=30)
+
+    assert proc.returncode == 1
+    assert stdout.count("Old schema: openapi") == 2
+    assert "paths./users" in stdout
+
+
+def test_cli_watch_rejects_against(tmp_path: Path):
+    old_file = tmp_path / "old.json"
+    _write(old_file, SPEC)
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "schema_diff.cli",
+            str(old_file),
+            str(old_file),
+            "--watch",
+            "--against",
+            str(old_file),
+        ],
+        cwd=str(tmp_path),
+        text=True,
+        capture_output=True,
+    )
+    assert proc.returncode == 2
+    assert "--against cannot be combined with --watch" in proc.stderr
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from schema_diff.loader import load_schema
+from schema_diff.window import diff_against
+
+
+def _run_cli(args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+    cmd = [sys.executable, "-m", "schema_diff.cli", *args]
+    return subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
+
+
+def _spec(*paths: str) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "paths": {
+            p: {"get": {"responses": {"200": {"description": "ok"}}}} for p in paths
+        },
+    }
+
+
+def _write(path: Path, obj: object) -> Path:
+    path.write_text(json.dumps(obj), encoding="utf-8")
+    return path
+
+
+def test_breaking_change_lists_affected_baselines(tmp_path: Path):
+    v1 = _write(tmp_path / "v1.json", _spec("/users"))
+    v2 = _write(tmp_path / "v2.json", _spec("/users", "/orders"))
+    v3 = _write(tmp_path / "v3.json", _spec("/users", "/orders", "/legacy"))
+    new = _write(tmp_path / "new.json", _spec("/users"))
+
+    window = diff_against(load_schema(new), [v1, v2, v3])
+
+    assert window.exit_code() == 1
+    affected = {c.path: labels for c, labels in window.breaking()}
+    assert affected["paths./orders"] == [str(v2), str(v3)]
+    assert affected["paths./legacy"] == [str(v3)]
+    assert window.results[0].has_breaking_changes() is False
+
+
+def test_cli_against_json_output(tmp_path: Path):
+    v1 = _write(tmp_path / "v1.json", _spec("/users", "/orders"))
+    v2 = _write(tmp_path / "v2.json", _spec("/users"))
+    new = _write(tmp_path / "new.json", _spec("/users", "/pets"))
+
+    proc = _run_cli(
+        [str(v1), str(new), "--against", str(v2), "--format", "json"], cwd=tmp_path
+    )
+
+    assert proc.returncode == 1, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    payload = json.loads(proc.stdout)
+    assert payload["baselines"] == [str(v1), str(v2)]
+    assert [(c["path"], c["baselines"]) for c in payload["breaking"]] == [
+        ("paths./orders", [str(v1)])
+    ]
+    assert payload["non_breaking"][0]["baselines"] == [str(v1), str(v2)]
+
+
+def test_cli_against_diffs_json_schemas_as_json_schema(tmp_path: Path):
+    user = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "description": "A user",
+        "properties": {"id": {"type": "string"}},
+    }
+    v1 = _write(tmp_path / "v1.json", user)
+    v2 = _write(tmp_path / "v2.json", user)
+    new = _write(
+        tmp_path / "new.json", {k: v for k, v in user.items() if k != "description"}
+    )
+
+    proc = _run_cli(
+        [str(v1), str(new), "--against", str(v2), "--format", "json"], cwd=tmp_path
+    )
+
+    assert proc.returncode == 0, f"stdout={proc.stdout}\nstderr={proc.stderr}"
+    payload = json.loads(proc.stdout)
+    assert payload["breaking"] == [] and payload["non_breaking"] == []
+
+
+def test_cli_against_plain_output_and_rejected_flags(tmp_path: Path):
+    v1 = _write(tmp_path / "v1.json", _spec("/users", "/orders"))
+    v2 = _write(tmp_path / "v2.json", _spec("/users"))
+    new = _write(tmp_path / "new.json", _spec("/users", "/pets"))
+    args = [str(v1), str(new), "--against", str(v2)]
+
+    proc = _run_cli([*args, "--format", "plain"], cwd=tmp_path)
+    assert proc.returncode == 1, proc.stderr
+    assert proc.stdout.startswith("New schema: openapi  Baselines: 2\n")
+    assert f"paths./orders: Path removed <- {v1}\n" in proc.stdout
+
+    proc = _run_cli([*args, "--cache-dir", str(tmp_path / "cache")], cwd=tmp_path)
+    assert proc.returncode == 2
+    assert "--cache-dir cannot be combined with --against" in proc.stderr